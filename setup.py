@@ -6,6 +6,7 @@ setup(
     name=package_name,
     version='0.0.0',
     packages=find_packages(exclude=['test']),
+    package_data={package_name: ['books/*.bin']},
     data_files=[
         ('share/ament_index/resource_index/packages',
             ['resource/' + package_name]),
@@ -22,6 +23,17 @@ setup(
         'console_scripts': [
             'tic_tac_toe = tic_tac_toe.tictactoe_enhanced:main',
             'tic_tac_toe_ros = tic_tac_toe.tic_tac_toe_ros:main',
+            'tic_tac_toe_book = tic_tac_toe.opening_book:main',
+            'tic_tac_toe_bench = tic_tac_toe.benchmarks:main',
+            'tic_tac_toe_host = tic_tac_toe.game_host:main',
+            'tic_tac_toe_spectator = tic_tac_toe.spectator:main',
+            'tic_tac_toe_replay = tic_tac_toe.replay:main',
+            'tic_tac_toe_playback = tic_tac_toe.game_events:main',
+            'tic_tac_toe_container = tic_tac_toe.container:main',
+            'tic_tac_toe_latency = tic_tac_toe.move_latency:main',
+            'tic_tac_toe_solve = tic_tac_toe.solver:main',
+            'tic_tac_toe_tablebase = tic_tac_toe.tablebase:main',
+            'tic_tac_toe_tournament = tic_tac_toe.tournament:main',
         ],
     },
 )
@@ -0,0 +1,33 @@
+import pytest
+
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, other_player
+
+
+def reachable_positions(first_player):
+    """Every (board, player to move) reachable from the empty board, finished games included"""
+    engine = Engine(3)
+    seen = {}
+
+    def visit(board, player):
+        key = (tuple(board), player)
+        if key in seen:
+            return
+        seen[key] = None
+        if engine.check_winner(board):
+            return
+        for cell in range(9):
+            if board[cell] is EMPTY:
+                board[cell] = player
+                visit(board, other_player(player))
+                board[cell] = EMPTY
+
+    visit([EMPTY] * 9, first_player)
+    return [(list(board), player) for board, player in seen]
+
+
+@pytest.fixture(scope='session')
+def positions():
+    """Reachable 3x3 positions with either side opening"""
+    unique = {(tuple(board), player) for board, player in reachable_positions(PLAYER_X) + reachable_positions(PLAYER_O)}
+    return [(list(board), player) for board, player in sorted(unique, key=repr)]
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+pytest.importorskip('pygame')
+
+from tic_tac_toe import analysis  # noqa: E402
+from tic_tac_toe.analysis import DRAW, LOSS, WIN, PositionAnalyzer  # noqa: E402
+from tic_tac_toe.engine import Engine  # noqa: E402
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY  # noqa: E402
+
+POSITIONS = [
+    ([EMPTY] * 9, PLAYER_X),
+    ([PLAYER_X, PLAYER_X, EMPTY, PLAYER_O, PLAYER_O, EMPTY, EMPTY, EMPTY, EMPTY], PLAYER_X),
+    ([PLAYER_X, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY], PLAYER_O),
+]
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = PositionAnalyzer(3)
+    yield analyzer
+    analyzer.close()
+
+
+def wait_for_result(analyzer, board, player):
+    deadline = time.monotonic() + 30
+    while analyzer.result(board, player) is None:
+        assert time.monotonic() < deadline, "the analyzer did not answer"
+        time.sleep(0.01)
+    return analyzer.result(board, player)
+
+
+def test_results_match_the_engine(analyzer):
+    engine = Engine(3)
+    for board, player in POSITIONS:
+        analyzer.request(board, player)
+        values = wait_for_result(analyzer, board, player)
+        scores = engine.score_moves(board, player)
+        assert set(values) == {cell for cell in range(9) if board[cell] is EMPTY} == set(scores)
+        for cell, score in scores.items():
+            value, plies = values[cell]
+            assert value == (WIN if score > 0 else LOSS if score < 0 else DRAW)
+            if value != DRAW:
+                assert plies == engine.win_score - abs(score)
+    # X wins on the spot; anything else lets O win next move
+    assert analyzer.result(*POSITIONS[1])[2] == (WIN, 1)
+    assert analyzer.result(*POSITIONS[1])[8] == (LOSS, 2)
+
+
+def test_the_cache_is_bounded(analyzer, monkeypatch):
+    monkeypatch.setattr(analysis, 'MAX_CACHED_POSITIONS', 2)
+    for board, player in POSITIONS:
+        analyzer.request(board, player)
+        wait_for_result(analyzer, board, player)
+        # A position already done is not queued again
+        analyzer.request(board, player)
+        assert analyzer.queue.empty()
+    # The third result cleared the two before it
+    assert len(analyzer.results) == 1
+    assert analyzer.result(*POSITIONS[0]) is None and analyzer.result(*POSITIONS[2]) is not None
@@ -0,0 +1,72 @@
+import numpy as np
+
+from tic_tac_toe import batch
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, DRAW, other_player
+
+
+def baseline_medium_moves(board, player):
+    """Cells the original medium_ai_move could pick: win, block, center, corner, edge"""
+    engine = Engine(3)
+    for target in (player, other_player(player)):
+        for cell in range(9):
+            if board[cell] is EMPTY:
+                board[cell] = target
+                won = engine.is_winning_move(board, cell)
+                board[cell] = EMPTY
+                if won:
+                    return {cell}
+    if board[4] is EMPTY:
+        return {4}
+    for group in ([0, 2, 6, 8], [1, 3, 5, 7]):
+        free = {cell for cell in group if board[cell] is EMPTY}
+        if free:
+            return free
+
+
+def test_evaluate_boards_matches_engine(positions):
+    engine = Engine(3)
+    boards = batch.encode_boards([board for board, _ in positions])
+    result = batch.evaluate_boards(boards, batch.CELL_O)
+    codes = {batch.CELL_EMPTY: None, batch.CELL_X: PLAYER_X, batch.CELL_O: PLAYER_O}
+    for i, (board, _) in enumerate(positions):
+        winner = engine.check_winner(board)
+        assert result.draws[i] == (winner == DRAW)
+        assert codes[result.winners[i]] == (winner if winner != DRAW else None)
+        if winner:
+            assert not result.legal[i].any()
+
+
+def test_wins_and_blocks(positions):
+    engine = Engine(3)
+    open_positions = [board for board, _ in positions if not engine.check_winner(board)]
+    result = batch.evaluate_boards(batch.encode_boards(open_positions), batch.CELL_O)
+    for i, board in enumerate(open_positions):
+        for cell in range(9):
+            if board[cell] is not EMPTY:
+                assert not result.wins[i, cell] and not result.blocks[i, cell]
+                continue
+            for player, found in ((PLAYER_O, result.wins), (PLAYER_X, result.blocks)):
+                board[cell] = player
+                assert found[i, cell] == engine.is_winning_move(board, cell)
+                board[cell] = EMPTY
+
+
+def test_medium_moves_follow_the_baseline_strategy(positions):
+    engine = Engine(3)
+    rng = np.random.default_rng(7)
+    for player in (PLAYER_X, PLAYER_O):
+        open_positions = [board for board, to_move in positions
+                          if to_move == player and not engine.check_winner(board)]
+        boards = batch.encode_boards(open_positions)
+        for _ in range(3):  # Corners and edges are drawn at random
+            moves = batch.medium_moves(boards, batch.CELL_CODES[player], rng=rng)
+            for board, move in zip(open_positions, moves):
+                assert move in baseline_medium_moves(board, player)
+
+
+def test_medium_moves_pick_every_free_corner():
+    board = [EMPTY, EMPTY, EMPTY, EMPTY, PLAYER_X, EMPTY, EMPTY, EMPTY, EMPTY]
+    boards = batch.encode_boards([board] * 400)
+    moves = batch.medium_moves(boards, batch.CELL_O, rng=np.random.default_rng(0))
+    assert set(moves.tolist()) == {0, 2, 6, 8}
@@ -0,0 +1,42 @@
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, DRAW, other_player
+
+X, O, _ = PLAYER_X, PLAYER_O, EMPTY
+
+
+def test_check_winner():
+    engine = Engine(3)
+    assert engine.check_winner([_] * 9) is None
+    assert engine.check_winner([X, X, X, O, O, _, _, _, _]) == X
+    assert engine.check_winner([O, X, X, _, O, X, _, _, O]) == O
+    assert engine.check_winner([X, O, X, X, O, O, O, X, X]) == DRAW
+
+
+def test_best_move_wins_before_blocking():
+    engine = Engine(3)
+    # O completes the middle row rather than blocking X's top row
+    assert engine.best_move([X, X, _, O, O, _, _, _, _], PLAYER_O) == 5
+    assert engine.best_move([X, X, _, _, O, _, _, _, _], PLAYER_O) == 2
+
+
+def test_best_move_is_lowest_index_on_ties():
+    engine = Engine(3)
+    assert engine.score_moves([_] * 9, PLAYER_X) == {cell: 0 for cell in range(9)}
+    assert engine.best_move([_] * 9, PLAYER_X) == 0
+
+
+def test_perfect_play_draws():
+    engine = Engine(3)
+    board = [_] * 9
+    player = PLAYER_X
+    while not engine.check_winner(board):
+        board[engine.best_move(board, player)] = player
+        player = other_player(player)
+    assert engine.check_winner(board) == DRAW
+
+
+def test_depth_limited_search_only_sees_immediate_wins():
+    # X wins by forking after 0, but one ply shows nothing better than a draw
+    board = [X, _, _, _, O, _, _, _, X]
+    assert Engine(3).score_moves(board, PLAYER_O)[2] < 0
+    assert Engine(3, max_depth=1).score_moves(board, PLAYER_O)[2] == 0
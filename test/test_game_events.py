@@ -0,0 +1,91 @@
+from tic_tac_toe.game_events import GameStatistics, event_message, parse_event
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, DRAW, EMPTY
+
+
+def start(game, difficulty='Hard'):
+    return {'kind': 'game_start', 'game': game, 'mode': 'ai', 'difficulty': difficulty,
+            'first_player': PLAYER_X, 'player_x': 'Ada', 'player_o': 'AI'}
+
+
+def move(game, cell, player, winner=None, kind='move'):
+    return {'kind': kind, 'game': game, 'cell': cell, 'player': player, 'winner': winner}
+
+
+def won_game(game):
+    players = [PLAYER_X, PLAYER_O] * 3
+    cells = [0, 3, 1, 4, 2]
+    events = [start(game)]
+    for cell, player in zip(cells, players):
+        events.append(move(game, cell, player, PLAYER_X if cell == 2 else None))
+    return events
+
+
+def test_event_round_trip():
+    event = move(1, 4, PLAYER_X)
+    assert parse_event(event_message(**event)) == event
+
+
+def test_finished_and_abandoned_games():
+    ended = []
+    stats = GameStatistics(lambda game, start, board, winner: ended.append((game, winner)))
+    for event in won_game(1) + [start(2), move(2, 4, PLAYER_X)] + won_game(3):
+        stats.add(event)
+    # A won game is only counted once the next game starts
+    assert ended == [(1, PLAYER_X)]
+    assert stats.summary()['games_open'] == 1
+    stats.close()
+
+    summary = stats.summary()
+    assert ended == [(1, PLAYER_X), (3, PLAYER_X)]
+    assert summary['games_finished'] == 2 and summary['games_abandoned'] == 1
+    assert summary['games_open'] == 0
+    assert summary['results'] == {'Hard/X': 2}
+    assert summary['moves'] == 11 and summary['inconsistent_events'] == 0
+    # Nothing of a finished game is kept
+    assert stats.current_board is None and stats.start == {}
+
+
+def test_undo_takes_back_a_win():
+    stats = GameStatistics()
+    for event in won_game(1):
+        stats.add(event)
+    stats.add(move(1, 2, PLAYER_X, PLAYER_X, kind='undo'))
+    stats.add(move(1, 8, PLAYER_X))
+    stats.add(move(1, 2, PLAYER_O))
+    stats.add(move(1, 2, PLAYER_O, kind='undo'))
+    stats.add(move(1, 2, PLAYER_O, DRAW, kind='redo'))
+    stats.close()
+    summary = stats.summary()
+    assert summary['results'] == {'Hard/draw': 1}
+    assert summary['games_finished'] == 1 and summary['inconsistent_events'] == 0
+
+
+def test_game_picked_up_mid_way():
+    stats = GameStatistics()
+    stats.add(move(7, 4, PLAYER_X))
+    stats.add(move(7, 4, PLAYER_O))  # Already taken
+    assert stats.game == 7 and stats.current_board[4] == PLAYER_O
+    stats.add(start(8))
+    assert stats.current_board == [EMPTY] * 9
+    summary = stats.summary()
+    assert summary['games_abandoned'] == 1 and summary['inconsistent_events'] == 1
+    assert summary['results'] == {}
+
+
+def test_ai_and_state_events():
+    stats = GameStatistics()
+    stats.add({'kind': 'ai', 'game': 1, 'cell': 4, 'difficulty': 'Hard', 'source': 'book',
+               'search_ms': 0.0, 'nodes': 0})
+    stats.add({'kind': 'ai', 'game': 1, 'cell': 0, 'difficulty': 'Hard', 'source': 'search',
+               'search_ms': 3.0, 'nodes': 120})
+    stats.add({'kind': 'ai', 'game': 1, 'cell': 8, 'difficulty': 'Hard', 'source': 'search',
+               'search_ms': 1.0, 'nodes': 30})
+    for source in ['heuristic', 'random']:
+        stats.add({'kind': 'ai', 'game': 2, 'cell': 4, 'difficulty': 'Medium', 'source': source,
+                   'search_ms': 0.01, 'nodes': 0})
+    stats.add({'kind': 'state', 'previous': 'MENU', 'current': 'PLAYING'})
+    summary = stats.summary()
+    assert summary['ai_sources'] == {'book': 1, 'search': 2, 'heuristic': 1, 'random': 1}
+    assert summary['search_ms_mean'] == 2.0 and summary['search_ms_max'] == 3.0
+    assert summary['search_nodes'] == 150
+    assert summary['transitions'] == {'MENU->PLAYING': 1}
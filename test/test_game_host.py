@@ -0,0 +1,142 @@
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+rclpy = pytest.importorskip('rclpy')
+
+from rclpy.parameter import Parameter  # noqa: E402
+from std_msgs.msg import String  # noqa: E402
+
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, Difficulty, parse_state  # noqa: E402
+
+
+class Published:
+    """Stands in for the state publisher and keeps the lines"""
+
+    def __init__(self):
+        self.lines = []
+
+    def publish(self, msg):
+        self.lines.append(msg.data)
+
+
+@pytest.fixture
+def host():
+    from tic_tac_toe.game_host import GameHost
+    rclpy.init()
+    node = GameHost(parameter_overrides=[
+        Parameter('sessions', value=2),
+        Parameter('ai_workers', value=1),
+        Parameter('ai_batch_size', value=2),
+        Parameter('max_sessions', value=4),
+    ])
+    node.state_publisher = Published()
+    yield node
+    node.shutdown()
+    node.destroy_node()
+    rclpy.shutdown()
+
+
+def send(callback, text):
+    callback(String(data=text))
+
+
+def wait_for_ai(host, sessions):
+    deadline = time.monotonic() + 30
+    while any(session.ai_pending for session in sessions):
+        assert time.monotonic() < deadline, "the AI workers did not answer"
+        time.sleep(0.01)
+        host.apply_ai_results()
+
+
+def test_sessions_are_independent(host):
+    send(host.handle_command, '1 new pvp')
+    send(host.handle_move, '1 4')
+    send(host.handle_move, '1 0')
+    send(host.handle_move, '0 8')
+    wait_for_ai(host, host.sessions.values())
+
+    pvp = parse_state(host.sessions['1'].state_line())
+    assert pvp['board'][4] == PLAYER_X and pvp['board'][0] == PLAYER_O and pvp['mode'] == 'pvp'
+    assert pvp['current_player'] == PLAYER_X
+    hard = parse_state(host.sessions['0'].state_line())
+    assert hard['board'][8] == PLAYER_X and hard['board'].count(PLAYER_O) == 1
+    assert hard['board'][4] in [EMPTY, PLAYER_O] and hard['mode'] == 'hard'
+
+    # Moves for sessions nobody opened are dropped, not opened
+    send(host.handle_move, '7 4')
+    assert '7' not in host.sessions
+    # An occupied cell is refused
+    send(host.handle_move, '1 4')
+    assert host.sessions['1'].board.count(EMPTY) == 7
+
+
+def test_ai_moves_are_sent_in_batches(host, monkeypatch):
+    from tic_tac_toe.game_host import GameSession
+    submitted = []
+    submit = host.pool.submit
+    monkeypatch.setattr(host.pool, 'submit', lambda fn, jobs: submitted.append(len(jobs)) or submit(fn, jobs))
+    sessions = []
+    for session_id in 'abc':
+        session = host.sessions[session_id] = GameSession(session_id, Difficulty.IMPOSSIBLE)
+        session.reset(PLAYER_O)
+        sessions.append(session)
+    host.schedule_ai(sessions + [host.sessions['0']])  # Station 0 waits for X
+    wait_for_ai(host, sessions)
+    assert submitted == [2, 1]
+    for session in sessions:
+        assert session.board.count(PLAYER_O) == 1 and session.current_player == PLAYER_X
+    assert host.sessions['0'].board == [EMPTY] * 9
+
+
+def test_stale_ai_results_are_dropped(host):
+    session = host.sessions['0']
+    send(host.handle_move, '0 4')
+    version = session.version
+    session.reset(PLAYER_X)  # The game moved on before the result came back
+    host.ai_results.put(('0', version, 0))
+    host.apply_ai_results()
+    assert session.board == [EMPTY] * 9
+
+
+def test_failed_workers_fall_back_to_the_host_engine(host, monkeypatch):
+    def broken(fn, jobs):
+        raise BrokenProcessPool("worker died")
+    monkeypatch.setattr(host.pool, 'submit', broken)
+    send(host.handle_move, '0 4')
+    session = host.sessions['0']
+    host.apply_ai_results()
+    assert not session.ai_pending and session.board.count(PLAYER_O) == 1
+
+    # A batch whose future failed is played the same way
+    session = host.sessions['1']
+    session.reset(PLAYER_O)
+    session.ai_pending = True
+    future = Future()
+    future.set_exception(RuntimeError("worker died"))
+    host.ai_done(future, [('1', session.version, '.........', Difficulty.HARD.value)])
+    host.apply_ai_results()
+    assert not session.ai_pending and session.board.count(PLAYER_O) == 1
+
+
+def test_only_idle_sessions_opened_by_new_are_dropped_when_full(host):
+    for session_id in ['a', 'b']:
+        send(host.handle_command, f'{session_id} new pvp')
+    for session in host.sessions.values():
+        session.last_active -= 3600
+    host.log_stats()
+    assert sorted(host.sessions) == ['0', '1', 'a', 'b']
+
+    send(host.handle_command, 'c new pvp')
+    assert sorted(host.sessions) == ['0', '1', 'c']
+    assert {'a removed', 'b removed'} <= set(host.state_publisher.lines)
+    # The stations still take moves
+    send(host.handle_move, '0 4')
+    assert host.sessions['0'].board[4] == PLAYER_X
+
+    # Busy sessions are kept and the new one is refused
+    send(host.handle_command, 'd new pvp')
+    send(host.handle_command, 'e new pvp')
+    assert sorted(host.sessions) == ['0', '1', 'c', 'd']
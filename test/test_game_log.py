@@ -0,0 +1,73 @@
+import pytest
+
+from tic_tac_toe.game_log import (GameLogReader, GameLogWriter, GameRecord, decode_record,
+                                  encode_record, pack_moves, unpack_moves)
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, DRAW, Difficulty
+
+
+def record(winner=PLAYER_X, difficulty=Difficulty.HARD, moves=(4, 0, 8, 2, 6), first_player=PLAYER_X):
+    return GameRecord(player_x='Ada', player_o='AI', difficulty=difficulty, first_player=first_player,
+                      winner=winner, moves=list(moves), started=1700000000.0, finished=1700000012.5,
+                      board_size=3)
+
+
+def test_pack_moves():
+    moves = [4, 0, 8, 2, 6, 15]
+    assert len(pack_moves(moves)) == 3
+    assert unpack_moves(pack_moves(moves), len(moves)) == moves
+    with pytest.raises(ValueError):
+        pack_moves([16])
+
+
+def test_record_round_trip():
+    for original in [record(), record(DRAW, None, range(9), PLAYER_O), record(PLAYER_O, Difficulty.EASY, [])]:
+        frame = encode_record(original)
+        assert decode_record(frame[2:]) == original
+
+
+def test_writer_and_reader(tmp_path):
+    path = tmp_path / 'games.log'
+    writer = GameLogWriter(str(path), flush_interval=0.05)
+    games = [record(), record(DRAW), record(PLAYER_O, None), record(PLAYER_X)]
+    for game in games:
+        writer.append(game)
+    writer.close()
+    # Reopening appends after the existing records
+    writer = GameLogWriter(str(path))
+    writer.append(record(DRAW, Difficulty.EASY))
+    writer.close()
+
+    with GameLogReader(str(path)) as reader:
+        assert list(reader) == games + [record(DRAW, Difficulty.EASY)]
+        assert reader.result_counts() == {
+            (Difficulty.HARD, PLAYER_X): 2,
+            (Difficulty.HARD, DRAW): 1,
+            (None, PLAYER_O): 1,
+            (Difficulty.EASY, DRAW): 1,
+        }
+
+
+def test_partial_tail_is_skipped(tmp_path):
+    path = tmp_path / 'games.log'
+    writer = GameLogWriter(str(path))
+    writer.append(record())
+    writer.close()
+    with open(path, 'ab') as f:
+        f.write(encode_record(record(DRAW))[:-3])
+    with GameLogReader(str(path)) as reader:
+        assert list(reader) == [record()]
+
+
+@pytest.mark.parametrize('content', [b'T', b'TTTL', b'ABCDE\x01', b'TTTL\x09'])
+def test_reader_rejects_other_files(tmp_path, content):
+    path = tmp_path / 'games.log'
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        GameLogReader(str(path))
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'games.log'
+    path.write_bytes(b'')
+    with GameLogReader(str(path)) as reader:
+        assert list(reader) == [] and reader.result_counts() == {}
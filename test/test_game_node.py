@@ -0,0 +1,263 @@
+import pytest
+
+rclpy = pytest.importorskip('rclpy')
+pygame = pytest.importorskip('pygame')
+
+from rclpy.parameter import Parameter  # noqa: E402
+
+from tic_tac_toe.game_log import GameLogReader  # noqa: E402
+from tic_tac_toe.leaderboard import Leaderboard, Standing  # noqa: E402
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, Difficulty  # noqa: E402
+
+
+@pytest.fixture
+def game(tmp_path, request):
+    """An offscreen game node whose files live in a temporary directory
+
+    Parametrize indirectly with a dict to set more parameters.
+    """
+    from tic_tac_toe.tic_tac_toe_ros import TicTacToe
+    parameters = {
+        'render_mode': 'offscreen',
+        'game_log_path': str(tmp_path / 'games.log'),
+        'leaderboard_path': str(tmp_path / 'leaderboard.db'),
+        'diagnostics_dump_dir': str(tmp_path),
+    }
+    parameters.update(getattr(request, 'param', {}))
+    rclpy.init()
+    node = TicTacToe(parameter_overrides=[Parameter(name, value=value) for name, value in parameters.items()])
+    yield node
+    node.trigger_shutdown()
+    node.destroy_node()
+    rclpy.shutdown()
+
+
+class Published:
+    """Stands in for a publisher and keeps the messages"""
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, msg):
+        self.messages.append(msg)
+
+
+def finish_animations(game):
+    game.animations.update(game.ticks() + 60000)
+
+
+def test_undo_takes_back_the_ai_reply(game):
+    game.ai_difficulty = Difficulty.HARD
+    game.start_ai_game('PLAYER')
+    game.apply_move(0)
+    game.ai_move()
+    finish_animations(game)
+    assert game.board.count(PLAYER_O) == 1
+
+    assert game.undo()
+    assert game.board == [EMPTY] * 9
+    assert game.current_player == PLAYER_X
+    assert game.redo()
+    assert game.board.count(PLAYER_X) == 1 and game.board.count(PLAYER_O) == 1
+    assert game.current_player == PLAYER_X
+
+
+def test_redo_after_undo_while_the_ai_thinks_lets_the_ai_move(game):
+    game.ai_difficulty = Difficulty.HARD
+    game.start_ai_game('PLAYER')
+    game.apply_move(0)
+    game.ai_move()
+    assert game.ai_thinking
+
+    assert game.undo()
+    assert not game.ai_thinking and game.board == [EMPTY] * 9
+    assert game.redo()
+    assert game.board[0] == PLAYER_X and game.current_player == PLAYER_O
+    assert game.ai_thinking  # The cancelled reply is played again
+    finish_animations(game)
+    assert game.board.count(PLAYER_O) == 1 and game.current_player == PLAYER_X
+
+
+def test_undo_keeps_the_ai_opening(game):
+    game.ai_difficulty = Difficulty.HARD
+    game.start_ai_game('AI')
+    finish_animations(game)
+    assert game.board.count(PLAYER_O) == 1
+    assert not game.undo()
+    assert game.board.count(PLAYER_O) == 1
+
+
+def test_undo_rolls_back_the_score(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    assert game.winner == PLAYER_X and game.score[PLAYER_X] == 1
+    assert game.undo()
+    assert game.winner is None and game.score[PLAYER_X] == 0
+    assert game.redo()
+    assert game.winner == PLAYER_X and game.score[PLAYER_X] == 1
+
+
+def logged_games(game):
+    game.game_log.close()
+    with GameLogReader(game.game_log.path) as reader:
+        return list(reader)
+
+
+def test_a_game_is_logged_once_across_undo_and_redo(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    game.undo()
+    game.apply_move(2)
+    game.undo()
+    game.redo()
+    game.reset_game()
+    game.reset_game()
+    records = logged_games(game)
+    assert len(records) == 1
+    assert records[0].winner == PLAYER_X and records[0].moves == [0, 3, 1, 4, 2]
+
+
+def test_the_finish_played_after_an_undo_is_logged(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    assert game.undo()
+    for cell in [8, 5]:
+        game.apply_move(cell)
+    assert game.winner == PLAYER_O and game.score == {PLAYER_X: 0, PLAYER_O: 1}
+    game.start_pvp_game()
+    records = logged_games(game)
+    assert len(records) == 1
+    assert records[0].winner == PLAYER_O and records[0].moves == [0, 3, 1, 4, 8, 5]
+
+
+def test_a_game_taken_back_and_left_is_not_logged(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    game.undo()
+    game.reset_game()
+    assert logged_games(game) == []
+
+
+def test_the_last_game_is_logged_when_the_session_ends(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    game.trigger_deactivate()
+    records = logged_games(game)
+    assert [record.winner for record in records] == [PLAYER_X]
+
+
+def test_a_game_is_counted_once_on_the_leaderboard(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    game.undo()
+    game.redo()
+    game.reset_game()
+    game.leaderboard.close()
+    leaderboard = Leaderboard(game.get_parameter('leaderboard_path').value)
+    try:
+        assert leaderboard.top_players() == [Standing(game.player_x_name, 1, 0, 0),
+                                             Standing(game.player_o_name, 0, 1, 0)]
+    finally:
+        leaderboard.close()
+
+
+def test_the_leaderboard_counts_the_finish_played_after_an_undo(game):
+    game.start_pvp_game()
+    for cell in [0, 3, 1, 4, 2]:
+        game.apply_move(cell)
+    game.undo()
+    for cell in [8, 5]:
+        game.apply_move(cell)
+    game.trigger_deactivate()
+    game.leaderboard.close()
+    leaderboard = Leaderboard(game.get_parameter('leaderboard_path').value)
+    try:
+        assert leaderboard.top_players() == [Standing(game.player_o_name, 1, 0, 0),
+                                             Standing(game.player_x_name, 0, 1, 0)]
+    finally:
+        leaderboard.close()
+
+
+def test_shutdown_writes_the_profiles(tmp_path):
+    from tic_tac_toe.tic_tac_toe_ros import TicTacToe
+    rclpy.init()
+    try:
+        node = TicTacToe(parameter_overrides=[
+            Parameter('render_mode', value='offscreen'),
+            Parameter('profile', value=True),
+            Parameter('profile_dir', value=str(tmp_path / 'profiles')),
+            Parameter('game_log_path', value=str(tmp_path / 'games.log')),
+            Parameter('leaderboard_path', value=str(tmp_path / 'leaderboard.db')),
+            Parameter('diagnostics_dump_dir', value=str(tmp_path)),
+        ])
+        node.run_frame()
+        # Ctrl-C goes straight from active to shutdown
+        node.trigger_shutdown()
+        node.destroy_node()
+    finally:
+        rclpy.shutdown()
+    assert sorted(path.name for path in (tmp_path / 'profiles').iterdir()) == ['MENU.prof', 'MENU.txt']
+
+
+@pytest.mark.parametrize('game', [{'image_publish_rate': 10.0}], indirect=True)
+def test_frames_are_published_only_when_the_screen_changes(game):
+    game.image_publisher = published = Published()
+    game.run_frame()
+    game.publish_frame()
+    assert len(published.messages) == 1
+    msg = published.messages[0]
+    width, height = game.screen.get_size()
+    assert (msg.width, msg.height, msg.encoding, msg.step) == (width, height, 'rgb8', width * 3)
+    assert bytes(msg.data) == pygame.image.tostring(game.screen, 'RGB')
+
+    # An idle screen is not even compared
+    game.run_frame()
+    assert not game.frame_dirty
+    game.publish_frame()
+    assert len(published.messages) == 1
+
+    # Clicking "Player vs Player" draws the board
+    button = game.menu_buttons[1].rect
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=button.center, button=1))
+    game.run_frame()
+    game.publish_frame()
+    assert len(published.messages) == 2
+    assert bytes(published.messages[1].data) == pygame.image.tostring(game.screen, 'RGB')
+
+
+@pytest.mark.parametrize('name, value', [
+    ('cell_size', 20),
+    ('window_width', -1),
+    ('x_color', [300, 0, 0]),
+    ('line_color', [0, 0]),
+    ('ai_difficulty', 'godlike'),
+    ('board_size', 4),  # Only read at startup
+])
+def test_invalid_parameter_changes_are_rejected(game, name, value):
+    size = game.screen.get_size()
+    before = (game.player_x_color, dict(game.colors), game.ai_difficulty)
+    result = game.handle_parameter_change([Parameter(name, value=value)])
+    assert not result.successful and result.reason
+    assert game.screen.get_size() == size
+    assert (game.player_x_color, game.colors, game.ai_difficulty) == before
+
+
+def test_a_geometry_change_rebuilds_the_screen_and_the_layout(game):
+    game.name_input_box.text = 'Ada'
+    game.frame_dirty = False
+    result = game.handle_parameter_change([Parameter('cell_size', value=100),
+                                           Parameter('x_color', value=[10, 20, 30])])
+    assert result.successful
+    # A zero window size fits the board
+    assert game.cell_size == 100 and game.screen.get_size() == (400, 600)
+    assert game.menu_buttons[0].rect.centerx == 200
+    assert game.game_menu_button.rect.right == 400 - 20
+    assert game.name_input_box.text == 'Ada'
+    assert game.player_x_color == (10, 20, 30)
+    assert game.frame_dirty
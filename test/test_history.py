@@ -0,0 +1,36 @@
+from tic_tac_toe.history import MoveHistory
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O
+
+
+def test_undo_and_redo():
+    history = MoveHistory()
+    assert not history.can_undo() and history.undo() is None
+    history.push(4, PLAYER_X)
+    history.push(0, PLAYER_O)
+    assert len(history) == 2
+    assert history.undo().cell == 0
+    assert len(history) == 1 and history.last().cell == 4
+    assert history.can_redo()
+    assert history.redo().cell == 0
+    assert not history.can_redo() and history.redo() is None
+    assert [move.cell for move in history.played()] == [4, 0]
+
+
+def test_push_drops_the_redo_tail():
+    history = MoveHistory()
+    for cell, player in [(4, PLAYER_X), (0, PLAYER_O), (8, PLAYER_X)]:
+        history.push(cell, player)
+    history.undo()
+    history.undo()
+    history.push(2, PLAYER_O)
+    assert not history.can_redo()
+    assert [move.cell for move in history.played()] == [4, 2]
+
+
+def test_winner_is_kept_with_the_move():
+    history = MoveHistory()
+    history.push(2, PLAYER_X, winner=PLAYER_X)
+    move = history.undo()
+    assert move.winner == PLAYER_X
+    history.clear()
+    assert len(history) == 0 and not history.can_redo()
@@ -0,0 +1,76 @@
+import sqlite3
+import time
+
+import pytest
+
+from tic_tac_toe.leaderboard import ALL, PVP, Leaderboard, Standing
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, DRAW, Difficulty
+
+
+def wait_for(leaderboard, count):
+    """Wait until the writer thread has committed `count` games"""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        rows = leaderboard.reader.execute("SELECT COUNT(*) FROM games").fetchone()
+        if rows[0] >= count:
+            return
+        time.sleep(0.01)
+    pytest.fail("games were not committed")
+
+
+def record_games(leaderboard):
+    now = time.time()
+    leaderboard.record_game('Ada', 'AI', Difficulty.HARD, DRAW, now)
+    leaderboard.record_game('Ada', 'AI', Difficulty.EASY, PLAYER_X, now)
+    leaderboard.record_game('Bob', 'AI', Difficulty.EASY, PLAYER_O, now)
+    leaderboard.record_game('Ada', 'Bob', None, PLAYER_X, now)
+
+
+def test_in_memory_leaderboard():
+    leaderboard = Leaderboard(':memory:', flush_interval=0.01)
+    other = Leaderboard(':memory:', flush_interval=0.01)
+    try:
+        record_games(leaderboard)
+        wait_for(leaderboard, 4)
+        assert leaderboard.top_players() == [
+            Standing('Ada', 2, 0, 1),
+            Standing('AI', 1, 1, 1),
+            Standing('Bob', 0, 2, 0),
+        ]
+        assert leaderboard.top_players(Difficulty.EASY) == [Standing('Ada', 1, 0, 0), Standing('AI', 1, 1, 0),
+                                                            Standing('Bob', 0, 1, 0)]
+        assert leaderboard.player_stats('Bob') == {
+            'Easy': Standing('Bob', 0, 1, 0),
+            PVP: Standing('Bob', 0, 1, 0),
+            ALL: Standing('Bob', 0, 2, 0),
+        }
+        # Every in-memory leaderboard is a database of its own
+        assert other.top_players() == []
+    finally:
+        leaderboard.close()
+        other.close()
+
+
+def test_tallies_persist(tmp_path):
+    path = str(tmp_path / 'board' / 'leaderboard.db')
+    leaderboard = Leaderboard(path)
+    record_games(leaderboard)
+    leaderboard.close()  # Commits the queued games
+
+    leaderboard = Leaderboard(path)
+    leaderboard.record_game('Ada', 'AI', Difficulty.HARD, PLAYER_X, time.time())
+    leaderboard.close()
+    leaderboard = Leaderboard(path)
+    try:
+        assert leaderboard.top_players(Difficulty.HARD) == [Standing('Ada', 1, 0, 1), Standing('AI', 0, 1, 1)]
+        assert leaderboard.top_players(limit=1) == [Standing('Ada', 3, 0, 1)]
+    finally:
+        leaderboard.close()
+
+
+def test_close_twice_closes_the_reader():
+    leaderboard = Leaderboard(':memory:')
+    leaderboard.close()
+    leaderboard.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        leaderboard.top_players()
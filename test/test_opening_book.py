@@ -0,0 +1,61 @@
+import random
+import struct
+
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.opening_book import BOOK_HEADER, OpeningBook, book_key, generate_book
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, board_from_key
+
+
+def test_shipped_book_matches_a_regenerated_one():
+    shipped = OpeningBook.load_default(3, 3)
+    generated = generate_book(3, 3, depth=4)
+    assert (shipped.depth, list(shipped.keys), list(shipped.moves), list(shipped.weights)) == \
+        (generated.depth, list(generated.keys), list(generated.moves), list(generated.weights))
+
+
+def test_book_moves_are_optimal():
+    book = OpeningBook.load_default(3, 3)
+    engine = Engine(3)
+    for key in sorted(set(book.keys)):
+        player = PLAYER_O if key & 1 else PLAYER_X
+        board = board_from_key(key >> 1)
+        scores = engine.score_moves(board, player)
+        best = max(scores.values())
+        for move, weight in book.entries(board, player):
+            assert scores[move] == best
+            assert weight >= 1
+
+
+def test_probe():
+    book = OpeningBook.load_default(3, 3)
+    board = [EMPTY] * 9
+    assert book.probe(board, PLAYER_X, randomize=False) in range(9)
+    random.seed(3)
+    assert {book.probe(board, PLAYER_X) for _ in range(200)} == {move for move, _ in book.entries(board, PLAYER_X)}
+    # Past the book depth every probe misses
+    full = [PLAYER_X, PLAYER_O, PLAYER_X, PLAYER_O, PLAYER_X, EMPTY, EMPTY, EMPTY, EMPTY]
+    assert book.entries(full, PLAYER_O) == []
+    assert book.probe(full, PLAYER_O) is None
+
+
+def test_save_and_load(tmp_path):
+    book = generate_book(3, 3, depth=2)
+    path = tmp_path / 'book.bin'
+    book.save(path)
+    loaded = OpeningBook.load(path)
+    assert (loaded.board_size, loaded.win_length, loaded.depth) == (3, 3, 2)
+    assert list(loaded.keys) == list(book.keys)
+    assert list(loaded.moves) == list(book.moves)
+    assert list(loaded.weights) == list(book.weights)
+    assert list(loaded.keys) == sorted(loaded.keys)
+    assert book_key([EMPTY] * 9, PLAYER_X) in loaded.keys
+
+
+def test_keys_are_stored_little_endian(tmp_path):
+    book = generate_book(3, 3, depth=2)
+    path = tmp_path / 'book.bin'
+    book.save(path)
+    data = path.read_bytes()
+    count = len(book)
+    assert len(data) == BOOK_HEADER.size + count * 6
+    assert list(struct.unpack_from(f'<{count}I', data, BOOK_HEADER.size)) == list(book.keys)
@@ -0,0 +1,28 @@
+from tic_tac_toe.rules import (PLAYER_X, PLAYER_O, EMPTY, DIFFICULTIES, Difficulty, board_from_key,
+                               format_removal, format_state, other_player, parse_state, position_key, win_lines)
+
+
+def test_win_lines():
+    assert len(win_lines(3)) == 8
+    assert len(win_lines(4)) == 10 and len(win_lines(4, 3)) == 24
+    assert (0, 4, 8) in win_lines(3) and (2, 4, 6) in win_lines(3)
+
+
+def test_position_keys():
+    board = [PLAYER_X, EMPTY, PLAYER_O, EMPTY, PLAYER_X, EMPTY, EMPTY, EMPTY, PLAYER_O]
+    assert board_from_key(position_key(board)) == board
+    assert position_key([EMPTY] * 9) == 0
+    assert other_player(PLAYER_X) == PLAYER_O and other_player(PLAYER_O) == PLAYER_X
+
+
+def test_state_lines():
+    board = [PLAYER_X, EMPTY, EMPTY, EMPTY, PLAYER_O, EMPTY, EMPTY, EMPTY, EMPTY]
+    line = format_state('7', board, PLAYER_X, None, {PLAYER_X: 2, PLAYER_O: 1}, Difficulty.HARD)
+    assert line == '7 X...O.... X - 2 1 hard'
+    assert parse_state(line) == {
+        'session_id': '7', 'board': board, 'current_player': PLAYER_X, 'winner': None,
+        'score': {PLAYER_X: 2, PLAYER_O: 1}, 'mode': 'hard', 'removed': False,
+    }
+    assert parse_state(format_state('a', board, PLAYER_O, 'DRAW', {PLAYER_X: 0, PLAYER_O: 0}, None))['mode'] == 'pvp'
+    assert parse_state(format_removal('7')) == {'session_id': '7', 'removed': True}
+    assert DIFFICULTIES['impossible'] == Difficulty.IMPOSSIBLE
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY
+from tic_tac_toe.solver import PositionSolver, solve_stream
+
+
+@pytest.fixture(scope='module')
+def solver():
+    return PositionSolver()
+
+
+def test_parse(solver):
+    assert solver.parse('.........') == ([EMPTY] * 9, PLAYER_X)
+    # The side with fewer stones moves, unless the line says otherwise
+    assert solver.parse('x-_......') == ([PLAYER_X] + [EMPTY] * 8, PLAYER_O)
+    assert solver.parse('O........') == ([PLAYER_O] + [EMPTY] * 8, PLAYER_X)
+    assert solver.parse('XX.OO.... o')[1] == PLAYER_O
+
+
+@pytest.mark.parametrize('line, reason', [
+    ('XX......', "expected 9 cells"),
+    ('X?.......', "bad cell '?'"),
+    ('XXX......', "impossible stone counts"),
+    ('......... Z', "bad side to move 'Z'"),
+    ('X........ X', "X cannot be to move"),
+    ('X.. O.. ...', "expected '<cells> [X|O]'"),
+    ('XXXOOO...', "both sides have a line"),
+    ('XXX.OO.O. X', "side to move has already won"),
+])
+def test_invalid_lines(solver, line, reason):
+    assert solver.answer(line) == f"{line} invalid {reason}"
+
+
+def test_answers(solver):
+    assert solver.answer('.........') == '......... X draw 9 0,1,2,3,4,5,6,7,8'
+    assert solver.answer('XX.OO....') == 'XX.OO.... X win 1 2'
+    assert solver.answer('XX.OO.... O') == 'XX.OO.... O win 1 5'
+    assert solver.answer('XXXOO....') == 'XXXOO.... O loss 0 -'
+    assert solver.answer('XOXXOOOXX') == 'XOXXOOOXX O draw 0 -'
+    # Blank lines stay blank
+    assert solver.answer('   \n') == ''
+
+
+def test_lines_keep_their_order_across_workers():
+    lines = ['.........\n', 'XX.OO....\n', '\n', 'bad\n', 'X........\n', 'XOXXOOOXX\n', 'X.O.X.O..\n'] * 30
+    serial = io.StringIO()
+    assert solve_stream(lines, serial, chunk_size=7) == 30
+    parallel = io.StringIO()
+    assert solve_stream(lines, parallel, workers=3, chunk_size=4) == 53
+    assert parallel.getvalue() == serial.getvalue()
+    answers = serial.getvalue().split('\n')[:-1]
+    assert len(answers) == len(lines)
+    assert answers[:4] == ['......... X draw 9 0,1,2,3,4,5,6,7,8', 'XX.OO.... X win 1 2', '',
+                           "bad invalid expected 9 cells"]
@@ -0,0 +1,75 @@
+import pytest
+
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY
+from tic_tac_toe.tablebase import (RESULT_DRAW, RESULT_LOSS, RESULT_WIN, Tablebase, build_tablebase,
+                                   layer_index, layer_positions, layer_size, tablebase_path)
+
+
+@pytest.fixture(scope='module')
+def tablebase():
+    tablebase = Tablebase.load_default(3, 3)
+    yield tablebase
+    tablebase.close()
+
+
+def test_layer_index_is_a_perfect_hash():
+    for stones in range(10):
+        size = layer_size(9, stones)
+        us, them = layer_positions(9, stones, 0, size)
+        assert len(set(zip(us.tolist(), them.tolist()))) == size
+        assert layer_index(us, them, 9, stones).tolist() == list(range(size))
+
+
+def test_build_matches_the_shipped_tablebase(tmp_path):
+    output = str(tmp_path / 'tablebase.bin')
+    build_tablebase(3, 3, output, str(tmp_path / 'work'), chunk_size=1000, log=lambda message: None)
+    with open(output, 'rb') as built, open(tablebase_path(3, 3), 'rb') as shipped:
+        assert built.read() == shipped.read()
+
+
+def test_resume_after_an_interrupted_layer(tmp_path):
+    work_dir = tmp_path / 'work'
+    output = str(tmp_path / 'tablebase.bin')
+    build_tablebase(3, 3, output, str(work_dir), chunk_size=500, log=lambda message: None)
+    expected = open(output, 'rb').read()
+    # Drop two layers and leave a chunk and a bit of one behind
+    layer = (work_dir / 'layer_04.bin').read_bytes()
+    (work_dir / 'layer_04.bin').unlink()
+    (work_dir / 'layer_03.bin').unlink()
+    (work_dir / 'layer_04.bin.part').write_bytes(layer[:700])
+    logged = []
+    build_tablebase(3, 3, output, str(work_dir), chunk_size=500, log=logged.append)
+    assert open(output, 'rb').read() == expected
+    assert any('resumed at 500' in message for message in logged)
+
+
+def test_scores_match_the_search(tablebase, positions):
+    engine = Engine(3)
+    for board, player in positions:
+        if engine.check_winner(board):
+            continue
+        assert tablebase.score(board, player) == engine.negamax(list(board), player), (board, player)
+
+
+def test_probe(tablebase):
+    empty = [EMPTY] * 9
+    assert tablebase.probe(empty, PLAYER_X) == (RESULT_DRAW, 9)
+    # X to move completes the top row
+    board = [PLAYER_X, PLAYER_X, EMPTY, PLAYER_O, PLAYER_O, EMPTY, EMPTY, EMPTY, EMPTY]
+    assert tablebase.probe(board, PLAYER_X) == (RESULT_WIN, 1)
+    # O has just won
+    board = [PLAYER_X, PLAYER_X, EMPTY, PLAYER_O, PLAYER_O, PLAYER_O, PLAYER_X, EMPTY, EMPTY]
+    assert tablebase.probe(board, PLAYER_X) == (RESULT_LOSS, 0)
+    # Stone counts that do not leave `player` to move
+    assert tablebase.probe([PLAYER_X] + [EMPTY] * 8, PLAYER_X) is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'tablebase.bin'
+    path.write_bytes(b'TTTB\x01\x03\x03' + bytes(10))
+    with pytest.raises(ValueError):
+        Tablebase(str(path))
+    path.write_bytes(open(tablebase_path(3, 3), 'rb').read()[:-1])
+    with pytest.raises(ValueError):
+        Tablebase(str(path))
@@ -0,0 +1,84 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from tic_tac_toe.rules import DRAW
+from tic_tac_toe.tournament import (ELO_SCALE, TournamentPlayer, fit_elo, play_game, run_tournament,
+                                    separated)
+
+
+def results(scores, games):
+    """games and points matrices from {(i, j): expected score of i} with `games` games per pair"""
+    count = 1 + max(max(pair) for pair in scores)
+    games_matrix = np.zeros((count, count))
+    points = np.zeros((count, count))
+    for (i, j), score in scores.items():
+        games_matrix[i, j] = games_matrix[j, i] = games
+        points[i, j] = score * games
+        points[j, i] = (1 - score) * games
+    return games_matrix, points
+
+
+def test_fit_elo_matches_the_logistic_model():
+    games, points = results({(0, 1): 0.75}, 400)
+    ratings, errors = fit_elo(games, points, prior_draws=0)
+    assert ratings[0] - ratings[1] == pytest.approx(ELO_SCALE * math.log(3))
+    assert ratings.sum() == pytest.approx(0)
+    # Binomial error of the log-odds: 1 / sqrt(n p (1 - p)), split over the two ratings
+    assert errors[0] == pytest.approx(ELO_SCALE / math.sqrt(400 * 0.75 * 0.25) / 2)
+
+
+def test_fit_elo_orders_players_and_shrinks_errors_with_games():
+    scores = {(0, 1): 0.7, (0, 2): 0.9, (1, 2): 0.7}
+    ratings, few = fit_elo(*results(scores, 20))
+    assert list(np.argsort(-ratings)) == [0, 1, 2]
+    _, many = fit_elo(*results(scores, 2000))
+    assert (many < few).all()
+
+
+def test_a_player_that_never_loses_gets_a_finite_rating():
+    ratings, errors = fit_elo(*results({(0, 1): 1.0}, 50))
+    assert np.isfinite(ratings).all() and np.isfinite(errors).all()
+    assert ratings[0] > ratings[1]
+
+
+def test_separated():
+    scores = {(0, 1): 0.8, (0, 2): 0.95, (1, 2): 0.8}
+    games, points = results(scores, 400)
+    ratings, errors = fit_elo(games, points)
+    draws = np.zeros_like(games)
+    assert separated(ratings, errors, games, draws)
+
+    games, points = results(scores, 4)
+    ratings, errors = fit_elo(games, points)
+    assert not separated(ratings, errors, games, draws)
+
+
+def test_perfect_players_that_only_draw_are_settled():
+    # 0 and 1 draw every game, and both beat 2
+    games, points = results({(0, 1): 0.5, (0, 2): 1.0, (1, 2): 1.0}, 200)
+    draws = np.zeros_like(games)
+    draws[0, 1] = draws[1, 0] = 200
+    ratings, errors = fit_elo(games, points)
+    assert separated(ratings, errors, games, draws)
+    assert not separated(ratings, errors, games, np.zeros_like(games))
+
+
+@pytest.mark.parametrize('spec', ['wizard', 'depth', 'mcts:0', 'budget:-3'])
+def test_bad_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        TournamentPlayer(spec)
+
+
+def test_perfect_players_draw():
+    rng = random.Random(1)
+    assert play_game(TournamentPlayer('impossible'), TournamentPlayer('depth:9+tb'), rng) == DRAW
+
+
+def test_run_tournament():
+    ratings, errors, games, points, rounds = run_tournament(['easy', 'impossible'], games_per_round=10,
+                                                            max_rounds=3, min_rounds=1, log=lambda message: None)
+    assert games[0, 1] == 10 * rounds
+    assert points[1, 0] > points[0, 1] and ratings[1] > ratings[0]
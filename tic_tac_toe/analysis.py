@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import queue
+import threading
+
+import pygame
+
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import EMPTY, position_key
+
+WIN = 'win'
+DRAW = 'draw'
+LOSS = 'loss'
+OVERLAY_COLORS = {WIN: (40, 170, 60), DRAW: (150, 150, 150), LOSS: (210, 50, 50)}
+OVERLAY_ALPHA = 70
+MAX_CACHED_POSITIONS = 1 << 16
+
+
+class PositionAnalyzer:
+    """Minimax values of every empty cell, computed on a background thread
+
+    `request` only queues the position, so the caller never waits for a
+    search; `result` returns {cell: (value, plies)} once the worker is
+    done, the value being win, draw or loss for the side to move if it
+    plays that cell. Results are cached by position key.
+    """
+
+    def __init__(self, board_size=3, win_length=None, tablebase=None):
+        # Its own engine: the game's engine and its cache stay on the game thread
+        self.engine = Engine(board_size, win_length, tablebase=tablebase)
+        self.results = {}
+        self.pending = set()
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._work_loop, name='position_analyzer', daemon=True)
+        self.thread.start()
+
+    def request(self, board, player):
+        """Queue a position for analysis unless it is already done or queued"""
+        key = (position_key(board), player)
+        if key in self.results or key in self.pending:
+            return
+        self.pending.add(key)
+        self.queue.put((key, list(board), player))
+
+    def result(self, board, player):
+        return self.results.get((position_key(board), player))
+
+    def _work_loop(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            key, board, player = job
+            values = {}
+            for cell, score in self.engine.score_moves(board, player).items():
+                if score > 0:
+                    values[cell] = (WIN, self.engine.win_score - score)
+                elif score < 0:
+                    values[cell] = (LOSS, self.engine.win_score + score)
+                else:
+                    values[cell] = (DRAW, board.count(EMPTY))
+            if len(self.results) >= MAX_CACHED_POSITIONS:
+                self.results.clear()
+                self.engine.clear_cache()
+            self.results[key] = values
+            self.pending.discard(key)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+def render_overlay(values, board_size, cell_size, font):
+    """Translucent board-sized layer tinting every analysed cell by its value"""
+    surface = pygame.Surface((board_size * cell_size, board_size * cell_size), pygame.SRCALPHA)
+    for cell, (value, plies) in values.items():
+        row, col = divmod(cell, board_size)
+        rect = pygame.Rect(col * cell_size, row * cell_size, cell_size, cell_size).inflate(-6, -6)
+        surface.fill(OVERLAY_COLORS[value] + (OVERLAY_ALPHA,), rect)
+        label = font.render(f"{value[0].upper()}{plies}", True, OVERLAY_COLORS[value])
+        surface.blit(label, (rect.centerx - label.get_width() // 2, rect.centery - label.get_height() // 2))
+    return surface
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+
+class Animation:
+    """A named step that runs for `duration` ms and then calls `on_finish`"""
+
+    def __init__(self, name, duration, on_finish=None):
+        self.name = name
+        self.duration = duration
+        self.on_finish = on_finish
+        self.start = None
+
+
+class AnimationQueue:
+    """Plays animations one after another on a scaled clock
+
+    `time_scale` divides every duration, so 2.0 plays twice as fast. In
+    fast mode nothing is queued: `play` calls `on_finish` right away, so
+    the game goes through exactly the same state changes without waiting.
+    Times are the game's millisecond ticks, so a replay drives the queue
+    from the recorded clock.
+    """
+
+    def __init__(self, time_scale=1.0, fast=False):
+        self.time_scale = time_scale
+        self.fast = fast
+        self.queue = []
+
+    def play(self, name, duration, now, on_finish=None):
+        """Queue an animation; it starts once the ones ahead of it have finished"""
+        if self.fast or self.time_scale <= 0:
+            if on_finish:
+                on_finish()
+            return
+        animation = Animation(name, duration / self.time_scale, on_finish)
+        if not self.queue:
+            animation.start = now
+        self.queue.append(animation)
+
+    def update(self, now):
+        """Finish every animation whose time is up, chaining the next from its end time"""
+        while self.queue and now - self.queue[0].start >= self.queue[0].duration:
+            animation = self.queue.pop(0)
+            if self.queue:
+                # Measured from when the previous one ended, so a slow frame does not stretch the chain
+                self.queue[0].start = animation.start + animation.duration
+            if animation.on_finish:
+                animation.on_finish()
+
+    def current(self):
+        """Name of the running animation, or None"""
+        return self.queue[0].name if self.queue else None
+
+    def progress(self, now):
+        """Progress (0-1) of the running animation"""
+        if not self.queue:
+            return 1.0
+        animation = self.queue[0]
+        if animation.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - animation.start) / animation.duration))
+
+    def clear(self):
+        """Drop all animations without running their callbacks"""
+        self.queue = []
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, win_lines
+
+# Numeric cell codes used in the (n_boards, cells) arrays
+CELL_EMPTY = 0
+CELL_X = 1
+CELL_O = 2
+CELL_CODES = {EMPTY: CELL_EMPTY, PLAYER_X: CELL_X, PLAYER_O: CELL_O}
+
+# Result of evaluating a batch of boards. `winners` holds CELL_X/CELL_O or
+# CELL_EMPTY, every other field is a boolean array.
+BatchEvaluation = namedtuple('BatchEvaluation', ['winners', 'draws', 'legal', 'wins', 'blocks'])
+
+
+@lru_cache(maxsize=None)
+def line_masks(board_size=3, win_length=None):
+    """Return the (n_lines, cells) 0/1 matrix of winning lines"""
+    lines = win_lines(board_size, win_length)
+    masks = np.zeros((len(lines), board_size * board_size), dtype=np.int16)
+    for i, line in enumerate(lines):
+        masks[i, list(line)] = 1
+    masks.setflags(write=False)
+    return masks
+
+
+def encode_boards(boards):
+    """Convert lists of 'X'/'O'/None cells into an int8 array"""
+    return np.array([[CELL_CODES[cell] for cell in board] for board in boards], dtype=np.int8)
+
+
+def evaluate_boards(boards, player=CELL_O, board_size=3, win_length=None):
+    """Evaluate every board of an (n_boards, cells) array at once
+
+    `wins` marks the empty cells that complete a line for `player` and
+    `blocks` the ones that complete a line for the opponent.
+    """
+    boards = np.asarray(boards)
+    if win_length is None:
+        win_length = board_size
+    masks = line_masks(board_size, win_length)
+    opponent = CELL_X if player == CELL_O else CELL_O
+
+    # One matrix product counts both players' stones on every line
+    stones = np.stack([boards == player, boards == opponent]).astype(np.int16)
+    own_counts, opp_counts = stones @ masks.T
+
+    legal = boards == CELL_EMPTY
+    own_lines = own_counts == win_length
+    opp_lines = opp_counts == win_length
+    winners = np.where(own_lines.any(axis=1), player,
+                       np.where(opp_lines.any(axis=1), opponent, CELL_EMPTY)).astype(np.int8)
+    draws = (winners == CELL_EMPTY) & ~legal.any(axis=1)
+
+    # A line is one move away when it holds k-1 own stones and nothing else
+    open_own = ((own_counts == win_length - 1) & (opp_counts == 0)).astype(np.int16)
+    open_opp = ((opp_counts == win_length - 1) & (own_counts == 0)).astype(np.int16)
+    wins = ((open_own @ masks) > 0) & legal
+    blocks = ((open_opp @ masks) > 0) & legal
+
+    finished = (winners != CELL_EMPTY)[:, None]
+    return BatchEvaluation(winners, draws, legal & ~finished, wins & ~finished, blocks & ~finished)
+
+
+def _first_cell(mask):
+    """Return the lowest set cell of every row, -1 for empty rows"""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), -1)
+
+
+def _random_cell(mask, rng):
+    """Return a uniformly chosen set cell of every row, -1 for empty rows"""
+    keys = rng.random(mask.shape) * mask
+    return np.where(mask.any(axis=1), keys.argmax(axis=1), -1)
+
+
+def medium_moves(boards, player=CELL_O, board_size=3, win_length=None, rng=None):
+    """Pick the medium-difficulty move for every board of a batch
+
+    Win if possible, otherwise block, otherwise take the center, a corner
+    or an edge, the same priorities as `TicTacToe.medium_ai_move`.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    result = evaluate_boards(boards, player, board_size, win_length)
+    legal = result.legal
+    cells = board_size * board_size
+
+    corners = np.zeros(cells, dtype=bool)
+    corners[[0, board_size - 1, cells - board_size, cells - 1]] = True
+    center = np.zeros(cells, dtype=bool)
+    if board_size % 2 == 1:
+        center[cells // 2] = True
+    edges = ~(corners | center)
+
+    moves = _random_cell(legal & edges, rng)
+    for choice in (_random_cell(legal & corners, rng),
+                   _first_cell(legal & center),
+                   _first_cell(result.blocks),
+                   _first_cell(result.wins)):
+        moves = np.where(choice >= 0, choice, moves)
+    return moves
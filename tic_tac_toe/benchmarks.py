@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import rclpy
+
+from tic_tac_toe.replay import scratch_files
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, Difficulty
+from tic_tac_toe.tic_tac_toe_ros import TicTacToe, GameState, ColorPicker
+
+# Positions reached after the opening moves, used for the search benchmarks
+OPENING_POSITIONS = [[EMPTY] * 9] + [[PLAYER_X if i == cell else EMPTY for i in range(9)] for cell in range(9)]
+MIDGAME_BOARD = [PLAYER_X, EMPTY, PLAYER_O, EMPTY, PLAYER_X, EMPTY, PLAYER_O, EMPTY, EMPTY]
+
+
+def measure(func, rounds, warmup=1):
+    """Call `func` `rounds` times and return per-call statistics in microseconds"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return {
+        'rounds': rounds,
+        'min_us': min(timings),
+        'median_us': statistics.median(timings),
+        'mean_us': statistics.fmean(timings),
+    }
+
+
+def engine_benchmarks(game, rounds, selected):
+    """check_winner, best_move and medium_ai_move, those whose name passes `selected`"""
+    results = {}
+
+    def check_winner():
+        for board in OPENING_POSITIONS + [MIDGAME_BOARD]:
+            game.board = board
+            game.check_winner()
+    if selected('check_winner'):
+        results['check_winner'] = measure(check_winner, rounds * 10)
+
+    game.ai_difficulty = Difficulty.HARD
+    for i, board in enumerate(OPENING_POSITIONS):
+        def best_move(board=board):
+            # Cold cache, so every round pays for the full search
+            game.engine.clear_cache()
+            game.board = list(board)
+            game.best_move()
+        name = 'best_move.empty' if i == 0 else f'best_move.x_at_{i - 1}'
+        if selected(name):
+            results[name] = measure(best_move, max(1, rounds // 10))
+
+    def medium_ai_move():
+        for board in OPENING_POSITIONS[1:] + [MIDGAME_BOARD]:
+            game.board = list(board)
+            game.medium_ai_move()
+    if selected('medium_ai_move'):
+        results['medium_ai_move'] = measure(medium_ai_move, rounds)
+    return results
+
+
+def rendering_benchmarks(game, rounds, selected):
+    """ColorPicker.update_surface and one draw_board frame per GameState, those whose name passes `selected`"""
+    results = {}
+    if selected('color_picker.update_surface'):
+        picker = ColorPicker(50, 150)
+        results['color_picker.update_surface'] = measure(picker.update_surface, max(1, rounds // 20))
+
+    game.current_setting = "Player X"
+    game.game_mode = 'AI'
+    game.ai_difficulty = Difficulty.HARD
+    for state in GameState:
+        if not selected(f'draw_board.{state.name}'):
+            continue
+        game.game_state = state
+        game.board = list(MIDGAME_BOARD)
+        game.current_player = PLAYER_X
+        game.winner = PLAYER_X if state == GameState.GAME_OVER else None
+        results[f'draw_board.{state.name}'] = measure(game.draw_board, rounds)
+
+    # The AI's turn adds the thinking and robot-arm animations
+    if not selected('draw_board.PLAYING.ai_thinking'):
+        return results
+    game.game_state = GameState.PLAYING
+    game.current_player = PLAYER_O
+    game.ai_thinking = True
+    game.ai_move_position = None
+    results['draw_board.PLAYING.ai_thinking'] = measure(game.draw_board, rounds)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return [(name, baseline_us, current_us)] for medians slower than the threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous and current['median_us'] > previous['median_us'] * (1 + threshold):
+            regressions.append((name, previous['median_us'], current['median_us']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tic-Tac-Toe engine, rules and rendering")
+    parser.add_argument('--rounds', type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--save', help="write the results to this JSON baseline")
+    parser.add_argument('--compare', help="compare against this JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed slowdown of the median before failing (default 20%%)")
+    args = parser.parse_args()
+
+    with scratch_files('tic_tac_toe_bench_') as scratch_args:
+        # Frames are drawn headlessly into an offscreen Surface
+        rclpy.init(args=['--ros-args', '-p', 'render_mode:=offscreen'] + scratch_args)
+        game = TicTacToe()
+        game.animations.fast = True
+
+        def selected(name):
+            return args.filter in name
+
+        try:
+            results = {}
+            results.update(engine_benchmarks(game, args.rounds, selected))
+            results.update(rendering_benchmarks(game, args.rounds, selected))
+        finally:
+            # Releases everything configure loaded: analyzer thread, game log, leaderboard and pygame
+            game.trigger_shutdown()
+            game.destroy_node()
+            rclpy.shutdown()
+
+    for name, stats in results.items():
+        print(f"{name:40s} median {stats['median_us']:12.1f} us   min {stats['min_us']:12.1f} us")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, previous, current in regressions:
+            print(f"REGRESSION {name}: {previous:.1f} us -> {current:.1f} us")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against", args.compare)
+
+
+if __name__ == '__main__':
+    main()
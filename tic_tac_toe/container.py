@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib
+import sys
+
+import rclpy
+from rclpy.executors import MultiThreadedExecutor, SingleThreadedExecutor
+from rclpy.utilities import remove_ros_args
+
+DEFAULT_NODES = ['tic_tac_toe.game_host:GameHost']
+
+
+def load_node(spec, **options):
+    """Instantiate the node class named by 'package.module:Class' with rclpy Node options"""
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Expected 'module:Class', got '{spec}'")
+    return getattr(importlib.import_module(module_name), class_name)(**options)
+
+
+class NodeContainer:
+    """Runs several nodes in one process on a shared executor
+
+    rclpy has no component containers, so this is the Python counterpart:
+    the nodes share a process and an executor, and messages between them
+    never leave the process. With Fast DDS (the default RMW) they are
+    delivered intra-process; other RMWs still skip the network.
+    """
+
+    def __init__(self, threads=0):
+        # 0 = one thread per CPU; 1 runs every callback on the spinning thread
+        self.executor = SingleThreadedExecutor() if threads == 1 else MultiThreadedExecutor(threads or None)
+        self.nodes = []
+
+    def add(self, node):
+        self.nodes.append(node)
+        self.executor.add_node(node)
+        return node
+
+    def load(self, spec, **options):
+        return self.add(load_node(spec, **options))
+
+    def spin(self):
+        self.executor.spin()
+
+    def shutdown(self):
+        for node in reversed(self.nodes):
+            # Nodes with worker pools or threads release them here
+            if hasattr(node, 'shutdown'):
+                node.shutdown()
+            self.executor.remove_node(node)
+            node.destroy_node()
+        self.nodes = []
+        self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Tic-Tac-Toe and other rclpy nodes in one process")
+    parser.add_argument('nodes', nargs='*', default=DEFAULT_NODES,
+                        help="node classes as 'package.module:Class' (default: the game host)")
+    parser.add_argument('--threads', type=int, default=0, help="executor threads, 0 = one per CPU")
+    args = parser.parse_args(remove_ros_args(sys.argv)[1:])
+
+    rclpy.init()
+    container = NodeContainer(args.threads)
+    try:
+        for spec in args.nodes:
+            node = container.load(spec)
+            node.get_logger().info(f"Loaded {spec} into the container")
+        container.spin()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        container.shutdown()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
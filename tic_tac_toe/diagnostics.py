@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class RollingHistogram:
+    """Keeps the last `window` samples (all of them if None) and reports their distribution"""
+
+    def __init__(self, window=600):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        """Return mean, p50, p95, p99 and max of the window"""
+        if not self.samples:
+            return {'count': self.count}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            'count': self.count,
+            'mean': sum(ordered) / len(ordered),
+            'p50': ordered[int(0.50 * last)],
+            'p95': ordered[int(0.95 * last)],
+            'p99': ordered[int(0.99 * last)],
+            'max': ordered[last],
+        }
+
+
+class Instrumentation:
+    """Named rolling histograms for frame, event, AI and input timings
+
+    Times are recorded in milliseconds. Names are dotted, e.g.
+    'draw.PLAYING' or 'ai.search', so they group in the diagnostics view.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.histograms = {}
+
+    def record(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram(self.window)
+        histogram.add(value)
+
+    @contextmanager
+    def timer(self, name):
+        """Record the wall time of the block in milliseconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, directory):
+        """Write the current summary to a timestamped JSON file"""
+        directory = os.path.expanduser(directory)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, time.strftime('perf_%Y%m%d_%H%M%S.json'))
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import random
+import time
+
+import numpy as np
+
+from tic_tac_toe import batch
+from tic_tac_toe.rules import PLAYER_O, EMPTY, DRAW, Difficulty, win_lines, other_player
+
+
+class Engine:
+    """Minimax search for N x N boards with k in a row
+
+    Scores are from the point of view of the player to move: a win in
+    `plies` moves scores `cells + 1 - plies`, a loss the negative of that
+    and a draw 0. Exact values are cached by position, so a full 3x3
+    search visits each reachable position once. With a tablebase the
+    search stops at the first position the tablebase knows.
+    """
+
+    def __init__(self, board_size=3, win_length=None, max_depth=None, node_budget=None,
+                 opening_book=None, tablebase=None):
+        self.board_size = board_size
+        self.win_length = win_length or board_size
+        self.cells = board_size * board_size
+        self.win_score = self.cells + 1
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.opening_book = opening_book
+        self.tablebase = tablebase
+        self.lines = win_lines(board_size, self.win_length)
+        # Lines through each cell, so a move only checks the lines it touches
+        self.cell_lines = [[line for line in self.lines if cell in line] for cell in range(self.cells)]
+        self.cache = {}
+        self.stats = {
+            'searches': 0,
+            'nodes': 0,
+            'search_time': 0.0,
+            'book_hits': 0,
+            'book_misses': 0,
+        }
+        self._nodes_left = None
+
+    def check_winner(self, board):
+        """Return the winning symbol, DRAW or None"""
+        for line in self.lines:
+            first = board[line[0]]
+            if first is not EMPTY and all(board[cell] == first for cell in line):
+                return first
+        if EMPTY not in board:
+            return DRAW
+        return None
+
+    def is_winning_move(self, board, cell):
+        """Check whether the stone on `cell` completes a line"""
+        player = board[cell]
+        for line in self.cell_lines[cell]:
+            if all(board[other] == player for other in line):
+                return True
+        return False
+
+    def negamax(self, board, player, depth_left=None):
+        """Score the position for `player`, who is about to move"""
+        self.stats['nodes'] += 1
+        if self._nodes_left is not None:
+            self._nodes_left -= 1
+            if self._nodes_left < 0:
+                return 0
+        if depth_left == 0:
+            return 0
+        if self.tablebase is not None:
+            score = self.tablebase.score(board, player)
+            if score is not None:
+                return score
+
+        key = (tuple(board), player, depth_left)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        next_depth = None if depth_left is None else depth_left - 1
+        best = None
+        for cell in range(self.cells):
+            if board[cell] is not EMPTY:
+                continue
+            score = self.child_score(board, cell, player, next_depth)
+            if best is None or score > best:
+                best = score
+                if best == self.win_score - 1:
+                    break
+
+        if best is None:
+            best = 0
+        if self._nodes_left is None or self._nodes_left >= 0:
+            self.cache[key] = best
+        return best
+
+    def child_score(self, board, cell, player, depth_left):
+        """Score playing `cell` for `player`, one ply above the child"""
+        board[cell] = player
+        if self.is_winning_move(board, cell):
+            score = self.win_score - 1
+        elif EMPTY not in board:
+            score = 0
+        else:
+            child = self.negamax(board, other_player(player), depth_left)
+            score = -child + (1 if child > 0 else -1 if child < 0 else 0)
+        board[cell] = EMPTY
+        return score
+
+    def root_scores(self, board, player):
+        """Yield (cell, score) for every empty cell in index order"""
+        start = time.perf_counter()
+        self.stats['searches'] += 1
+        self._nodes_left = self.node_budget
+        board = list(board)
+        depth_left = None if self.max_depth is None else self.max_depth - 1
+        try:
+            for cell in range(self.cells):
+                if board[cell] is EMPTY:
+                    yield cell, self.child_score(board, cell, player, depth_left)
+        finally:
+            self._nodes_left = None
+            self.stats['search_time'] += time.perf_counter() - start
+
+    def score_moves(self, board, player):
+        """Return {cell: score} for every empty cell"""
+        return dict(self.root_scores(board, player))
+
+    def best_move(self, board, player, stop_on_win=False):
+        """Return the lowest-index cell with the best minimax score
+
+        With `stop_on_win` the search stops at the first immediate win.
+        """
+        best_score = None
+        move = None
+        scores = self.root_scores(board, player)
+        for cell, score in scores:
+            if best_score is None or score > best_score:
+                best_score = score
+                move = cell
+            if stop_on_win and best_score == self.win_score - 1:
+                break
+        scores.close()
+        return move
+
+    def book_move(self, board, player, randomize=True):
+        """Look the position up in the opening book, None on a miss"""
+        if self.opening_book is None:
+            return None
+        move = self.opening_book.probe(board, player, randomize)
+        if move is None:
+            self.stats['book_misses'] += 1
+        else:
+            self.stats['book_hits'] += 1
+        return move
+
+    def clear_cache(self):
+        """Drop the cached position values"""
+        self.cache.clear()
+
+
+def choose_move(engine, board, difficulty, rng=random, player=PLAYER_O):
+    """Pick the AI's move the same way TicTacToe.ai_move does; the game's AI plays O"""
+    move = None
+    if difficulty != Difficulty.EASY:
+        move = engine.book_move(board, player, randomize=difficulty != Difficulty.IMPOSSIBLE)
+    if move is not None:
+        return move
+    empty = [i for i, cell in enumerate(board) if cell == EMPTY]
+    if difficulty == Difficulty.EASY:
+        return rng.choice(empty)
+    if difficulty == Difficulty.MEDIUM:
+        if rng.random() < 0.7:
+            boards = batch.encode_boards([board])
+            np_rng = np.random.default_rng(rng.getrandbits(64))
+            return int(batch.medium_moves(boards, batch.CELL_CODES[player], engine.board_size, rng=np_rng)[0])
+        return rng.choice(empty)
+    return engine.best_move(board, player, stop_on_win=difficulty == Difficulty.IMPOSSIBLE)
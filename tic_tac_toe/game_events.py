@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import time
+from collections import Counter
+
+from tic_tac_toe.rules import EMPTY, DRAW
+
+EVENTS_TOPIC = '/tic_tac_toe_node/events'
+
+# Event kinds published on ~/events, one JSON object per std_msgs/String:
+#   game_start  game, mode, difficulty, first_player, player_x, player_o
+#   move        game, cell, player, winner
+#   ai          game, cell, difficulty, source (book/search/heuristic/random), search_ms, nodes
+#   undo, redo  game, cell, player, winner
+#   state       game, previous, current (GameState names)
+
+
+def event_message(kind, **fields):
+    """JSON text of one game event"""
+    return json.dumps(dict(fields, kind=kind), separators=(',', ':'))
+
+
+def parse_event(text):
+    """Inverse of `event_message`"""
+    return json.loads(text)
+
+
+class GameStatistics:
+    """Rebuilds games from an event stream and aggregates them in one pass
+
+    A node plays one game at a time, so only the current game is kept in
+    memory and bags of any length stream through in constant space. A won
+    game can still be taken back, so it is counted when the next game
+    starts or the stream ends (`close`); a game left unfinished then
+    counts as abandoned.
+    """
+
+    def __init__(self, on_game_end=None):
+        self.on_game_end = on_game_end
+        self.game = None
+        self.start = {}
+        self.current_board = None
+        self.winner = None
+        self.events = Counter()
+        self.results = Counter()
+        self.transitions = Counter()
+        self.ai_sources = Counter()
+        self.finished = 0
+        self.abandoned = 0
+        self.moves = 0
+        self.inconsistent = 0
+        self.search_count = 0
+        self.search_ms = 0.0
+        self.search_ms_max = 0.0
+        self.nodes = 0
+
+    def add(self, event):
+        kind = event['kind']
+        self.events[kind] += 1
+        game = event.get('game')
+        if kind == 'game_start':
+            self.finish_game()
+            self.game = game
+            self.start = event
+            self.current_board = [EMPTY] * 9
+        elif kind in ['move', 'redo']:
+            board = self.board(game)
+            if board[event['cell']] is not EMPTY:
+                self.inconsistent += 1
+            board[event['cell']] = event['player']
+            self.winner = event['winner']
+            self.moves += kind == 'move'
+        elif kind == 'undo':
+            board = self.board(game)
+            if board[event['cell']] != event['player']:
+                self.inconsistent += 1
+            board[event['cell']] = EMPTY
+            self.winner = None
+        elif kind == 'ai':
+            self.ai_sources[event['source']] += 1
+            # Book, heuristic and random moves take no search; keep them out of the search times
+            if event['source'] == 'search':
+                self.search_count += 1
+                self.search_ms += event['search_ms']
+                self.search_ms_max = max(self.search_ms_max, event['search_ms'])
+                self.nodes += event['nodes']
+        elif kind == 'state':
+            self.transitions[f"{event['previous']}->{event['current']}"] += 1
+
+    def board(self, game):
+        # A game that started before the recording began is picked up mid-way
+        if self.current_board is None or game != self.game:
+            self.finish_game()
+            self.game = game
+            self.current_board = [EMPTY] * 9
+        return self.current_board
+
+    def finish_game(self):
+        """Count the current game as won, drawn or abandoned and drop it"""
+        if self.current_board is None:
+            return
+        if self.winner:
+            mode = self.start.get('difficulty') or self.start.get('mode', 'unknown')
+            self.results[(mode, 'draw' if self.winner == DRAW else self.winner)] += 1
+            self.finished += 1
+            if self.on_game_end:
+                self.on_game_end(self.game, self.start, self.current_board, self.winner)
+        elif any(cell is not EMPTY for cell in self.current_board):
+            self.abandoned += 1
+        self.game = None
+        self.start = {}
+        self.current_board = None
+        self.winner = None
+
+    def close(self):
+        self.finish_game()
+
+    def summary(self):
+        return {
+            'events': dict(self.events),
+            'games_finished': self.finished,
+            'games_abandoned': self.abandoned,
+            'games_open': int(self.current_board is not None),
+            'moves': self.moves,
+            'moves_per_game': self.moves / self.finished if self.finished else None,
+            'results': {f'{mode}/{result}': count for (mode, result), count in sorted(self.results.items())},
+            'ai_sources': dict(self.ai_sources),
+            'search_ms_mean': self.search_ms / self.search_count if self.search_count else None,
+            'search_ms_max': self.search_ms_max,
+            'search_nodes': self.nodes,
+            'transitions': dict(self.transitions.most_common()),
+            'inconsistent_events': self.inconsistent,
+        }
+
+
+def read_bag(path, topic, storage_id=''):
+    """Yield (timestamp_ns, event) from the events topic of a rosbag2 bag"""
+    # Imported here so the game node can publish events without rosbag2 installed
+    import rosbag2_py
+    from rclpy.serialization import deserialize_message
+    from std_msgs.msg import String
+
+    reader = rosbag2_py.SequentialReader()
+    reader.open(rosbag2_py.StorageOptions(uri=path, storage_id=storage_id),
+                rosbag2_py.ConverterOptions('', ''))
+    reader.set_filter(rosbag2_py.StorageFilter(topics=[topic]))
+    while reader.has_next():
+        _, data, stamp = reader.read_next()
+        yield stamp, parse_event(deserialize_message(data, String).data)
+
+
+def paced(events, speed):
+    """Delay the (timestamp_ns, event) stream to `speed` times the recorded rate; 0 = no delay"""
+    started = first = None
+    for stamp, event in events:
+        if speed > 0:
+            if started is None:
+                started, first = time.perf_counter(), stamp
+            delay = started + (stamp - first) / 1e9 / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield stamp, event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild Tic-Tac-Toe games from a rosbag2 bag and report statistics")
+    parser.add_argument('bag', help="bag directory recorded with 'ros2 bag record'")
+    parser.add_argument('--topic', default=EVENTS_TOPIC)
+    parser.add_argument('--storage', default='', help="storage plugin, e.g. sqlite3 or mcap (default: detect)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="playback speed, 1 = recorded rate, 0 = as fast as possible (default)")
+    parser.add_argument('--games', action='store_true', help="print every finished game")
+    parser.add_argument('--json', action='store_true', help="print the statistics as JSON")
+    args = parser.parse_args()
+
+    def print_game(game, start, board, winner):
+        cells = ''.join(cell or '.' for cell in board)
+        print(f"game {game} {start.get('difficulty') or start.get('mode', '?')}: {cells} winner {winner}")
+
+    stats = GameStatistics(print_game if args.games else None)
+    started = time.perf_counter()
+    for _, event in paced(read_bag(args.bag, args.topic, args.storage), args.speed):
+        stats.add(event)
+    stats.close()
+    summary = stats.summary()
+    summary['wall_seconds'] = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    for name, value in summary.items():
+        print(f"{name:22s} {value}")
+
+
+if __name__ == '__main__':
+    main()
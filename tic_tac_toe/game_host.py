@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import rclpy
+from rclpy.node import Node
+from std_msgs.msg import String
+from std_srvs.srv import Trigger
+
+from tic_tac_toe.engine import Engine, choose_move
+from tic_tac_toe.history import MoveHistory
+from tic_tac_toe.opening_book import OpeningBook
+from tic_tac_toe.rules import (PLAYER_X, PLAYER_O, EMPTY, DRAW, DIFFICULTIES, Difficulty, format_removal,
+                               format_state, other_player)
+from tic_tac_toe.tablebase import Tablebase
+
+BOARD_SIZE = 3
+
+
+# Per-process engine of the AI worker pool
+_worker_engine = None
+
+
+def _init_worker():
+    global _worker_engine
+    _worker_engine = Engine(BOARD_SIZE, opening_book=OpeningBook.load_default(BOARD_SIZE, BOARD_SIZE),
+                            tablebase=Tablebase.load_default(BOARD_SIZE, BOARD_SIZE))
+
+
+def _choose_moves(jobs):
+    """Worker entry point: [(session, version, cells, difficulty)] -> [(session, version, move)]"""
+    results = []
+    for session_id, version, cells, difficulty in jobs:
+        board = [None if cell == '.' else cell for cell in cells]
+        results.append((session_id, version, choose_move(_worker_engine, board, Difficulty(difficulty))))
+    return results
+
+
+class GameSession:
+    """One independent board with its own turn, score and difficulty"""
+
+    def __init__(self, session_id, difficulty=Difficulty.HARD):
+        self.session_id = session_id
+        self.difficulty = difficulty  # None for player vs player
+        self.score = {PLAYER_X: 0, PLAYER_O: 0}
+        self.history = MoveHistory()
+        # Bumped on every change, so stale AI results can be dropped
+        self.version = 0
+        self.ai_pending = False
+        self.reset(PLAYER_X)
+
+    def reset(self, first_player=PLAYER_X):
+        self.board = [EMPTY] * (BOARD_SIZE * BOARD_SIZE)
+        self.current_player = first_player
+        self.winner = None
+        self.history.clear()
+        self.ai_pending = False
+        self.version += 1
+        self.last_active = time.monotonic()
+
+    def state_line(self):
+        return format_state(self.session_id, self.board, self.current_player, self.winner,
+                            self.score, self.difficulty)
+
+    def ai_to_move(self):
+        return (self.difficulty is not None and not self.winner
+                and self.current_player == PLAYER_O and not self.ai_pending)
+
+    def apply_move(self, cell, engine):
+        """Play `cell` for the side to move; returns False if illegal"""
+        if self.winner or not 0 <= cell < len(self.board) or self.board[cell] is not EMPTY:
+            return False
+        player = self.current_player
+        self.board[cell] = player
+        self.winner = engine.check_winner(self.board)
+        if self.winner:
+            if self.winner != DRAW:
+                self.score[self.winner] += 1
+        else:
+            self.current_player = other_player(player)
+        self.history.push(cell, player, self.winner)
+        self.version += 1
+        self.last_active = time.monotonic()
+        return True
+
+
+class GameHost(Node):
+    """Headless node hosting many game sessions
+
+    Topics (std_msgs/String):
+      ~/move     "<session> <cell>"              play a cell for the side to move
+      ~/command  "<session> new <difficulty|pvp> [X|O]"  start a new game
+      ~/state    session state, see `format_state`, or `format_removal`
+
+    The `sessions` created at start-up are always there. Only "new" creates
+    more, up to `max_sessions`; when the host is full, those idle for
+    `session_idle_timeout` seconds are dropped to make room.
+    """
+
+    def __init__(self, **kwargs):
+        # kwargs are rclpy Node options, e.g. namespace or parameter_overrides when loaded into a container
+        super().__init__('tic_tac_toe_host', **kwargs)
+        self.declare_parameter('sessions', 16)
+        self.declare_parameter('ai_workers', 0)  # 0 = one per CPU
+        self.declare_parameter('ai_batch_size', 64)
+        self.declare_parameter('default_difficulty', 'hard')
+        self.declare_parameter('max_sessions', 1024)
+        self.declare_parameter('session_idle_timeout', 600.0)
+
+        difficulty = DIFFICULTIES[self.get_parameter('default_difficulty').value.lower()]
+        self.engine = Engine(BOARD_SIZE)
+        self.sessions = {
+            str(i): GameSession(str(i), difficulty)
+            for i in range(self.get_parameter('sessions').value)
+        }
+        # The start-up sessions are the fixed stations; only sessions made by "new" are dropped
+        self.stations = set(self.sessions)
+        self.max_sessions = self.get_parameter('max_sessions').value
+        self.session_idle_timeout = self.get_parameter('session_idle_timeout').value
+        self.ai_batch_size = self.get_parameter('ai_batch_size').value
+        # Forking after rclpy.init would copy the ROS context and its threads into the workers
+        self.pool = ProcessPoolExecutor(max_workers=self.get_parameter('ai_workers').value or os.cpu_count(),
+                                        mp_context=multiprocessing.get_context('forkserver'),
+                                        initializer=_init_worker)
+        self.ai_results = queue.SimpleQueue()
+        self.moves_played = 0
+
+        self.state_publisher = self.create_publisher(String, '~/state', 100)
+        self.move_subscription = self.create_subscription(String, '~/move', self.handle_move, 100)
+        self.command_subscription = self.create_subscription(String, '~/command', self.handle_command, 100)
+        self.reset_service = self.create_service(Trigger, '~/reset_all', self.handle_reset_all)
+        self.list_service = self.create_service(Trigger, '~/list_sessions', self.handle_list_sessions)
+        # AI results come back on pool threads; they are applied on the executor thread
+        self.ai_timer = self.create_timer(0.002, self.apply_ai_results)
+        self.stats_timer = self.create_timer(5.0, self.log_stats)
+
+        for session in self.sessions.values():
+            self.publish_state(session)
+        self.get_logger().info(f"Hosting {len(self.sessions)} Tic-Tac-Toe sessions")
+
+    def new_session(self, session_id):
+        """Return a session for a new game, creating it if there is room; None if the host is full"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            if len(self.sessions) >= self.max_sessions:
+                self.evict_idle_sessions()
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            session = self.sessions[session_id] = GameSession(session_id)
+        return session
+
+    def evict_idle_sessions(self):
+        """Drop the sessions made by "new" that nobody played in for `session_idle_timeout` seconds"""
+        cutoff = time.monotonic() - self.session_idle_timeout
+        idle = [session_id for session_id, session in self.sessions.items()
+                if session_id not in self.stations and session.last_active < cutoff and not session.ai_pending]
+        for session_id in idle:
+            del self.sessions[session_id]
+            self.state_publisher.publish(String(data=format_removal(session_id)))
+        if idle:
+            self.get_logger().info(f"Dropped {len(idle)} idle sessions")
+        return len(idle)
+
+    def publish_state(self, session):
+        self.state_publisher.publish(String(data=session.state_line()))
+
+    def handle_move(self, msg):
+        try:
+            session_id, cell = msg.data.split()
+            cell = int(cell)
+        except ValueError:
+            self.get_logger().warn(f"Malformed move '{msg.data}'")
+            return
+        session = self.sessions.get(session_id)
+        if session is None:
+            self.get_logger().warn(f"Move for unknown session '{session_id}'", throttle_duration_sec=5.0)
+            return
+        if session.ai_to_move() or session.ai_pending:
+            return  # Not the human's turn
+        if session.apply_move(cell, self.engine):
+            self.moves_played += 1
+            self.publish_state(session)
+            self.schedule_ai([session])
+
+    def handle_command(self, msg):
+        words = msg.data.split()
+        if len(words) < 3 or words[1] != 'new':
+            self.get_logger().warn(f"Malformed command '{msg.data}'")
+            return
+        mode = words[2].lower()
+        if mode != 'pvp' and mode not in DIFFICULTIES:
+            self.get_logger().warn(f"Unknown difficulty '{words[2]}'")
+            return
+        session = self.new_session(words[0])
+        if session is None:
+            self.get_logger().warn(f"No room for session '{words[0]}', {self.max_sessions} are active",
+                                   throttle_duration_sec=5.0)
+            return
+        session.difficulty = None if mode == 'pvp' else DIFFICULTIES[mode]
+        session.reset(PLAYER_O if len(words) > 3 and words[3].upper() == PLAYER_O else PLAYER_X)
+        self.publish_state(session)
+        self.schedule_ai([session])
+
+    def schedule_ai(self, sessions):
+        """Send the sessions waiting for an AI move to the worker pool in batches"""
+        jobs = []
+        for session in sessions:
+            if session.ai_to_move():
+                session.ai_pending = True
+                cells = ''.join(cell or '.' for cell in session.board)
+                jobs.append((session.session_id, session.version, cells, session.difficulty.value))
+        for start in range(0, len(jobs), self.ai_batch_size):
+            batch_jobs = jobs[start:start + self.ai_batch_size]
+            try:
+                future = self.pool.submit(_choose_moves, batch_jobs)
+            except BrokenProcessPool as e:
+                self.ai_failed(batch_jobs, e)
+                continue
+            future.add_done_callback(lambda future, batch_jobs=batch_jobs: self.ai_done(future, batch_jobs))
+
+    def ai_done(self, future, jobs):
+        if future.exception() is not None:
+            self.ai_failed(jobs, future.exception())
+            return
+        for result in future.result():
+            self.ai_results.put(result)
+
+    def ai_failed(self, jobs, error):
+        """Hand the jobs of a failed batch back without a move; they are played on the executor thread"""
+        self.get_logger().error(f"AI worker failed: {error}", throttle_duration_sec=5.0)
+        for session_id, version, _, _ in jobs:
+            self.ai_results.put((session_id, version, None))
+
+    def apply_ai_results(self):
+        while True:
+            try:
+                session_id, version, move = self.ai_results.get_nowait()
+            except queue.Empty:
+                break
+            session = self.sessions.get(session_id)
+            if session is None or session.version != version:
+                continue  # The game moved on while the AI was thinking
+            session.ai_pending = False
+            if move is None:  # The worker failed
+                move = choose_move(self.engine, session.board, session.difficulty)
+            if session.apply_move(move, self.engine):
+                self.moves_played += 1
+                self.publish_state(session)
+
+    def handle_reset_all(self, request, response):
+        for session in self.sessions.values():
+            session.reset(PLAYER_X)
+            self.publish_state(session)
+        response.success = True
+        response.message = f"Reset {len(self.sessions)} sessions"
+        return response
+
+    def handle_list_sessions(self, request, response):
+        response.success = True
+        response.message = '\n'.join(session.state_line() for session in self.sessions.values())
+        return response
+
+    def log_stats(self):
+        self.get_logger().info(f"{self.moves_played / 5.0:.0f} moves/s across {len(self.sessions)} sessions")
+        self.moves_played = 0
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    rclpy.init()
+    host = GameHost()
+    try:
+        rclpy.spin(host)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        host.shutdown()
+        host.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
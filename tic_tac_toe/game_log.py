@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import mmap
+import os
+import queue
+import struct
+import threading
+from collections import namedtuple
+
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, DRAW, Difficulty
+
+LOG_MAGIC = b'TTTL'
+LOG_VERSION = 1
+FILE_HEADER = struct.Struct('<4sB')
+# Every record is framed by the length of its payload
+FRAME = struct.Struct('<H')
+# started (unix seconds), duration (ms), board size, flags, difficulty, move count
+RECORD_HEADER = struct.Struct('<IIBBBB')
+
+# Flags byte: bit 0 = O moved first, bits 1-2 = result
+FLAG_O_FIRST = 0x01
+RESULT_CODES = {None: 0, PLAYER_X: 1, PLAYER_O: 2, DRAW: 3}
+RESULTS = {code: result for result, code in RESULT_CODES.items()}
+DIFFICULTY_CODES = {None: 0, Difficulty.EASY: 1, Difficulty.MEDIUM: 2,
+                    Difficulty.HARD: 3, Difficulty.IMPOSSIBLE: 4}
+DIFFICULTIES = {code: difficulty for difficulty, code in DIFFICULTY_CODES.items()}
+
+GameRecord = namedtuple('GameRecord', [
+    'player_x', 'player_o', 'difficulty', 'first_player', 'winner', 'moves',
+    'started', 'finished', 'board_size'])
+
+
+def pack_moves(moves):
+    """Pack cell indices into 4-bit nibbles, two moves per byte"""
+    packed = bytearray((len(moves) + 1) // 2)
+    for i, cell in enumerate(moves):
+        if not 0 <= cell < 16:
+            raise ValueError(f"cell {cell} does not fit in 4 bits")
+        packed[i // 2] |= cell << (4 * (i % 2))
+    return bytes(packed)
+
+
+def unpack_moves(data, count):
+    """Inverse of `pack_moves`"""
+    return [(data[i // 2] >> (4 * (i % 2))) & 0x0F for i in range(count)]
+
+
+def encode_record(record):
+    """Serialize a GameRecord into a length-prefixed frame"""
+    flags = (FLAG_O_FIRST if record.first_player == PLAYER_O else 0) | (RESULT_CODES[record.winner] << 1)
+    started = int(record.started)
+    duration = max(0, int((record.finished - record.started) * 1000))
+    names = b''
+    for name in (record.player_x, record.player_o):
+        encoded = name.encode('utf-8')[:255]
+        names += bytes([len(encoded)]) + encoded
+    payload = (RECORD_HEADER.pack(started, duration, record.board_size, flags,
+                                  DIFFICULTY_CODES[record.difficulty], len(record.moves))
+               + pack_moves(record.moves) + names)
+    return FRAME.pack(len(payload)) + payload
+
+
+def decode_record(payload):
+    """Deserialize one frame payload into a GameRecord"""
+    started, duration, board_size, flags, difficulty, count = RECORD_HEADER.unpack_from(payload, 0)
+    offset = RECORD_HEADER.size
+    moves = unpack_moves(payload[offset:offset + (count + 1) // 2], count)
+    offset += (count + 1) // 2
+    names = []
+    for _ in range(2):
+        length = payload[offset]
+        names.append(bytes(payload[offset + 1:offset + 1 + length]).decode('utf-8'))
+        offset += 1 + length
+    return GameRecord(
+        player_x=names[0],
+        player_o=names[1],
+        difficulty=DIFFICULTIES[difficulty],
+        first_player=PLAYER_O if flags & FLAG_O_FIRST else PLAYER_X,
+        winner=RESULTS[(flags >> 1) & 0x03],
+        moves=moves,
+        started=float(started),
+        finished=started + duration / 1000,
+        board_size=board_size)
+
+
+class GameLogWriter:
+    """Append-only game log written by a background thread
+
+    `append` only queues the encoded frame, so the render loop never
+    waits on the disk. Frames are written in batches and flushed every
+    `flush_interval` seconds.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = os.path.expanduser(path)
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.file = open(self.path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+            self.file.flush()
+        self.thread = threading.Thread(target=self._write_loop, name='game_log_writer', daemon=True)
+        self.thread.start()
+
+    def append(self, record):
+        """Queue a finished game for writing"""
+        self.queue.put(encode_record(record))
+
+    def _write_loop(self):
+        running = True
+        while running:
+            try:
+                frames = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Drain whatever else is waiting so it goes out in one write
+            while True:
+                try:
+                    frames.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in frames:
+                running = False
+                frames = [frame for frame in frames if frame is not None]
+            self.file.write(b''.join(frames))
+            self.file.flush()
+
+    def close(self):
+        """Flush pending games and stop the writer thread"""
+        if self.file.closed:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+
+
+class GameLogReader:
+    """Memory-mapped reader for a game log"""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.file = open(self.path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if size and (size < FILE_HEADER.size or FILE_HEADER.unpack_from(self.map, 0) != (LOG_MAGIC, LOG_VERSION)):
+            self.close()
+            raise ValueError(f"{path} is not a game log")
+
+    def spans(self):
+        """Yield (offset, length) of every complete record payload"""
+        data = self.map
+        end = len(data)
+        offset = FILE_HEADER.size
+        unpack_length = FRAME.unpack_from
+        while offset + FRAME.size <= end:
+            (length,) = unpack_length(data, offset)
+            offset += FRAME.size
+            if offset + length > end:
+                break  # Partially written tail
+            yield offset, length
+            offset += length
+
+    def frames(self):
+        """Yield every record payload as a zero-copy memoryview"""
+        data = memoryview(self.map)
+        for offset, length in self.spans():
+            yield data[offset:offset + length]
+
+    def __iter__(self):
+        for payload in self.frames():
+            yield decode_record(payload)
+
+    def result_counts(self):
+        """Tally results by difficulty without decoding moves or names"""
+        raw_counts = {}
+        # flags and difficulty sit at bytes 9 and 10 of the record header
+        codes = struct.Struct('<BB').unpack_from
+        data = self.map
+        for offset, _ in self.spans():
+            key = codes(data, offset + 9)
+            raw_counts[key] = raw_counts.get(key, 0) + 1
+        counts = {}
+        for (flags, difficulty), count in raw_counts.items():
+            key = (DIFFICULTIES[difficulty], RESULTS[(flags >> 1) & 0x03])
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
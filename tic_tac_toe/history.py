@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+from collections import namedtuple
+
+# One played move. `winner` is the result the move produced (None while the
+# game is still running), which is all undo needs to roll the score back.
+Move = namedtuple('Move', ['cell', 'player', 'winner'])
+
+
+class MoveHistory:
+    """Move stack with a cursor for constant-time undo and redo
+
+    Moves before the cursor are on the board, moves after it can be
+    redone. Pushing a new move drops the redo tail.
+    """
+
+    def __init__(self):
+        self.moves = []
+        self.position = 0
+
+    def __len__(self):
+        return self.position
+
+    def push(self, cell, player, winner=None):
+        """Record a move played on the board"""
+        if self.position < len(self.moves):
+            del self.moves[self.position:]
+        move = Move(cell, player, winner)
+        self.moves.append(move)
+        self.position += 1
+        return move
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.moves)
+
+    def undo(self):
+        """Step the cursor back and return the move to take back"""
+        if not self.can_undo():
+            return None
+        self.position -= 1
+        return self.moves[self.position]
+
+    def redo(self):
+        """Step the cursor forward and return the move to replay"""
+        if not self.can_redo():
+            return None
+        move = self.moves[self.position]
+        self.position += 1
+        return move
+
+    def last(self):
+        """Return the most recent move on the board"""
+        return self.moves[self.position - 1] if self.position else None
+
+    def played(self):
+        """Return the moves currently on the board, oldest first"""
+        return self.moves[:self.position]
+
+    def clear(self):
+        self.moves = []
+        self.position = 0
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import itertools
+import os
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, DRAW
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tallies (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    difficulty TEXT NOT NULL,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (player_id, difficulty)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tallies_by_wins ON tallies (difficulty, wins DESC);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player_x INTEGER NOT NULL REFERENCES players(id),
+    player_o INTEGER NOT NULL REFERENCES players(id),
+    difficulty TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_player_x ON games (player_x);
+CREATE INDEX IF NOT EXISTS games_by_player_o ON games (player_o);
+"""
+
+INSERT_PLAYER = "INSERT OR IGNORE INTO players (name) VALUES (?)"
+INSERT_GAME = """
+INSERT INTO games (player_x, player_o, difficulty, winner, finished)
+VALUES ((SELECT id FROM players WHERE name = ?), (SELECT id FROM players WHERE name = ?), ?, ?, ?)
+"""
+UPSERT_TALLY = """
+INSERT INTO tallies (player_id, difficulty, wins, losses, draws)
+VALUES ((SELECT id FROM players WHERE name = ?), ?, ?, ?, ?)
+ON CONFLICT (player_id, difficulty) DO UPDATE SET
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    draws = draws + excluded.draws
+"""
+SELECT_TOP = """
+SELECT players.name, wins, losses, draws FROM tallies
+JOIN players ON players.id = tallies.player_id
+WHERE difficulty = ? ORDER BY wins DESC, losses ASC LIMIT ?
+"""
+SELECT_PLAYER = """
+SELECT difficulty, wins, losses, draws FROM tallies
+WHERE player_id = (SELECT id FROM players WHERE name = ?)
+"""
+
+# Difficulty column value for player-vs-player games
+PVP = 'PvP'
+# Difficulty column value of the running totals over every difficulty
+ALL = 'All'
+
+Standing = namedtuple('Standing', ['name', 'wins', 'losses', 'draws'])
+
+# Names of the shared in-memory databases, one per ':memory:' leaderboard
+_memory_databases = itertools.count()
+
+
+class Leaderboard:
+    """Persistent per-player and per-difficulty win/loss/draw tallies
+
+    Finished games are queued and committed in batches by a writer
+    thread with its own connection; lookups use a separate read
+    connection and only touch the indexed tallies table.
+    """
+
+    def __init__(self, path, batch_size=64, flush_interval=0.5):
+        self.path = os.path.expanduser(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        if self.path == ':memory:':
+            # A plain ':memory:' gives every connection its own database; name a shared one instead
+            self.uri = f"file:leaderboard_{next(_memory_databases)}?mode=memory&cache=shared"
+        else:
+            self.uri = None
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.queue = queue.Queue()
+
+        writer = self._connect(check_same_thread=False)
+        writer.executescript(SCHEMA)
+        writer.commit()
+        self.reader = self._connect(check_same_thread=False)
+        if self.uri:
+            # Shared-cache readers otherwise hit table locks while the writer commits
+            self.reader.execute("PRAGMA read_uncommitted=1")
+        self.thread = threading.Thread(target=self._write_loop, args=(writer,),
+                                       name='leaderboard_writer', daemon=True)
+        self.thread.start()
+
+    def _connect(self, check_same_thread=True):
+        connection = sqlite3.connect(self.uri or self.path, check_same_thread=check_same_thread,
+                                     uri=self.uri is not None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record_game(self, player_x, player_o, difficulty, winner, finished):
+        """Queue a finished game; `difficulty` is None for PvP games"""
+        self.queue.put((player_x, player_o, difficulty.value if difficulty else PVP, winner, finished))
+
+    def _write_loop(self, connection):
+        running = True
+        while running:
+            try:
+                games = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(games) < self.batch_size:
+                try:
+                    games.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in games:
+                running = False
+                games = [game for game in games if game is not None]
+            if games:
+                self._commit(connection, games)
+        connection.close()
+
+    def _commit(self, connection, games):
+        """Write one batch of games in a single transaction"""
+        players, tallies, rows = set(), [], []
+        for player_x, player_o, difficulty, winner, finished in games:
+            players.update([(player_x,), (player_o,)])
+            rows.append((player_x, player_o, difficulty, winner, finished))
+            for name, symbol in ((player_x, PLAYER_X), (player_o, PLAYER_O)):
+                result = (int(winner == symbol), int(winner not in (symbol, DRAW)), int(winner == DRAW))
+                # Keep a totals row too, so the overall ranking is an index scan
+                tallies.append((name, difficulty) + result)
+                tallies.append((name, ALL) + result)
+        with connection:
+            connection.executemany(INSERT_PLAYER, sorted(players))
+            connection.executemany(INSERT_GAME, rows)
+            connection.executemany(UPSERT_TALLY, tallies)
+
+    def top_players(self, difficulty=None, limit=10):
+        """Return the best Standings, overall or for one difficulty"""
+        column = ALL if difficulty is None else difficulty.value
+        rows = self.reader.execute(SELECT_TOP, (column, limit))
+        return [Standing(*row) for row in rows]
+
+    def player_stats(self, name):
+        """Return {difficulty: Standing} for one player"""
+        rows = self.reader.execute(SELECT_PLAYER, (name,))
+        return {difficulty: Standing(name, wins, losses, draws) for difficulty, wins, losses, draws in rows}
+
+    def close(self):
+        """Commit queued games and close both connections"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.reader.close()
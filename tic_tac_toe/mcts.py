@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import math
+import random
+
+from tic_tac_toe.rules import EMPTY, DRAW, other_player
+
+
+class TreeNode:
+    """Search tree node; `wins` counts from the view of the player who moved into it"""
+
+    __slots__ = ('move', 'parent', 'player', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, move, parent, player, untried):
+        self.move = move
+        self.parent = parent
+        self.player = player  # Who played `move`
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self, exploration):
+        """Child with the highest UCT value"""
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+
+def mcts_move(engine, board, player, playouts, rng=random, exploration=1.4):
+    """Monte Carlo tree search with random playouts; returns the most visited move
+
+    `engine` only provides the rules (its lines and winner checks), so
+    the search is independent of the minimax settings.
+    """
+    root = TreeNode(None, None, other_player(player), [i for i, cell in enumerate(board) if cell is EMPTY])
+    for _ in range(playouts):
+        node = root
+        state = list(board)
+        winner = None
+
+        # Selection
+        while not node.untried and node.children:
+            node = node.select(exploration)
+            state[node.move] = node.player
+        if node.move is not None and engine.is_winning_move(state, node.move):
+            winner = node.player
+
+        # Expansion
+        if winner is None and node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            mover = other_player(node.player)
+            state[move] = mover
+            child = TreeNode(move, node, mover, [i for i, cell in enumerate(state) if cell is EMPTY])
+            node.children.append(child)
+            node = child
+            if engine.is_winning_move(state, move):
+                winner = mover
+
+        # Playout
+        mover = node.player
+        empty = [i for i, cell in enumerate(state) if cell is EMPTY]
+        rng.shuffle(empty)
+        while winner is None and empty:
+            mover = other_player(mover)
+            move = empty.pop()
+            state[move] = mover
+            if engine.is_winning_move(state, move):
+                winner = mover
+        if winner is None:
+            winner = DRAW
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner == DRAW:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1
+            node = node.parent
+    return max(root.children, key=lambda child: child.visits).move
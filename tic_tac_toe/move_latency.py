@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import rclpy
+from rclpy.executors import SingleThreadedExecutor
+from rclpy.node import Node
+from rclpy.parameter import Parameter
+from rclpy.utilities import remove_ros_args
+from std_msgs.msg import String
+
+from tic_tac_toe.container import NodeContainer
+from tic_tac_toe.diagnostics import RollingHistogram
+from tic_tac_toe.game_host import GameHost
+
+SESSION = 'latency'
+# A drawn game, so every move is accepted and answered with a state line
+DRAW_MOVES = [0, 1, 2, 4, 3, 5, 7, 6, 8]
+
+
+class MoveClient(Node):
+    """Plays player-vs-player games on the host and times each move until its state comes back"""
+
+    def __init__(self, host_name='/tic_tac_toe_host'):
+        super().__init__('tic_tac_toe_latency_client')
+        self.command_publisher = self.create_publisher(String, f'{host_name}/command', 10)
+        self.move_publisher = self.create_publisher(String, f'{host_name}/move', 10)
+        self.state_topic = f'{host_name}/state'
+        self.state_subscription = self.create_subscription(String, self.state_topic, self.handle_state, 100)
+        self.reply = None
+
+    def handle_state(self, msg):
+        if msg.data.split(' ', 1)[0] == SESSION:
+            self.reply = msg.data
+
+    def wait_for_host(self, executor, timeout):
+        """Spin until both directions are matched, so the first message is not lost to discovery"""
+        deadline = time.perf_counter() + timeout
+        while (self.move_publisher.get_subscription_count() == 0
+               or self.command_publisher.get_subscription_count() == 0
+               or self.count_publishers(self.state_topic) == 0):
+            if time.perf_counter() > deadline:
+                raise TimeoutError("No game host found")
+            executor.spin_once(timeout_sec=0.05)
+
+    def round_trip(self, executor, publisher, text, timeout=2.0):
+        """Publish `text` and spin until the host answers; returns the round trip in ms"""
+        self.reply = None
+        start = time.perf_counter()
+        publisher.publish(String(data=text))
+        while self.reply is None:
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"No state for '{text}'")
+            executor.spin_once(timeout_sec=timeout)
+        return (time.perf_counter() - start) * 1000
+
+    def play(self, executor, games, histogram):
+        for _ in range(games):
+            histogram.add(self.round_trip(executor, self.command_publisher, f'{SESSION} new pvp'))
+            for cell in DRAW_MOVES:
+                histogram.add(self.round_trip(executor, self.move_publisher, f'{SESSION} {cell}'))
+
+
+def run_in_process(games, warmup):
+    """Host and client in one process on a single-threaded executor"""
+    container = NodeContainer(threads=1)
+    container.add(GameHost(parameter_overrides=[Parameter('sessions', value=0), Parameter('ai_workers', value=1)]))
+    client = container.add(MoveClient())
+    try:
+        client.wait_for_host(container.executor, 10.0)
+        client.play(container.executor, warmup, RollingHistogram(None))
+        histogram = RollingHistogram(None)
+        client.play(container.executor, games, histogram)
+        return histogram.summary()
+    finally:
+        container.shutdown()
+
+
+def run_across_processes(games, warmup):
+    """Host in a child process, client in this one"""
+    host = subprocess.Popen([sys.executable, '-m', 'tic_tac_toe.game_host',
+                             '--ros-args', '-p', 'sessions:=0', '-p', 'ai_workers:=1'],
+                            stdout=subprocess.DEVNULL, env=os.environ.copy())
+    executor = SingleThreadedExecutor()
+    client = MoveClient()
+    executor.add_node(client)
+    try:
+        client.wait_for_host(executor, 30.0)
+        client.play(executor, warmup, RollingHistogram(None))
+        histogram = RollingHistogram(None)
+        client.play(executor, games, histogram)
+        return histogram.summary()
+    finally:
+        executor.remove_node(client)
+        client.destroy_node()
+        executor.shutdown()
+        host.terminate()
+        host.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare move round-trip latency to the game host in-process and across processes")
+    parser.add_argument('--games', type=int, default=100, help="games of 10 round trips per mode")
+    parser.add_argument('--warmup', type=int, default=5, help="untimed games before measuring")
+    parser.add_argument('--mode', choices=['both', 'in-process', 'cross-process'], default='both')
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    args = parser.parse_args(remove_ros_args(sys.argv)[1:])
+
+    rclpy.init()
+    results = {}
+    try:
+        if args.mode in ['both', 'in-process']:
+            results['in-process'] = run_in_process(args.games, args.warmup)
+        if args.mode in ['both', 'cross-process']:
+            results['cross-process'] = run_across_processes(args.games, args.warmup)
+    finally:
+        rclpy.shutdown()
+
+    for mode, summary in results.items():
+        print(f"{mode:14s} {summary['count']:6d} round trips   mean {summary['mean']:7.3f} ms   "
+              f"p50 {summary['p50']:7.3f} ms   p99 {summary['p99']:7.3f} ms   max {summary['max']:7.3f} ms")
+    if len(results) == 2:
+        print(f"cross-process / in-process p50: {results['cross-process']['p50'] / results['in-process']['p50']:.2f}x")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
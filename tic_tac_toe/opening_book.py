@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+import argparse
+import bisect
+import os
+import random
+import struct
+import sys
+from array import array
+
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, position_key, other_player
+
+BOOK_MAGIC = b'TTTB'
+BOOK_VERSION = 1
+# magic, version, board size, win length, book depth, record count
+BOOK_HEADER = struct.Struct('<4sBBBBI')
+KEY_TYPE = 'I'  # 32-bit keys cover boards up to 4x4, stored little-endian like the header
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+# Board configurations a book is generated for: (board size, win length, plies)
+SUPPORTED_CONFIGS = [(3, 3, 4)]
+
+
+def book_path(board_size, win_length):
+    """Default location of the book for a board configuration"""
+    return os.path.join(BOOK_DIR, f'book_{board_size}x{board_size}_k{win_length}.bin')
+
+
+def book_key(board, player):
+    """Position key with the side to move in the lowest bit"""
+    return position_key(board) * 2 + (1 if player == PLAYER_O else 0)
+
+
+class OpeningBook:
+    """Sorted table of (position key, move, weight) records
+
+    Every position may have several records, one per move that keeps the
+    game-theoretic value. The weight counts how many of the opponent's
+    replies lose, so moves that set traps are played more often.
+    """
+
+    def __init__(self, board_size, win_length, depth, keys, moves, weights):
+        self.board_size = board_size
+        self.win_length = win_length
+        self.depth = depth
+        self.keys = keys
+        self.moves = moves
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.keys)
+
+    def entries(self, board, player):
+        """Return [(move, weight)] for a position, empty on a miss"""
+        key = book_key(board, player)
+        start = bisect.bisect_left(self.keys, key)
+        end = start
+        while end < len(self.keys) and self.keys[end] == key:
+            end += 1
+        return [(self.moves[i], self.weights[i]) for i in range(start, end)]
+
+    def probe(self, board, player, randomize=True):
+        """Return a book move for the position or None
+
+        Without `randomize` the move with the highest weight is returned,
+        otherwise a move is drawn in proportion to the weights.
+        """
+        entries = self.entries(board, player)
+        if not entries:
+            return None
+        if not randomize:
+            return max(entries, key=lambda entry: entry[1])[0]
+        moves, weights = zip(*entries)
+        return random.choices(moves, weights=weights)[0]
+
+    def save(self, path):
+        """Write the book as a header followed by packed sorted columns"""
+        with open(path, 'wb') as f:
+            f.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, self.board_size,
+                                     self.win_length, self.depth, len(self.keys)))
+            keys = array(KEY_TYPE, self.keys)
+            if sys.byteorder == 'big':
+                keys.byteswap()
+            keys.tofile(f)
+            array('B', self.moves).tofile(f)
+            array('B', self.weights).tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a book written by `save`"""
+        with open(path, 'rb') as f:
+            magic, version, board_size, win_length, depth, count = BOOK_HEADER.unpack(
+                f.read(BOOK_HEADER.size))
+            if magic != BOOK_MAGIC or version != BOOK_VERSION:
+                raise ValueError(f"{path} is not an opening book")
+            keys = array(KEY_TYPE)
+            keys.fromfile(f, count)
+            if sys.byteorder == 'big':
+                keys.byteswap()
+            moves = array('B')
+            moves.fromfile(f, count)
+            weights = array('B')
+            weights.fromfile(f, count)
+        return cls(board_size, win_length, depth, keys, moves, weights)
+
+    @classmethod
+    def load_default(cls, board_size, win_length):
+        """Load the shipped book for a configuration, None if there is none"""
+        path = book_path(board_size, win_length)
+        if not os.path.exists(path):
+            return None
+        return cls.load(path)
+
+
+def generate_book(board_size=3, win_length=3, depth=4, max_depth=None):
+    """Build a book for every position up to `depth` plies from the start
+
+    Both players may move first, so positions are explored with X and
+    with O opening the game.
+    """
+    engine = Engine(board_size, win_length, max_depth=max_depth)
+    records = {}
+
+    def visit(board, player, ply):
+        key = book_key(board, player)
+        if ply >= depth or key in records or engine.check_winner(board):
+            return
+        scores = engine.score_moves(board, player)
+        best = max(scores.values())
+        entries = []
+        for move, score in scores.items():
+            if score != best:
+                continue
+            board[move] = player
+            traps = 0
+            if not engine.check_winner(board):
+                replies = engine.score_moves(board, other_player(player))
+                traps = sum(1 for reply in replies.values() if reply < 0)
+            board[move] = EMPTY
+            entries.append((move, min(255, 1 + traps)))
+        records[key] = entries
+
+        for move in scores:
+            board[move] = player
+            visit(board, other_player(player), ply + 1)
+            board[move] = EMPTY
+
+    empty = [EMPTY] * (board_size * board_size)
+    visit(list(empty), PLAYER_X, 0)
+    visit(list(empty), PLAYER_O, 0)
+
+    keys, moves, weights = [], [], []
+    for key in sorted(records):
+        for move, weight in records[key]:
+            keys.append(key)
+            moves.append(move)
+            weights.append(weight)
+    return OpeningBook(board_size, win_length, depth, keys, moves, weights)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Tic-Tac-Toe opening books")
+    parser.add_argument('--size', type=int, help="board size (default: every supported configuration)")
+    parser.add_argument('--win', type=int, help="stones in a row needed to win")
+    parser.add_argument('--depth', type=int, default=4, help="plies covered by the book")
+    parser.add_argument('--search-depth', type=int, help="limit the search for large boards")
+    parser.add_argument('--output', help="output file (default: the shipped book path)")
+    args = parser.parse_args()
+
+    if args.size:
+        configs = [(args.size, args.win or args.size, args.depth)]
+    else:
+        configs = SUPPORTED_CONFIGS
+    for board_size, win_length, depth in configs:
+        book = generate_book(board_size, win_length, depth, args.search_depth)
+        path = args.output or book_path(board_size, win_length)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        book.save(path)
+        print(f"{board_size}x{board_size} k={win_length}: {len(book)} records -> {path}")
+
+
+if __name__ == '__main__':
+    main()
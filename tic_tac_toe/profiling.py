@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import cProfile
+import functools
+import os
+import pstats
+
+
+class StateProfiler:
+    """cProfile capture split by game state
+
+    Wrapped methods run under the profile of the state that was active
+    when the outermost wrapped call started, so nested draw calls are
+    attributed to a single screen.
+    """
+
+    def __init__(self, current_state):
+        self.current_state = current_state
+        self.profiles = {}
+        self.active = None
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.active is not None:
+                return func(*args, **kwargs)
+            state = self.current_state()
+            profile = self.profiles.get(state)
+            if profile is None:
+                profile = self.profiles[state] = cProfile.Profile()
+            self.active = profile
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self.active = None
+        return wrapper
+
+    def instrument(self, obj, names):
+        """Replace the named methods of `obj` with profiled wrappers"""
+        for name in names:
+            setattr(obj, name, self.wrap(getattr(obj, name)))
+
+    def dump(self, directory):
+        """Write one .prof file and a text report per state"""
+        directory = os.path.expanduser(directory)
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for state, profile in self.profiles.items():
+            path = os.path.join(directory, f'{state}.prof')
+            profile.dump_stats(path)
+            with open(os.path.join(directory, f'{state}.txt'), 'w') as f:
+                pstats.Stats(profile, stream=f).sort_stats('cumulative').print_stats(30)
+            paths.append(path)
+        return paths
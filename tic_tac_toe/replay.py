@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import tempfile
+import time
+
+import pygame
+import rclpy
+
+RECORDING_FORMAT = 'tic_tac_toe_input'
+RECORDING_VERSION = 2
+# Node parameters that change what the recorded input does; a replay must run with the same values
+REPLAYED_PARAMETERS = ['board_size', 'cell_size', 'window_width', 'window_height', 'ai_difficulty',
+                       'analysis_overlay', 'animation_time_scale', 'fast_mode', 'ai_think_duration',
+                       'ai_move_duration']
+# Event types that drive the game; window and focus events are not replayed
+RECORDED_EVENTS = {
+    pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.MOUSEMOTION,
+    pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL,
+}
+EVENT_ATTRIBUTES = ['pos', 'rel', 'buttons', 'button', 'key', 'mod', 'unicode', 'scancode', 'text',
+                    'x', 'y', 'flipped', 'touch']
+
+
+def encode_event(event):
+    """JSON-friendly dict of a pygame event"""
+    data = {'type': event.type}
+    for name in EVENT_ATTRIBUTES:
+        if hasattr(event, name):
+            value = getattr(event, name)
+            data[name] = list(value) if isinstance(value, tuple) else value
+    return data
+
+
+def decode_event(data):
+    """Inverse of `encode_event`"""
+    attributes = {name: tuple(value) if isinstance(value, list) else value
+                  for name, value in data.items() if name != 'type'}
+    return pygame.event.Event(data['type'], attributes)
+
+
+class InputRecorder:
+    """Writes the input of every frame to a JSON lines file
+
+    The first line holds the RNG seed of the session and the values of
+    REPLAYED_PARAMETERS, each following line one frame: its pygame tick,
+    the mouse position and the input events.
+    """
+
+    def __init__(self, path, seed, parameters):
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, 'w')
+        self.write({'format': RECORDING_FORMAT, 'version': RECORDING_VERSION, 'seed': seed,
+                    'parameters': parameters})
+        self.frames = 0
+
+    def write(self, data):
+        self.file.write(json.dumps(data, separators=(',', ':')) + '\n')
+
+    def record_frame(self, ticks, mouse_pos, events):
+        self.write({'t': ticks, 'mouse': list(mouse_pos),
+                    'events': [encode_event(event) for event in events if event.type in RECORDED_EVENTS]})
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class InputReplayer:
+    """Plays a recording back frame by frame on the recorded clock
+
+    The game sees the recorded ticks, so animations and timeouts line up
+    with the recorded input at any playback speed. `speed` scales the
+    wall-clock pacing; 0 plays the frames back as fast as they render.
+    """
+
+    def __init__(self, path, speed=1.0):
+        with open(os.path.expanduser(path)) as f:
+            header = json.loads(f.readline())
+            if header.get('format') != RECORDING_FORMAT:
+                raise ValueError(f"{path} is not an input recording")
+            if header.get('version') != RECORDING_VERSION:
+                raise ValueError(f"Unsupported input recording version {header.get('version')}")
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        self.seed = header['seed']
+        self.parameters = header['parameters']
+        self.speed = speed
+        self.index = 0
+        self.ticks = self.frames[0]['t'] if self.frames else 0
+        self.started = None
+
+    def mismatches(self, parameters):
+        """Names of the recorded parameters whose value differs in `parameters`"""
+        return [name for name, value in self.parameters.items() if parameters.get(name) != value]
+
+    def next_frame(self):
+        """Return (ticks, mouse_pos, events) of the next frame, or None at the end"""
+        if self.index >= len(self.frames):
+            return None
+        frame = self.frames[self.index]
+        self.index += 1
+        if self.started is None:
+            self.started = time.perf_counter()
+        elif self.speed > 0:
+            # Sleep until the frame is due on the scaled recorded timeline
+            due = self.started + (frame['t'] - self.frames[0]['t']) / 1000 / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.ticks = frame['t']
+        return frame['t'], tuple(frame['mouse']), [decode_event(event) for event in frame['events']]
+
+    def stats(self):
+        """Frames played, recorded and wall-clock duration and the resulting speedup"""
+        recorded = (self.frames[-1]['t'] - self.frames[0]['t']) / 1000 if self.frames else 0.0
+        wall = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            'frames': self.index,
+            'recorded_seconds': recorded,
+            'wall_seconds': wall,
+            'speedup': recorded / wall if wall else None,
+        }
+
+
+def write_report(path, replay_stats, summary):
+    """Write the replay statistics and timing histograms to a JSON file"""
+    path = os.path.expanduser(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                   'replay': replay_stats, 'timings': summary}, f, indent=2, sort_keys=True)
+    return path
+
+
+@contextlib.contextmanager
+def scratch_files(prefix):
+    """ROS arguments that point the game log and leaderboard into a temporary directory
+
+    Tools that run a game node use this, so their games stay out of the
+    user's files. The directory is removed on exit.
+    """
+    with tempfile.TemporaryDirectory(prefix=prefix) as scratch:
+        yield ['-p', f'game_log_path:={os.path.join(scratch, "games.log")}',
+               '-p', f'leaderboard_path:={os.path.join(scratch, "leaderboard.db")}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Tic-Tac-Toe session and report frame timings")
+    parser.add_argument('recording', help="file written with -p record_input:=<path>")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="playback speed, 1 = real time, 0 = as fast as possible (default)")
+    parser.add_argument('--report', default='', help="JSON report path (default: next to the recording)")
+    parser.add_argument('--render-mode', default='offscreen', choices=['window', 'offscreen', 'none'])
+    args = parser.parse_args()
+
+    report = args.report or os.path.splitext(args.recording)[0] + '.report.json'
+    with open(os.path.expanduser(args.recording)) as f:
+        recorded = json.loads(f.readline()).get('parameters', {})
+    # The node refuses to replay with other values, so run it with the recorded ones
+    overrides = []
+    for name, value in recorded.items():
+        overrides += ['-p', f'{name}:={json.dumps(value)}']
+    with scratch_files('tic_tac_toe_replay_') as scratch_args:
+        rclpy.init(args=['--ros-args',
+                         '-p', f'replay_input:={args.recording}',
+                         '-p', f'replay_speed:={args.speed}',
+                         '-p', f'replay_report:={report}',
+                         '-p', f'render_mode:={args.render_mode}'] + scratch_args + overrides)
+        # Imported here because tic_tac_toe_ros imports this module
+        from tic_tac_toe.tic_tac_toe_ros import TicTacToe
+        game = TicTacToe()
+        try:
+            game.run()
+        finally:
+            game.destroy_node()
+            rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
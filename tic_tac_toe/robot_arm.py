@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import math
+from functools import lru_cache
+
+import pygame
+
+ARM_LENGTHS = (140, 160)  # Upper and lower segment
+TRAJECTORY_SAMPLES = 121  # Every 1/120, so the phase changes at 0.4, 0.6 and 0.8 fall on samples
+HOVER_Y = 20  # Height the gripper travels at above the board
+BASE_WIDTH = 30
+BASE_HEIGHT = 80
+GRIPPER_HEIGHT = 30
+GRIPPER_OPEN = 24
+GRIPPER_CLOSED = 14
+HYDRAULIC_OFFSET = 5
+
+
+def end_effector(progress, target):
+    """Gripper position (x, y) at `progress` (0-1) of a move to `target`"""
+    target_x, target_y = target
+    if progress < 0.4:  # Moving above the target
+        return target_x, HOVER_Y
+    if progress < 0.6:  # Lowering onto the target
+        return target_x, HOVER_Y + (target_y - HOVER_Y) * (progress - 0.4) / 0.2
+    if progress < 0.8:  # Gripping and placing the mark
+        return target_x, target_y
+    # Raising after the placement
+    return target_x, target_y - (target_y - HOVER_Y) * (progress - 0.8) / 0.2
+
+
+def gripper_closed(progress):
+    return 0.6 <= progress < 0.8
+
+
+def solve_joint(base, end):
+    """Elbow position and upper-segment angle reaching `end` from `base` (two-link inverse kinematics)"""
+    length1, length2 = ARM_LENGTHS
+    dx = end[0] - base[0]
+    dy = end[1] - base[1]
+    # Constrain the distance to what the arm can reach
+    dist = max(abs(length1 - length2) + 10, min(length1 + length2 - 10, math.hypot(dx, dy)))
+    angle = math.atan2(dy, dx) + math.acos((length1 * length1 + dist * dist - length2 * length2)
+                                           / (2 * length1 * dist))
+    return base[0] + length1 * math.cos(angle), base[1] + length1 * math.sin(angle), angle
+
+
+@lru_cache(maxsize=None)
+def trajectory(base, target, samples=TRAJECTORY_SAMPLES):
+    """Arm poses sampled evenly over a move, one table per base and target
+
+    Each pose is (joint_x, joint_y, end_x, end_y, hydraulic_dx, hydraulic_dy),
+    the last two offsetting the hydraulic line from the upper segment.
+    """
+    poses = []
+    for i in range(samples):
+        end_x, end_y = end_effector(i / (samples - 1), target)
+        joint_x, joint_y, angle = solve_joint(base, (end_x, end_y))
+        poses.append((joint_x, joint_y, end_x, end_y,
+                      HYDRAULIC_OFFSET * math.cos(angle + math.pi / 2),
+                      HYDRAULIC_OFFSET * math.sin(angle + math.pi / 2)))
+    return tuple(poses)
+
+
+def pose_at(poses, progress):
+    """Interpolate the pose at `progress` (0-1) between the two nearest samples"""
+    position = min(max(progress, 0.0), 1.0) * (len(poses) - 1)
+    index = min(int(position), len(poses) - 2)
+    fraction = position - index
+    return tuple(a + (b - a) * fraction for a, b in zip(poses[index], poses[index + 1]))
+
+
+class RobotArm:
+    """Pick-and-place arm drawn from precomputed trajectories and sprites
+
+    Only the segments move; the base and the gripper are blitted from
+    sprites rendered once.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.base_sprite = self.render_base()
+        self.gripper_sprites = {}
+
+    def render_base(self):
+        # Sprite origin is the top-left corner of the mounting plates at (base - 15, base - 45)
+        sprite = pygame.Surface((BASE_WIDTH + 10, BASE_HEIGHT + 10), pygame.SRCALPHA)
+        x, y = 15, BASE_HEIGHT // 2 + 5
+        pygame.draw.rect(sprite, (50, 50, 60), (x - 10, y - BASE_HEIGHT // 2, BASE_WIDTH, BASE_HEIGHT))
+        # Metallic details
+        pygame.draw.rect(sprite, (80, 80, 90), (x - 5, y - BASE_HEIGHT // 2 + 5, BASE_WIDTH - 10, BASE_HEIGHT - 10))
+        pygame.draw.rect(sprite, (30, 30, 35), (x - 15, y - BASE_HEIGHT // 2 - 5, BASE_WIDTH + 10, 10))
+        pygame.draw.rect(sprite, (30, 30, 35), (x - 15, y + BASE_HEIGHT // 2 - 5, BASE_WIDTH + 10, 10))
+        # Mounting bolts
+        for bx, by in [(x - 5, y - BASE_HEIGHT // 2 + 10), (x - 5, y + BASE_HEIGHT // 2 - 10),
+                       (x + BASE_WIDTH - 15, y - BASE_HEIGHT // 2 + 10),
+                       (x + BASE_WIDTH - 15, y + BASE_HEIGHT // 2 - 10)]:
+            pygame.draw.circle(sprite, (120, 120, 130), (bx, by), 4)
+            pygame.draw.circle(sprite, (180, 180, 190), (bx, by), 2)
+        return sprite
+
+    def gripper_sprite(self, closed, mark_color):
+        """Gripper jaws, holding the mark when closed; its top centre is the end of the arm"""
+        key = (closed, mark_color if closed else None)
+        sprite = self.gripper_sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((GRIPPER_OPEN, GRIPPER_HEIGHT), pygame.SRCALPHA)
+            center = GRIPPER_OPEN // 2
+            width = GRIPPER_CLOSED if closed else GRIPPER_OPEN
+            left = center - width // 2
+            right = center + width // 2
+            # End effector base connecting to the arm
+            pygame.draw.rect(sprite, (70, 70, 80), (center - 6, 0, 12, 10))
+            pygame.draw.polygon(sprite, (100, 100, 110), [
+                (center - 6, 10), (left, 10), (left, GRIPPER_HEIGHT), (left + 8, GRIPPER_HEIGHT), (center - 6, 15)])
+            pygame.draw.polygon(sprite, (100, 100, 110), [
+                (center + 6, 10), (right, 10), (right, GRIPPER_HEIGHT), (right - 8, GRIPPER_HEIGHT), (center + 6, 15)])
+            if closed:
+                pygame.draw.circle(sprite, mark_color, (center, GRIPPER_HEIGHT // 2), 10, 3)
+            self.gripper_sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface, target, progress, mark_color):
+        """Draw the arm at `progress` (0-1) of its move to the `target` point"""
+        base_x, base_y = self.base
+        joint_x, joint_y, end_x, end_y, hyd_dx, hyd_dy = pose_at(trajectory(self.base, target), progress)
+
+        surface.blit(self.base_sprite, (base_x - 15, base_y - BASE_HEIGHT // 2 - 5))
+
+        # Upper segment with its hydraulic cylinder
+        pygame.draw.line(surface, (60, 60, 70), (base_x, base_y), (joint_x, joint_y), 12)
+        pygame.draw.line(surface, (100, 100, 110), (base_x, base_y), (joint_x, joint_y), 8)
+        pygame.draw.line(surface, (40, 40, 45), (base_x + hyd_dx, base_y + hyd_dy),
+                         (joint_x + hyd_dx, joint_y + hyd_dy), 4)
+        # Lower segment and the joint between the two
+        pygame.draw.line(surface, (80, 80, 90), (joint_x, joint_y), (end_x, end_y), 8)
+        pygame.draw.line(surface, (120, 120, 130), (joint_x, joint_y), (end_x, end_y), 5)
+        pygame.draw.circle(surface, (50, 50, 60), (int(joint_x), int(joint_y)), 8)
+        pygame.draw.circle(surface, (100, 100, 110), (int(joint_x), int(joint_y)), 5)
+
+        surface.blit(self.gripper_sprite(gripper_closed(progress), mark_color),
+                     (int(end_x) - GRIPPER_OPEN // 2, int(end_y)))
+
+        # Activity light
+        light_color = (0, 255, 0) if progress < 0.8 else (255, 255, 0)
+        pygame.draw.circle(surface, light_color, (int(base_x + 10), int(base_y - BASE_HEIGHT // 2 + 15)), 3)
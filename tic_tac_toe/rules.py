@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+from enum import Enum
+
+# Board symbols shared by the game node and the offline tools
+PLAYER_X = 'X'
+PLAYER_O = 'O'
+EMPTY = None
+DRAW = "DRAW"
+
+
+# Difficulty levels enumeration
+class Difficulty(Enum):
+    EASY = "Easy"
+    MEDIUM = "Medium"
+    HARD = "Hard"
+    IMPOSSIBLE = "Impossible"
+
+
+# Difficulties by their lowercase names, as used in parameters and commands
+DIFFICULTIES = {difficulty.value.lower(): difficulty for difficulty in Difficulty}
+
+
+def win_lines(board_size=3, win_length=None):
+    """Return every winning line as a tuple of cell indices"""
+    if win_length is None:
+        win_length = board_size
+    lines = []
+    directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # row, column, diagonal, anti-diagonal
+    for row in range(board_size):
+        for col in range(board_size):
+            for d_row, d_col in directions:
+                end_row = row + d_row * (win_length - 1)
+                end_col = col + d_col * (win_length - 1)
+                if 0 <= end_row < board_size and 0 <= end_col < board_size:
+                    lines.append(tuple((row + d_row * k) * board_size + col + d_col * k
+                                       for k in range(win_length)))
+    return lines
+
+
+def other_player(player):
+    """Return the opponent of the given player"""
+    return PLAYER_O if player == PLAYER_X else PLAYER_X
+
+
+def position_key(board):
+    """Encode a board as a base-3 integer (empty=0, X=1, O=2)"""
+    key = 0
+    for cell in reversed(board):
+        key = key * 3 + (0 if cell is EMPTY else 1 if cell == PLAYER_X else 2)
+    return key
+
+
+def board_from_key(key, cells=9):
+    """Decode a base-3 position key back into a board list"""
+    board = []
+    for _ in range(cells):
+        key, code = divmod(key, 3)
+        board.append((EMPTY, PLAYER_X, PLAYER_O)[code])
+    return board
+
+
+# Second word of the state line of a session the host dropped
+SESSION_REMOVED = 'removed'
+
+
+def format_state(session_id, board, current_player, winner, score, difficulty):
+    """One-line text form of a game, published on the state topics
+
+    "<session> <cells> <to move> <winner or -> <X score> <O score> <mode>",
+    where cells uses '.' for empty squares and mode is the difficulty or pvp.
+    """
+    cells = ''.join(cell or '.' for cell in board)
+    mode = difficulty.value.lower() if difficulty else 'pvp'
+    return (f"{session_id} {cells} {current_player} {winner or '-'} "
+            f"{score[PLAYER_X]} {score[PLAYER_O]} {mode}")
+
+
+def format_removal(session_id):
+    """State line telling spectators that a session is gone: '<session> removed'"""
+    return f"{session_id} {SESSION_REMOVED}"
+
+
+def parse_state(text):
+    """Inverse of `format_state` and `format_removal`, returns a dict
+
+    A removal only has 'session_id' and 'removed'; every state line has
+    'removed' False.
+    """
+    words = text.split()
+    if len(words) == 2 and words[1] == SESSION_REMOVED:
+        return {'session_id': words[0], 'removed': True}
+    session_id, cells, to_move, winner, score_x, score_o, mode = words
+    return {
+        'session_id': session_id,
+        'board': [None if cell == '.' else cell for cell in cells],
+        'current_player': to_move,
+        'winner': None if winner == '-' else winner,
+        'score': {PLAYER_X: int(score_x), PLAYER_O: int(score_o)},
+        'mode': mode,
+        'removed': False,
+    }
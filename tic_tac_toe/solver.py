@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, DRAW
+from tic_tac_toe.tablebase import Tablebase
+
+CELL_SYMBOLS = {'X': PLAYER_X, 'x': PLAYER_X, 'O': PLAYER_O, 'o': PLAYER_O, '.': EMPTY, '-': EMPTY, '_': EMPTY}
+MAX_CACHED_LINES = 1 << 20
+
+
+class PositionSolver:
+    """Annotates positions with their game-theoretic value and best moves
+
+    Input lines are "<cells> [X|O]": one character per cell, X, O or '.'
+    (also '-' or '_') for empty, optionally followed by the side to move.
+    Without it the side with fewer stones moves, X on equal counts. The
+    answer is "<cells> <to move> <value> <plies> <best moves>", the value
+    being win, draw or loss for the side to move and plies the distance to
+    the result under perfect play. A finished game is a loss (or draw)
+    in 0 plies with '-' as moves; malformed lines come back as
+    "<line> invalid <reason>" and blank lines as blank lines, so output
+    line n always answers input line n.
+
+    Answers are cached by input line, so the 3x3 position space is solved
+    once and every further line is a dictionary lookup.
+    """
+
+    def __init__(self, board_size=3, win_length=None):
+        self.engine = Engine(board_size, win_length,
+                             tablebase=Tablebase.load_default(board_size, win_length or board_size))
+        self.cells = self.engine.cells
+        self.answers = {}
+
+    def parse(self, line):
+        """Return (board, player) of an input line; raises ValueError if malformed"""
+        fields = line.split()
+        if not fields or len(fields) > 2:
+            raise ValueError("expected '<cells> [X|O]'")
+        cells = fields[0]
+        if len(cells) != self.cells:
+            raise ValueError(f"expected {self.cells} cells")
+        try:
+            board = [CELL_SYMBOLS[cell] for cell in cells]
+        except KeyError as e:
+            raise ValueError(f"bad cell {e.args[0]!r}") from None
+        x_count = board.count(PLAYER_X)
+        o_count = board.count(PLAYER_O)
+        # Either side may open, so the counts differ by at most one
+        if abs(x_count - o_count) > 1:
+            raise ValueError("impossible stone counts")
+        if len(fields) == 2:
+            player = fields[1].upper()
+            if player not in (PLAYER_X, PLAYER_O):
+                raise ValueError(f"bad side to move {fields[1]!r}")
+            if (player == PLAYER_X and x_count > o_count) or (player == PLAYER_O and o_count > x_count):
+                raise ValueError(f"{player} cannot be to move")
+        else:
+            player = PLAYER_O if x_count > o_count else PLAYER_X
+        return board, player
+
+    def solve(self, board, player):
+        """Return (value, plies, best moves) for `player` to move"""
+        winner = self.engine.check_winner(board)
+        if winner == DRAW:
+            return 'draw', 0, []
+        if winner:
+            lines = {board[line[0]] for line in self.engine.lines
+                     if board[line[0]] is not EMPTY and all(board[cell] == board[line[0]] for cell in line)}
+            if len(lines) > 1:
+                raise ValueError("both sides have a line")
+            if winner == player:
+                raise ValueError("side to move has already won")
+            return 'loss', 0, []
+        scores = self.engine.score_moves(board, player)
+        best = max(scores.values())
+        moves = [cell for cell, score in scores.items() if score == best]
+        if best > 0:
+            return 'win', self.engine.win_score - best, moves
+        if best < 0:
+            return 'loss', self.engine.win_score + best, moves
+        return 'draw', board.count(EMPTY), moves
+
+    def answer(self, line):
+        """Answer line for one input line, without the newline"""
+        line = line.strip()
+        if not line:
+            return ''
+        answer = self.answers.get(line)
+        if answer is None:
+            try:
+                board, player = self.parse(line)
+                value, plies, moves = self.solve(board, player)
+                cells = ''.join(cell or '.' for cell in board)
+                answer = f"{cells} {player} {value} {plies} {','.join(map(str, moves)) or '-'}"
+            except ValueError as e:
+                answer = f"{line} invalid {e}"
+            if len(self.answers) >= MAX_CACHED_LINES:
+                # Only large boards get here; bound the memory of both caches
+                self.answers.clear()
+                self.engine.clear_cache()
+            self.answers[line] = answer
+        return answer
+
+    def answer_chunk(self, lines):
+        return ''.join(self.answer(line) + '\n' for line in lines)
+
+
+# Per-process solver of the worker pool
+_worker_solver = None
+
+
+def _init_worker(board_size, win_length):
+    global _worker_solver
+    _worker_solver = PositionSolver(board_size, win_length)
+
+
+def _answer_chunk(lines):
+    return _worker_solver.answer_chunk(lines)
+
+
+def chunks(lines, size):
+    """Yield lists of up to `size` lines"""
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_stream(lines, output, board_size=3, win_length=None, workers=1, chunk_size=4096):
+    """Answer every line of `lines` to `output` in input order; returns the number of chunks
+
+    With several workers at most two chunks per worker are in flight, so
+    memory stays bounded however long the input is.
+    """
+    count = 0
+    if workers <= 1:
+        solver = PositionSolver(board_size, win_length)
+        for chunk in chunks(lines, chunk_size):
+            output.write(solver.answer_chunk(chunk))
+            count += 1
+        return count
+    with Pool(workers, initializer=_init_worker, initargs=(board_size, win_length)) as pool:
+        pending = deque()
+        for chunk in chunks(lines, chunk_size):
+            pending.append(pool.apply_async(_answer_chunk, (chunk,)))
+            if len(pending) >= 2 * workers:
+                output.write(pending.popleft().get())
+            count += 1
+        while pending:
+            output.write(pending.popleft().get())
+    return count
+
+
+class CountingLines:
+    """Iterates the lines of a file, counting them"""
+
+    def __init__(self, source):
+        self.source = source
+        self.count = 0
+
+    def __iter__(self):
+        for line in self.source:
+            self.count += 1
+            yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Annotate Tic-Tac-Toe positions with their value and best moves, one per line")
+    parser.add_argument('input', nargs='?', default='-', help="positions file (default: stdin)")
+    parser.add_argument('--size', type=int, default=3, help="board size")
+    parser.add_argument('--win', type=int, help="stones in a row needed to win (default: the board size)")
+    parser.add_argument('--workers', type=int, default=1, help="solver processes, 0 = one per CPU")
+    parser.add_argument('--chunk-size', type=int, default=4096, help="lines per work unit")
+    parser.add_argument('--stats', action='store_true', help="print the throughput to stderr")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    source = sys.stdin if args.input == '-' else open(args.input)
+    counted = CountingLines(source)
+    try:
+        solve_stream(counted, sys.stdout, args.size, args.win, args.workers or os.cpu_count(), args.chunk_size)
+    except BrokenPipeError:
+        # Output closed early, e.g. piped into head; keep the interpreter from failing on its final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    sys.stdout.flush()
+    if args.stats:
+        seconds = time.perf_counter() - started
+        print(f"{counted.count} positions in {seconds:.2f} s ({counted.count / seconds:.0f}/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
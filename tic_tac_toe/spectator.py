@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+import math
+import os
+import threading
+import time
+
+import pygame
+import rclpy
+from rclpy.node import Node
+from std_msgs.msg import String
+
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, DRAW, parse_state
+
+BACKGROUND = (240, 240, 240)
+TILE_BACKGROUND = (255, 255, 255)
+LINE_COLOR = (70, 70, 70)
+TEXT_COLOR = (30, 30, 30)
+X_COLOR = (255, 50, 50)
+O_COLOR = (50, 50, 255)
+RESULT_COLORS = {PLAYER_X: X_COLOR, PLAYER_O: O_COLOR, DRAW: (150, 150, 150)}
+LABEL_HEIGHT = 16
+PADDING = 6
+
+
+class SpriteCache:
+    """Grid and mark sprites, rendered once per board size"""
+
+    def __init__(self):
+        self.sprites = {}
+
+    def grid(self, board_px, board_size):
+        key = ('grid', board_px, board_size)
+        if key not in self.sprites:
+            surface = pygame.Surface((board_px, board_px))
+            surface.fill(TILE_BACKGROUND)
+            cell = board_px / board_size
+            width = max(1, board_px // 100)
+            for i in range(1, board_size):
+                offset = round(i * cell)
+                pygame.draw.line(surface, LINE_COLOR, (offset, 0), (offset, board_px), width)
+                pygame.draw.line(surface, LINE_COLOR, (0, offset), (board_px, offset), width)
+            self.sprites[key] = surface
+        return self.sprites[key]
+
+    def mark(self, symbol, cell_px):
+        key = (symbol, cell_px)
+        if key not in self.sprites:
+            surface = pygame.Surface((cell_px, cell_px), pygame.SRCALPHA)
+            margin = max(2, cell_px // 5)
+            width = max(1, cell_px // 15)
+            if symbol == PLAYER_X:
+                pygame.draw.line(surface, X_COLOR, (margin, margin), (cell_px - margin, cell_px - margin), width)
+                pygame.draw.line(surface, X_COLOR, (cell_px - margin, margin), (margin, cell_px - margin), width)
+            else:
+                pygame.draw.circle(surface, O_COLOR, (cell_px // 2, cell_px // 2), cell_px // 2 - margin, width)
+            self.sprites[key] = surface
+        return self.sprites[key]
+
+
+class BoardTile:
+    """One spectated game: its latest state and its place on screen"""
+
+    def __init__(self, key):
+        self.key = key
+        self.state = None
+        self.rect = None
+        self.dirty = True
+        self.last_seen = time.monotonic()
+
+
+class Spectator(Node):
+    """Grid view of many live games, fed by game-state topics
+
+    A game leaves the grid when its publisher reports it removed, or after
+    `tile_timeout` seconds without a state line. Boards are only published
+    when they change, so the timeout is off by default.
+    """
+
+    def __init__(self):
+        super().__init__('tic_tac_toe_spectator')
+        self.declare_parameter('state_topics', ['/tic_tac_toe_host/state', '/tic_tac_toe_node/state'])
+        self.declare_parameter('window_width', 1280)
+        self.declare_parameter('window_height', 720)
+        self.declare_parameter('max_fps', 60)
+        self.declare_parameter('render_mode', 'window')  # 'window' or 'offscreen'
+        self.declare_parameter('tile_timeout', 0.0)  # 0 = keep quiet games
+
+        self.render_mode = self.get_parameter('render_mode').value
+        if self.render_mode != 'window':
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.init()
+        size = (self.get_parameter('window_width').value, self.get_parameter('window_height').value)
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption("ROS 2 Tic-Tac-Toe Spectator")
+        self.font = pygame.font.SysFont('Arial', 12)
+        self.clock = pygame.time.Clock()
+        self.max_fps = self.get_parameter('max_fps').value
+        self.tile_timeout = self.get_parameter('tile_timeout').value
+
+        self.sprites = SpriteCache()
+        self.tiles = {}
+        self.layout_dirty = True
+        # Latest state line per game, written by the ROS thread and swapped out once per frame
+        self.incoming = {}
+        self.incoming_lock = threading.Lock()
+
+        self.state_subscriptions = [
+            self.create_subscription(String, topic, lambda msg, topic=topic: self.handle_state(topic, msg), 100)
+            for topic in self.get_parameter('state_topics').value
+        ]
+        self.get_logger().info("Spectator started")
+
+    def handle_state(self, topic, msg):
+        session_id = msg.data.split(' ', 1)[0]
+        with self.incoming_lock:
+            self.incoming[(topic, session_id)] = msg.data
+
+    def apply_incoming(self):
+        """Take the state lines received since the last frame"""
+        with self.incoming_lock:
+            incoming, self.incoming = self.incoming, {}
+        for key, line in incoming.items():
+            try:
+                state = parse_state(line)
+            except ValueError:
+                self.get_logger().warn(f"Malformed state '{line}'")
+                continue
+            if state['removed']:
+                if self.tiles.pop(key, None):
+                    self.layout_dirty = True
+                continue
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = self.tiles[key] = BoardTile(key)
+                self.layout_dirty = True
+            tile.last_seen = time.monotonic()
+            if state != tile.state:
+                tile.state = state
+                tile.dirty = True
+
+    def drop_quiet_tiles(self):
+        """Forget the games that published nothing for `tile_timeout` seconds"""
+        if self.tile_timeout <= 0:
+            return
+        cutoff = time.monotonic() - self.tile_timeout
+        for key in [key for key, tile in self.tiles.items() if tile.last_seen < cutoff]:
+            del self.tiles[key]
+            self.layout_dirty = True
+
+    def layout(self):
+        """Tile the boards over the window; only needed when the set of games changes"""
+        width, height = self.screen.get_size()
+        count = max(1, len(self.tiles))
+        columns = math.ceil(math.sqrt(count * width / height))
+        rows = math.ceil(count / columns)
+        self.tile_size = min(width // columns, height // rows)
+        # Numeric session ids sort as numbers so host boards appear in order
+        order = sorted(self.tiles, key=lambda key: (key[0], key[1].isdigit(), int(key[1]) if key[1].isdigit() else key[1]))
+        for i, key in enumerate(order):
+            tile = self.tiles[key]
+            tile.rect = pygame.Rect((i % columns) * self.tile_size, (i // columns) * self.tile_size,
+                                    self.tile_size, self.tile_size)
+            tile.dirty = True
+        self.screen.fill(BACKGROUND)
+        self.layout_dirty = False
+
+    def draw_tile(self, tile):
+        state = tile.state
+        inner = tile.rect.inflate(-PADDING, -PADDING)
+        pygame.draw.rect(self.screen, BACKGROUND, tile.rect)
+        if state is None:
+            return
+        board_size = math.isqrt(len(state['board']))
+        board_px = max(board_size, min(inner.width, inner.height - LABEL_HEIGHT))
+        cell_px = board_px // board_size
+        board_px = cell_px * board_size
+        origin = (inner.x + (inner.width - board_px) // 2, inner.y)
+
+        self.screen.blit(self.sprites.grid(board_px, board_size), origin)
+        for i, cell in enumerate(state['board']):
+            if cell:
+                row, col = divmod(i, board_size)
+                self.screen.blit(self.sprites.mark(cell, cell_px),
+                                 (origin[0] + col * cell_px, origin[1] + row * cell_px))
+        if state['winner']:
+            pygame.draw.rect(self.screen, RESULT_COLORS.get(state['winner'], TEXT_COLOR),
+                             (origin[0], origin[1], board_px, board_px), 2)
+
+        label = (f"{state['session_id']}  {state['score'][PLAYER_X]}-{state['score'][PLAYER_O]}"
+                 f"  {state['mode']}")
+        text = self.font.render(label, True, TEXT_COLOR)
+        self.screen.blit(text, (inner.x + (inner.width - text.get_width()) // 2, inner.y + board_px + 2))
+
+    def draw_frame(self):
+        """Redraw only the tiles whose game changed and push those rects to the display"""
+        full_redraw = self.layout_dirty
+        if self.layout_dirty:
+            self.layout()
+        dirty_rects = []
+        for tile in self.tiles.values():
+            if tile.dirty:
+                self.draw_tile(tile)
+                tile.dirty = False
+                dirty_rects.append(tile.rect)
+        if self.render_mode == 'window':
+            if full_redraw:
+                pygame.display.flip()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
+        return dirty_rects
+
+    def run(self):
+        # ROS callbacks run on their own thread; pygame stays on this one
+        spin_thread = threading.Thread(target=rclpy.spin, args=(self,), daemon=True)
+        spin_thread.start()
+        while rclpy.ok():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return
+            self.apply_incoming()
+            self.drop_quiet_tiles()
+            self.draw_frame()
+            self.clock.tick(self.max_fps)
+
+
+def main():
+    rclpy.init()
+    spectator = Spectator()
+    try:
+        spectator.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pygame.quit()
+        spectator.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
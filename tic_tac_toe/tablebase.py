@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from functools import lru_cache
+from math import comb
+from multiprocessing import Pool
+
+import numpy as np
+
+from tic_tac_toe.opening_book import BOOK_DIR
+from tic_tac_toe.rules import EMPTY, win_lines
+
+TABLEBASE_MAGIC = b'TTTR'
+TABLEBASE_VERSION = 1
+# magic, version, board size, win length
+TABLEBASE_HEADER = struct.Struct('<4sBBB')
+
+# One byte per position: result in the top bits, plies to the result below
+RESULT_DRAW = 0
+RESULT_WIN = 1
+RESULT_LOSS = 2
+RESULT_ILLEGAL = 3
+RESULT_SHIFT = 5
+PLIES_MASK = (1 << RESULT_SHIFT) - 1
+MAX_CELLS = 16  # 16-bit masks; plies up to 16 fit below RESULT_SHIFT
+
+CHUNK_SIZE = 1 << 18
+
+
+# Positions are stored from the side to move ("us") against the side that
+# just moved ("them"), as two bit masks. With n stones on the board the side
+# that just moved has ceil(n/2) of them whichever side opened, so one table
+# covers both openers and both colors.
+#
+# Perfect hash of a layer of n stones: the occupied cells and, within them,
+# the cells of "them" are each ranked in colex order, which for bit masks of
+# equal popcount is plain numeric order:
+#   index = rank(occupied) * C(n, ceil(n/2)) + rank(them within occupied)
+
+def them_count(stones):
+    return (stones + 1) // 2
+
+
+def layer_size(cells, stones):
+    return comb(cells, stones) * comb(stones, them_count(stones))
+
+
+@lru_cache(maxsize=None)
+def colex_ranks(bits):
+    """Rank of every `bits`-bit mask among the masks with the same popcount"""
+    masks = np.arange(1 << bits, dtype=np.int64)
+    ranks = np.zeros(1 << bits, dtype=np.int64)
+    seen = np.zeros(1 << bits, dtype=np.int64)
+    for bit in range(bits):
+        present = (masks >> bit) & 1
+        # C(bit, seen + 1) for the (seen + 1)-th set bit
+        ranks += present * np.array([comb(bit, k + 1) for k in range(bits + 1)], dtype=np.int64)[seen]
+        seen += present
+    ranks.setflags(write=False)
+    return ranks
+
+
+@lru_cache(maxsize=None)
+def masks_by_popcount(bits):
+    """For every popcount, the `bits`-bit masks with it in colex order"""
+    masks = np.arange(1 << bits, dtype=np.int64)
+    counts = np.zeros(1 << bits, dtype=np.int64)
+    for bit in range(bits):
+        counts += (masks >> bit) & 1
+    return [masks[counts == popcount] for popcount in range(bits + 1)]
+
+
+@lru_cache(maxsize=None)
+def line_masks(board_size, win_length):
+    return np.array([sum(1 << cell for cell in line) for line in win_lines(board_size, win_length)],
+                    dtype=np.int64)
+
+
+def deposit(values, occupied, cells):
+    """Scatter the low bits of `values` onto the set bits of `occupied`, in order"""
+    result = np.zeros_like(occupied)
+    taken = np.zeros_like(occupied)
+    for cell in range(cells):
+        present = (occupied >> cell) & 1
+        result |= ((values >> taken) & 1 & present) << cell
+        taken += present
+    return result
+
+
+def extract(values, occupied, cells):
+    """Gather the bits of `values` on the set bits of `occupied` into the low bits, in order"""
+    result = np.zeros_like(occupied)
+    taken = np.zeros_like(occupied)
+    for cell in range(cells):
+        present = (occupied >> cell) & 1
+        result |= ((values >> cell) & 1 & present) << taken
+        taken += present
+    return result
+
+
+def layer_positions(cells, stones, start, end):
+    """(us, them) masks of the positions with indices start..end-1 of a layer"""
+    index = np.arange(start, end, dtype=np.int64)
+    subsets = comb(stones, them_count(stones))
+    occupied = masks_by_popcount(cells)[stones][index // subsets]
+    them = deposit(masks_by_popcount(stones)[them_count(stones)][index % subsets], occupied, cells)
+    return occupied & ~them, them
+
+
+def layer_index(us, them, cells, stones):
+    """Inverse of `layer_positions`"""
+    occupied = us | them
+    return (colex_ranks(cells)[occupied] * comb(stones, them_count(stones))
+            + colex_ranks(stones)[extract(them, occupied, cells)])
+
+
+def has_line(masks, lines):
+    return ((masks[:, None] & lines) == lines).any(axis=1)
+
+
+def solve_chunk(board_size, win_length, stones, start, end, child_path):
+    """Values of one chunk of a layer, from the finished layer with one more stone"""
+    cells = board_size * board_size
+    lines = line_masks(board_size, win_length)
+    us, them = layer_positions(cells, stones, start, end)
+    values = np.full(len(us), (RESULT_DRAW << RESULT_SHIFT) | (cells - stones), dtype=np.uint8)
+
+    lost = has_line(them, lines)
+    # The game would have ended before the side to move completed its line
+    illegal = has_line(us, lines)
+    values[lost] = RESULT_LOSS << RESULT_SHIFT
+    values[illegal] = RESULT_ILLEGAL << RESULT_SHIFT
+    playing = np.flatnonzero(~lost & ~illegal)
+    if stones == cells or not len(playing):
+        return values.tobytes()
+
+    children = np.memmap(child_path, dtype=np.uint8, mode='r')
+    us, them = us[playing], them[playing]
+    win_plies = np.full(len(playing), PLIES_MASK + 1, dtype=np.int64)
+    loss_plies = np.zeros(len(playing), dtype=np.int64)
+    can_draw = np.zeros(len(playing), dtype=bool)
+    for cell in range(cells):
+        free = np.flatnonzero(((us | them) >> cell) & 1 == 0)
+        # The child is seen from the opponent, who moves next
+        child = np.asarray(children[layer_index(them[free], us[free] | (1 << cell), cells, stones + 1)])
+        result = child >> RESULT_SHIFT
+        plies = (child & PLIES_MASK).astype(np.int64) + 1
+        win = free[result == RESULT_LOSS]
+        win_plies[win] = np.minimum(win_plies[win], plies[result == RESULT_LOSS])
+        can_draw[free[result == RESULT_DRAW]] = True
+        loss = free[result == RESULT_WIN]
+        loss_plies[loss] = np.maximum(loss_plies[loss], plies[result == RESULT_WIN])
+
+    won = win_plies <= PLIES_MASK
+    drawn = ~won & can_draw
+    lost = ~won & ~can_draw
+    values[playing[won]] = (RESULT_WIN << RESULT_SHIFT) | win_plies[won]
+    values[playing[lost]] = (RESULT_LOSS << RESULT_SHIFT) | loss_plies[lost]
+    # Drawn positions keep the default: the board fills up
+    del children
+    return values.tobytes()
+
+
+def _solve_chunk(job):
+    return solve_chunk(*job)
+
+
+def layer_path(work_dir, stones):
+    return os.path.join(work_dir, f'layer_{stones:02d}.bin')
+
+
+def build_tablebase(board_size, win_length, output, work_dir, workers=1, chunk_size=CHUNK_SIZE, log=print):
+    """Solve every layer from the full board back to the empty one, then write the tablebase
+
+    Each finished layer is a file in `work_dir`, written chunk by chunk, so
+    an interrupted run resumes from the last complete chunk. Only the layer
+    being solved and the mmap of the one above it are in use at a time.
+    """
+    cells = board_size * board_size
+    if cells > MAX_CELLS:
+        raise ValueError(f"Boards above {MAX_CELLS} cells are not supported")
+    os.makedirs(work_dir, exist_ok=True)
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for stones in range(cells, -1, -1):
+            path = layer_path(work_dir, stones)
+            size = layer_size(cells, stones)
+            if os.path.exists(path) and os.path.getsize(path) == size:
+                log(f"layer {stones:2d}: {size} positions, already solved")
+                continue
+            started = time.perf_counter()
+            partial = path + '.part'
+            done = os.path.getsize(partial) // chunk_size * chunk_size if os.path.exists(partial) else 0
+            jobs = [(board_size, win_length, stones, start, min(start + chunk_size, size),
+                     layer_path(work_dir, stones + 1))
+                    for start in range(done, size, chunk_size)]
+            with open(partial, 'ab') as f:
+                f.truncate(done)
+                results = pool.imap(_solve_chunk, jobs) if pool else map(_solve_chunk, jobs)
+                for values in results:
+                    f.write(values)
+                    f.flush()
+            os.replace(partial, path)
+            log(f"layer {stones:2d}: {size} positions in {time.perf_counter() - started:.1f} s"
+                + (f" (resumed at {done})" if done else ""))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    with open(output + '.part', 'wb') as f:
+        f.write(TABLEBASE_HEADER.pack(TABLEBASE_MAGIC, TABLEBASE_VERSION, board_size, win_length))
+        for stones in range(cells + 1):
+            with open(layer_path(work_dir, stones), 'rb') as layer:
+                f.write(layer.read())
+    os.replace(output + '.part', output)
+    return output
+
+
+def tablebase_path(board_size, win_length):
+    """Default location of the tablebase for a board configuration"""
+    return os.path.join(BOOK_DIR, f'tablebase_{board_size}x{board_size}_k{win_length}.bin')
+
+
+class Tablebase:
+    """Read-only view of a tablebase file through mmap
+
+    Probing a position ranks it the same way the solver does and reads one
+    byte, so the file is paged in on demand and shared between processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.board_size, self.win_length = TABLEBASE_HEADER.unpack_from(self.data)
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION:
+            raise ValueError(f"{path} is not a tablebase")
+        self.cells = self.board_size * self.board_size
+        self.win_score = self.cells + 1
+        self.offsets = []
+        offset = TABLEBASE_HEADER.size
+        for stones in range(self.cells + 1):
+            self.offsets.append(offset)
+            offset += layer_size(self.cells, stones)
+        if len(self.data) != offset:
+            raise ValueError(f"{path} is truncated")
+        self.ranks = colex_ranks(self.cells).tolist()
+        self.subsets = [comb(stones, them_count(stones)) for stones in range(self.cells + 1)]
+
+    @classmethod
+    def load_default(cls, board_size, win_length):
+        """Load the tablebase for a configuration, None if none was generated"""
+        path = tablebase_path(board_size, win_length)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def probe(self, board, player):
+        """Return (result, plies) for `player` to move, None if the position is not in the table"""
+        us = them = 0
+        for cell, symbol in enumerate(board):
+            if symbol is EMPTY:
+                continue
+            if symbol == player:
+                us |= 1 << cell
+            else:
+                them |= 1 << cell
+        occupied = us | them
+        stones = bin(occupied).count('1')
+        if bin(them).count('1') != them_count(stones):
+            return None  # The side to move does not follow from the stone counts
+        relative = taken = 0
+        for cell in range(self.cells):
+            if occupied >> cell & 1:
+                relative |= (them >> cell & 1) << taken
+                taken += 1
+        index = self.ranks[occupied] * self.subsets[stones] + self.ranks[relative]
+        value = self.data[self.offsets[stones] + index]
+        result = value >> RESULT_SHIFT
+        if result == RESULT_ILLEGAL:
+            return None
+        return result, value & PLIES_MASK
+
+    def score(self, board, player):
+        """Engine score of the position for `player` to move, None if not in the table"""
+        value = self.probe(board, player)
+        if value is None:
+            return None
+        result, plies = value
+        if result == RESULT_WIN:
+            return self.win_score - plies
+        if result == RESULT_LOSS:
+            return plies - self.win_score
+        return 0
+
+    def close(self):
+        self.data.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve N x N Tic-Tac-Toe by retrograde analysis into a tablebase")
+    parser.add_argument('--size', type=int, default=4, help="board size (up to 4)")
+    parser.add_argument('--win', type=int, help="stones in a row needed to win (default: the board size)")
+    parser.add_argument('--workers', type=int, default=0, help="solver processes, 0 = one per CPU")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="positions per work unit")
+    parser.add_argument('--work-dir', help="layer checkpoints (default: ~/.ros/tic_tac_toe/tablebase_<size>x<size>_k<win>)")
+    parser.add_argument('--output', help="output file (default: next to the opening books)")
+    args = parser.parse_args()
+
+    win_length = args.win or args.size
+    name = f'tablebase_{args.size}x{args.size}_k{win_length}'
+    work_dir = args.work_dir or os.path.expanduser(os.path.join('~/.ros/tic_tac_toe', name))
+    output = args.output or tablebase_path(args.size, win_length)
+    started = time.perf_counter()
+    build_tablebase(args.size, win_length, output, work_dir, args.workers or os.cpu_count(), args.chunk_size)
+    print(f"{args.size}x{args.size} k={win_length}: {os.path.getsize(output)} bytes -> {output} "
+          f"in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,48 @@
 #!/usr/bin/env python3
 
 import rclpy
-from rclpy.node import Node
+from rclpy.lifecycle import LifecycleNode, TransitionCallbackReturn
+from rclpy.signals import SignalHandlerOptions
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+from rcl_interfaces.msg import ParameterDescriptor, SetParametersResult
+from std_srvs.srv import Trigger
+from sensor_msgs.msg import Image, CompressedImage
+from std_msgs.msg import String
 import pygame
+import array
+import io
+import os
 import sys
 import math
 import random
 import time
+import zlib
 from enum import Enum, auto
 
+import numpy as np
+
+from tic_tac_toe import batch
+from tic_tac_toe.analysis import PositionAnalyzer, render_overlay
+from tic_tac_toe.animation import AnimationQueue
+from tic_tac_toe.diagnostics import Instrumentation
+from tic_tac_toe.engine import Engine
+from tic_tac_toe.game_events import event_message
+from tic_tac_toe.game_log import GameLogWriter, GameRecord
+from tic_tac_toe.history import MoveHistory
+from tic_tac_toe.leaderboard import Leaderboard
+from tic_tac_toe.opening_book import OpeningBook
+from tic_tac_toe.profiling import StateProfiler
+from tic_tac_toe.replay import REPLAYED_PARAMETERS, InputRecorder, InputReplayer, write_report
+from tic_tac_toe.robot_arm import RobotArm
+from tic_tac_toe.tablebase import Tablebase
+from tic_tac_toe.rules import (PLAYER_X, PLAYER_O, EMPTY, DIFFICULTIES, Difficulty, format_removal, format_state,
+                               position_key)
+
 # Constants
 BOARD_SIZE = 3
 CELL_SIZE = 150
 WINDOW_WIDTH = CELL_SIZE * BOARD_SIZE + 100
 WINDOW_HEIGHT = CELL_SIZE * BOARD_SIZE + 300
-PLAYER_X = 'X'
-PLAYER_O = 'O'
-EMPTY = None
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
@@ -33,6 +59,45 @@ DEFAULT_COLORS = {
     'highlight': (200, 200, 255)
 }
 
+# Hint screen content: (text, is_section_header), an empty text is a gap
+HINT_RULES = [
+    ("Tic-Tac-Toe Rules:", True),
+    ("1. Game is played on a 3x3 grid", False),
+    ("2. Players alternate placing X or O", False),
+    ("3. First to get 3 in a row wins", False),
+    ("4. Lines can be horizontal, vertical or diagonal", False),
+    ("5. Full board with no winner is a draw", False),
+    ("", False),
+    ("Game Modes:", True),
+    ("• Player vs AI: Play against computer", False),
+    ("• Player vs Player: Two players alternate", False),
+    ("", False),
+    ("Winning Strategies:", True),
+    ("• Take center spot first (best advantage)", False),
+    ("• Create two winning opportunities at once", False),
+    ("• Block opponent when they have two in a row", False),
+    ("", False),
+    ("Settings Options:", True),
+    ("• Change player names and colors", False),
+    ("• Player O shows as 'AI' in vs AI mode", False),
+    ("", False),
+    ("Controls:", True),
+    ("• Click squares to place your mark", False),
+    ("• Menu buttons for navigation", False),
+    ("• ESC key returns to main menu", False),
+    ("• A shows what every empty square leads to", False)
+]
+HINT_SCROLLBAR_WIDTH = 10
+
+# Parameters applied while running; everything else is read at startup
+LIVE_PARAMETERS = [
+    'cell_size', 'window_width', 'window_height', 'x_color', 'o_color', 'background_color', 'line_color',
+    'ai_difficulty', 'animation_time_scale', 'fast_mode', 'ai_think_duration', 'ai_move_duration',
+    'analysis_overlay',
+]
+GEOMETRY_PARAMETERS = ['cell_size', 'window_width', 'window_height']
+COLOR_PARAMETERS = ['x_color', 'o_color', 'background_color', 'line_color']
+
 # Game states enumeration
 class GameState(Enum):
     MENU = auto()
@@ -44,13 +109,7 @@ class GameState(Enum):
     HINT_SCREEN = auto()
     DIFFICULTY_SELECT = auto()
     FIRST_TURN_SELECT = auto()
-
-# Difficulty levels enumeration
-class Difficulty(Enum):
-    EASY = "Easy"
-    MEDIUM = "Medium"
-    HARD = "Hard"
-    IMPOSSIBLE = "Impossible"
+    LEADERBOARD = auto()
 
 class Button:
     def __init__(self, x, y, width, height, text, color=None, hover_color=None):
@@ -60,25 +119,85 @@ class Button:
         self.hover_color = hover_color if hover_color else DEFAULT_COLORS['button_hover']
         self.is_hovered = False
         self.font = pygame.font.SysFont('Arial', 24)
-        
-    def draw(self, surface):
+        # The button face is rendered once and again only after a hover change
+        self.face = None
+        self.dirty = True
+
+    def set_hovered(self, hovered):
+        if hovered != self.is_hovered:
+            self.is_hovered = hovered
+            self.dirty = True
+
+    def render_face(self):
+        face = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        local_rect = face.get_rect()
         color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(surface, color, self.rect, border_radius=5)
-        pygame.draw.rect(surface, (0, 0, 0), self.rect, 2, border_radius=5)
-        
+        pygame.draw.rect(face, color, local_rect, border_radius=5)
+        pygame.draw.rect(face, (0, 0, 0), local_rect, 2, border_radius=5)
+
         text_surface = self.font.render(self.text, True, (255, 255, 255))
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        surface.blit(text_surface, text_rect)
-        
-    def check_hover(self, pos):
-        self.is_hovered = self.rect.collidepoint(pos)
-        return self.is_hovered
+        face.blit(text_surface, text_surface.get_rect(center=local_rect.center))
+        return face
+
+    def draw(self, surface):
+        if self.dirty:
+            self.face = self.render_face()
+            self.dirty = False
+        surface.blit(self.face, self.rect)
         
     def is_clicked(self, pos, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             return self.rect.collidepoint(pos)
         return False
 
+class WidgetLayer:
+    """Hover state of the buttons of every screen
+
+    Buttons are bucketed once into a coarse grid per screen, so a mouse
+    move only tests the buttons of the cell under the cursor, and only the
+    buttons whose hover state flips are marked dirty.
+    """
+
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+        self.grids = {}
+        self.state = None
+        self.hovered = None
+
+    def add(self, state, widgets):
+        grid = self.grids.setdefault(state, {})
+        for widget in widgets:
+            rect = widget.rect
+            for col in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+                for row in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                    grid.setdefault((col, row), []).append(widget)
+
+    def hit(self, state, pos):
+        """Return the widget of `state` under `pos`, or None"""
+        cell = (pos[0] // self.cell_size, pos[1] // self.cell_size)
+        for widget in self.grids.get(state, {}).get(cell, []):
+            if widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def hover(self, state, pos):
+        """Move the hover to the widget under `pos`; returns True if it changed"""
+        self.state = state
+        widget = self.hit(state, pos)
+        if widget is self.hovered:
+            return False
+        if self.hovered:
+            self.hovered.set_hovered(False)
+        if widget:
+            widget.set_hovered(True)
+        self.hovered = widget
+        return True
+
+    def update_screen(self, state, pos):
+        """Recheck the hover after a screen change, which comes without a mouse move"""
+        if state != self.state:
+            self.hover(state, pos)
+
 class ColorPicker:
     def __init__(self, x, y, size=150):
         self.rect = pygame.Rect(x, y, size, size)
@@ -167,61 +286,387 @@ class InputBox:
         # Blit the text
         surface.blit(self.txt_surface, (self.rect.x + 5, self.rect.y + 5))
 
-class TicTacToe(Node):
-    def __init__(self):
-        super().__init__('tic_tac_toe_node')
-        
+class TicTacToe(LifecycleNode):
+    """Tic-Tac-Toe game as a managed lifecycle node
+
+    configure loads everything expensive once: pygame and its fonts, the
+    screen and UI, the engine with its opening book, the game log and the
+    leaderboard. activate starts a session on top of those and deactivate
+    ends it, both in milliseconds; cleanup releases them. Unless `managed`
+    is set the node takes itself to active on start-up, like a plain node.
+    """
+
+    def __init__(self, **kwargs):
+        # kwargs are rclpy Node options, e.g. parameter_overrides
+        super().__init__('tic_tac_toe_node', **kwargs)
+
+        # Wait for a lifecycle manager instead of configuring and activating on start-up
+        self.declare_parameter('managed', False)
+
+        # Rendering: 'window', 'offscreen' (draw into a Surface) or 'none'
+        self.declare_parameter('render_mode', 'window')
+        self.declare_parameter('frame_dump_dir', '')
+        self.declare_parameter('frame_dump_every', 1)
+
+        # Geometry, colors and difficulty; the live ones are applied by handle_parameter_change
+        self.declare_parameter('board_size', BOARD_SIZE, ParameterDescriptor(
+            read_only=True, description="Rules, engine and opening book are built for 3x3"))
+        self.declare_parameter('cell_size', CELL_SIZE)
+        self.declare_parameter('window_width', 0)  # 0 = fit the board
+        self.declare_parameter('window_height', 0)
+        self.declare_parameter('x_color', list(DEFAULT_COLORS['x_default']))
+        self.declare_parameter('o_color', list(DEFAULT_COLORS['o_default']))
+        self.declare_parameter('background_color', list(DEFAULT_COLORS['bg']))
+        self.declare_parameter('line_color', list(DEFAULT_COLORS['line']))
+        self.declare_parameter('ai_difficulty', '')  # '' = chosen in the menu
+        # Win/draw/loss of every empty cell drawn over the board, also toggled with A
+        self.declare_parameter('analysis_overlay', False)
+
+        # Animation durations in ms, divided by animation_time_scale; fast_mode skips the waits
+        self.declare_parameter('animation_time_scale', 1.0)
+        self.declare_parameter('fast_mode', False)
+        self.declare_parameter('ai_think_duration', 500)
+        self.declare_parameter('ai_move_duration', 1000)
+
+        # Finished games are appended to an on-disk log and a persistent leaderboard
+        self.declare_parameter('game_log_path', '~/.ros/tic_tac_toe/games.log')
+        self.declare_parameter('leaderboard_path', '~/.ros/tic_tac_toe/leaderboard.db')
+
+        # Input record and replay with a seeded RNG, for repeatable performance runs
+        self.declare_parameter('record_input', '')
+        self.declare_parameter('replay_input', '')
+        self.declare_parameter('replay_speed', 1.0)  # 0 = as fast as possible
+        self.declare_parameter('replay_report', '')
+        self.declare_parameter('random_seed', -1)  # -1 = pick one
+
+        # Frame, event, AI and input timings, published on /diagnostics
+        self.declare_parameter('diagnostics_period', 1.0)
+        self.declare_parameter('diagnostics_dump_dir', '~/.ros/tic_tac_toe')
+
+        # Rendered frames published as images, only when the screen changed
+        self.declare_parameter('image_publish_rate', 0.0)
+        self.declare_parameter('image_compression', '')  # '', 'png' or 'jpeg'
+
+        # Optional per-GameState cProfile capture of drawing and input handling
+        self.declare_parameter('profile', False)
+        self.declare_parameter('profile_dir', '~/.ros/tic_tac_toe/profiles')
+        self.game_state = GameState.MENU
+        self.history = MoveHistory()
+        self.profiler = None
+        if self.get_parameter('profile').value:
+            self.profiler = StateProfiler(lambda: self.game_state.name)
+            draw_methods = [name for name in dir(type(self)) if name.startswith('draw_')]
+            self.profiler.instrument(self, draw_methods + ['handle_click', 'handle_name_input'])
+
+        self.configured = False
+        self.active = False
+        self.game_id = 0
+
+        # Registered last, so it only sees changes made after startup
+        self.add_on_set_parameters_callback(self.handle_parameter_change)
+
+        if not self.get_parameter('managed').value:
+            self.trigger_configure()
+            if not self.configured:
+                raise RuntimeError("Configuration failed, see the log")
+            self.trigger_activate()
+
+    def on_configure(self, state):
+        """Load the resources every session shares"""
+        start = time.perf_counter()
+        self.render_mode = self.get_parameter('render_mode').value
+        self.frame_dump_dir = os.path.expanduser(self.get_parameter('frame_dump_dir').value)
+        self.frame_dump_every = max(1, self.get_parameter('frame_dump_every').value)
+        self.frame_count = 0
+        if self.render_mode not in ['window', 'offscreen', 'none']:
+            self.get_logger().error(f"Unknown render_mode '{self.render_mode}'")
+            return TransitionCallbackReturn.FAILURE
+        if self.render_mode != 'window':
+            # No display needed; the dummy driver still provides the event queue
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        if self.frame_dump_dir:
+            os.makedirs(self.frame_dump_dir, exist_ok=True)
+
+        # Input record and replay; a recording only replays with the parameters it was made with
+        self.recorder = None
+        self.replayer = None
+        seed = self.get_parameter('random_seed').value
+        parameters = {name: self.get_parameter(name).value for name in REPLAYED_PARAMETERS}
+        if self.get_parameter('replay_input').value:
+            self.replayer = InputReplayer(self.get_parameter('replay_input').value,
+                                          self.get_parameter('replay_speed').value)
+            mismatches = self.replayer.mismatches(parameters)
+            if mismatches:
+                self.get_logger().error("Recorded with other parameters: " + ', '.join(
+                    f"{name}:={self.replayer.parameters[name]!r}" for name in mismatches))
+                self.replayer = None
+                return TransitionCallbackReturn.FAILURE
+            seed = self.replayer.seed
+        elif seed < 0:
+            seed = random.getrandbits(32)
+        random.seed(seed)
+        if self.get_parameter('record_input').value and not self.replayer:
+            self.recorder = InputRecorder(self.get_parameter('record_input').value, seed, parameters)
+
+        self.colors = dict(DEFAULT_COLORS)
+        self.colors['bg'] = tuple(self.get_parameter('background_color').value)
+        self.colors['line'] = tuple(self.get_parameter('line_color').value)
+        self.set_geometry(self.get_parameter('cell_size').value, self.get_parameter('window_width').value,
+                          self.get_parameter('window_height').value)
+
         # Initialize Pygame
         pygame.init()
         pygame.font.init()
         self.font_large = pygame.font.SysFont('Arial', 48)
         self.font_medium = pygame.font.SysFont('Arial', 36)
         self.font_small = pygame.font.SysFont('Arial', 24)
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.create_screen()
         pygame.display.set_caption("ROS 2 Tic-Tac-Toe")
         self.clock = pygame.time.Clock()
-        
-        # Game state variables
+
+        self.animation_durations = {
+            'ai_think': self.get_parameter('ai_think_duration').value,
+            'ai_move': self.get_parameter('ai_move_duration').value,
+        }
+        self.animations = AnimationQueue(self.get_parameter('animation_time_scale').value,
+                                         # Nothing to animate without frames, unless the timing is recorded
+                                         fast=self.get_parameter('fast_mode').value or (
+                                             self.render_mode == 'none' and not (self.recorder or self.replayer)))
+        self.sound_effects = False
+
+        # Hint screen: content pre-rendered by layout_hint_screen, scrolled by hint_scroll_pos
+        self.hint_surface = None
+        self.hint_title = None
+        self.hint_layout_width = None
+        self.hint_thumb_rect = None
+        self.hint_scroll_pos = 0
+        self.hint_scroll_dragging = False
+        self.drag_start_y = 0
+        self.drag_start_scroll = 0
+
+        # Search engine, consulting the opening book before searching and the tablebase while searching
+        self.engine = Engine(BOARD_SIZE, opening_book=OpeningBook.load_default(BOARD_SIZE, BOARD_SIZE),
+                             tablebase=Tablebase.load_default(BOARD_SIZE, BOARD_SIZE))
+        # Move analysis for the overlay, searched on a background thread with its own engine
+        self.analyzer = PositionAnalyzer(BOARD_SIZE, tablebase=self.engine.tablebase)
+        self.show_analysis = self.get_parameter('analysis_overlay').value
+        self.analysis_layer = None  # (position, player, cell size) and the rendered layer
+
+        self.game_log = GameLogWriter(self.get_parameter('game_log_path').value)
+        self.leaderboard = Leaderboard(self.get_parameter('leaderboard_path').value)
+        self.leaderboard_difficulty = None
+        self.leaderboard_rows = []
+
+        # A replay reports on all of its frames, not just the last window
+        self.instrumentation = Instrumentation(window=None if self.replayer else 600)
+        self.click_time = None
+        self.diagnostics_publisher = self.create_lifecycle_publisher(DiagnosticArray, '/diagnostics', 10)
+        self.diagnostics_timer = self.create_timer(self.get_parameter('diagnostics_period').value,
+                                                   self.publish_diagnostics)
+
+        self.image_compression = self.get_parameter('image_compression').value
+        self.last_frame_checksum = None
+        # Set by whatever changes the picture: input, animations, ROS requests, the cursor blink
+        self.frame_dirty = False
+        self.frame_message = None  # Raw Image message the frames are copied into, see raw_frame_message
+        self.cursor_phase = None
+        self.image_publisher = None
+        self.image_timer = None
+        image_rate = self.get_parameter('image_publish_rate').value
+        if image_rate > 0 and self.render_mode != 'none':
+            if self.image_compression:
+                self.image_publisher = self.create_lifecycle_publisher(CompressedImage, '~/image/compressed', 1)
+            else:
+                self.image_publisher = self.create_lifecycle_publisher(Image, '~/image', 1)
+            self.image_timer = self.create_timer(1.0 / image_rate, self.publish_frame)
+
+        # UI elements
+        self.robot_arm = None  # Placed by setup_ui_elements
+        self.setup_ui_elements()
+
+        # Game state for spectators, in the same format as the game host
+        self.state_publisher = self.create_lifecycle_publisher(String, '~/state', 10)
+        # Moves, state transitions and AI decisions as JSON events, for rosbag2 recording
+        self.event_publisher = self.create_lifecycle_publisher(String, '~/events', 100)
+
+        # ROS services for taking back and replaying moves
+        self.undo_service = self.create_service(Trigger, '~/undo', self.handle_undo_request)
+        self.redo_service = self.create_service(Trigger, '~/redo', self.handle_redo_request)
+
+        self.configured = True
+        self.get_logger().info(f"Configured in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return TransitionCallbackReturn.SUCCESS
+
+    def on_activate(self, state):
+        """Start a session at the main menu"""
+        start = time.perf_counter()
         self.board = [EMPTY for _ in range(BOARD_SIZE * BOARD_SIZE)]
         self.current_player = PLAYER_X
         self.game_state = GameState.MENU
         self.game_mode = None
-        self.ai_difficulty = None
+        self.ai_difficulty = DIFFICULTIES.get(self.get_parameter('ai_difficulty').value.lower())
         self.winner = None
-        
+        self.history = MoveHistory()
+        self.game_started_at = time.time()
+        self.game_finished_at = None
+        self.game_recorded = False
+
         # Player settings
         self.player_x_name = "Player X"
         self.player_o_name = "Player O"
-        self.player_x_color = DEFAULT_COLORS['x_default']
-        self.player_o_color = DEFAULT_COLORS['o_default']
+        self.player_x_color = tuple(self.get_parameter('x_color').value)
+        self.player_o_color = tuple(self.get_parameter('o_color').value)
         self.original_player_o_name = "Player O"
         self.score = {PLAYER_X: 0, PLAYER_O: 0}
-        
-        # Game settings
-        self.animations_enabled = True
-        self.sound_effects = False
-
-        # Hint screen scroll variables
-        self.hint_scroll_pos = 0
-        self.hint_scroll_dragging = False
-        self.drag_start_y = 0
-        self.drag_start_scroll = 0
+        self.current_setting = None  # Player color or name being edited
 
         # AI turn visualization
         self.ai_thinking = False
         self.ai_move_position = None
-        self.ai_move_start_time = 0
-        self.ai_move_duration = 1000  # milliseconds for AI move animation
+        self.animations.clear()
 
-        # UI elements
+        self.hint_scroll_pos = 0
+        self.last_state_line = None
+        self.last_game_state = self.game_state
+        self.last_frame_checksum = None
+        self.frame_dirty = True
+        self.active = True
+        self.get_logger().info(f"Activated in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return super().on_activate(state)
+
+    def on_deactivate(self, state):
+        """End the session; the loaded resources stay for the next one"""
+        self.active = False
+        self.animations.clear()
+        self.record_game()
+        # Spectators drop this board
+        self.state_publisher.publish(String(data=format_removal(self.get_name())))
+        if self.profiler:
+            for path in self.profiler.dump(self.get_parameter('profile_dir').value):
+                self.get_logger().info(f"Profile written to {path}")
+        self.get_logger().info("Session ended")
+        return super().on_deactivate(state)
+
+    def on_cleanup(self, state):
+        """Release what configure loaded"""
+        self.release_resources()
+        return TransitionCallbackReturn.SUCCESS
+
+    def on_shutdown(self, state):
+        if self.active:
+            self.on_deactivate(state)
+        if self.configured:
+            self.release_resources()
+        return TransitionCallbackReturn.SUCCESS
+
+    def release_resources(self):
+        self.analyzer.close()
+        self.game_log.close()
+        self.leaderboard.close()
+        if self.replayer:
+            self.write_replay_report()
+        if self.recorder:
+            self.recorder.close()
+            self.get_logger().info(f"Input of {self.recorder.frames} frames recorded to {self.recorder.path}")
+        for timer in [self.diagnostics_timer, self.image_timer]:
+            if timer:
+                self.destroy_timer(timer)
+        for publisher in [self.diagnostics_publisher, self.image_publisher, self.state_publisher,
+                          self.event_publisher]:
+            if publisher:
+                self.destroy_lifecycle_publisher(publisher)
+        self.destroy_service(self.undo_service)
+        self.destroy_service(self.redo_service)
+        pygame.quit()
+        self.configured = False
+
+    def set_geometry(self, cell_size, window_width, window_height):
+        self.cell_size = cell_size
+        # A zero window dimension fits the board, the info lines and the arm
+        self.window_width = window_width or cell_size * BOARD_SIZE + 100
+        self.window_height = window_height or cell_size * BOARD_SIZE + 300
+
+    def create_screen(self):
+        """Open the window, or the offscreen Surface, at the current window size"""
+        if self.render_mode == 'window':
+            self.screen = pygame.display.set_mode((self.window_width, self.window_height))
+        else:
+            pygame.display.set_mode((1, 1))
+            self.screen = pygame.Surface((self.window_width, self.window_height))
+
+    def apply_geometry(self, cell_size, window_width, window_height):
+        """Resize the board and window, rebuilding only the size-dependent surfaces and layouts"""
+        self.set_geometry(cell_size, window_width, window_height)
+        self.create_screen()
+        # Keep what the player was typing or picking across the rebuild
+        name_text = self.name_input_box.text
+        picker_color = self.color_picker.color
         self.setup_ui_elements()
-        
-        # ROS logging
-        self.get_logger().info("Tic-Tac-Toe with ROS 2 and Pygame initialized!")
+        self.name_input_box.text = name_text
+        self.name_input_box.txt_surface = self.name_input_box.font.render(name_text, True, (0, 0, 0))
+        self.color_picker.color = picker_color
+        self.hint_scroll_pos = 0  # The hint screen lays itself out again at the new width
+        self.frame_dirty = True
+
+    def handle_parameter_change(self, parameters):
+        """Validate and apply parameters set while the game is running"""
+        values = {parameter.name: parameter.value for parameter in parameters}
+        for name, value in values.items():
+            if name not in LIVE_PARAMETERS:
+                return SetParametersResult(successful=False, reason=f"'{name}' can only be set at startup")
+            if name in COLOR_PARAMETERS and (len(value) != 3 or not all(0 <= c <= 255 for c in value)):
+                return SetParametersResult(successful=False, reason=f"'{name}' must be three values in 0-255")
+        if values.get('cell_size', CELL_SIZE) < 30:
+            return SetParametersResult(successful=False, reason="'cell_size' must be at least 30")
+        if any(values.get(name, 0) < 0 for name in ['window_width', 'window_height']):
+            return SetParametersResult(successful=False, reason="Window size must be positive, or 0 to fit the board")
+        difficulty = values.get('ai_difficulty', '').lower()
+        if difficulty and difficulty not in DIFFICULTIES:
+            return SetParametersResult(successful=False,
+                                       reason=f"'ai_difficulty' must be one of {', '.join(DIFFICULTIES)}")
+
+        if not self.configured:
+            return SetParametersResult(successful=True)  # Read when the node is configured
+        if (self.recorder or self.replayer) and any(name in REPLAYED_PARAMETERS for name in values):
+            return SetParametersResult(successful=False, reason="Fixed while recording or replaying input")
+
+        if any(name in values for name in GEOMETRY_PARAMETERS):
+            current = {name: self.get_parameter(name).value for name in GEOMETRY_PARAMETERS}
+            current.update((name, values[name]) for name in GEOMETRY_PARAMETERS if name in values)
+            self.apply_geometry(current['cell_size'], current['window_width'], current['window_height'])
+        # Colors are read on every frame, so nothing needs rebuilding
+        if 'x_color' in values:
+            self.player_x_color = tuple(values['x_color'])
+        if 'o_color' in values:
+            self.player_o_color = tuple(values['o_color'])
+        if 'background_color' in values:
+            self.colors['bg'] = tuple(values['background_color'])
+        if 'line_color' in values:
+            self.colors['line'] = tuple(values['line_color'])
+        if difficulty:
+            self.ai_difficulty = DIFFICULTIES[difficulty]
+        if 'animation_time_scale' in values:
+            self.animations.time_scale = values['animation_time_scale']
+        if 'analysis_overlay' in values:
+            self.show_analysis = values['analysis_overlay']
+        if 'fast_mode' in values:
+            self.animations.fast = values['fast_mode'] or self.render_mode == 'none'
+        for name in ['ai_think', 'ai_move']:
+            if f'{name}_duration' in values:
+                self.animation_durations[name] = values[f'{name}_duration']
+        self.frame_dirty = True
+        self.get_logger().info(f"Parameters updated: {', '.join(values)}")
+        return SetParametersResult(successful=True)
 
     def setup_ui_elements(self):
         """Initialize all UI buttons and elements"""
-        center_x = WINDOW_WIDTH // 2
+        center_x = self.window_width // 2
+
+        # Base of the robot arm is fixed at the right side of the board
+        self.robot_arm = RobotArm((50 + self.cell_size * BOARD_SIZE + 60, 50 + self.cell_size * BOARD_SIZE // 2))
+
+        # In-game menu button
+        self.game_menu_button = Button(self.window_width - 120, 10, 100, 30, "Menu")
 
         # Main menu buttons
         self.menu_buttons = [
@@ -229,16 +674,19 @@ class TicTacToe(Node):
             Button(center_x - 100, 250, 200, 40, "Player vs Player"),
             Button(center_x - 100, 300, 200, 40, "Settings"),
             Button(center_x - 100, 350, 200, 40, "Hint"),
-            Button(center_x - 100, 400, 200, 40, "Exit")
+            Button(center_x - 100, 400, 200, 40, "Leaderboard"),
+            Button(center_x - 100, 450, 200, 40, "Exit")
         ]
 
-        # Settings buttons
+        # Settings buttons, right of the setting labels and inside narrow windows
+        change_x = min(center_x + 75, self.window_width - 130)
         self.settings_buttons = [
-            Button(350, 90, 120, 30, "Change"),  # X Name
-            Button(350, 130, 120, 30, "Change"), # O Name
-            Button(350, 170, 120, 30, "Change"), # X Color
-            Button(350, 210, 120, 30, "Change"), # O Color
-            Button(WINDOW_WIDTH//2 - 100, 400, 200, 40, "Back to Menu")
+            Button(change_x, 90, 120, 30, "Change"),  # X Name
+            Button(change_x, 130, 120, 30, "Change"), # O Name
+            Button(change_x, 170, 120, 30, "Change"), # X Color
+            Button(change_x, 210, 120, 30, "Change"), # O Color
+            Button(change_x, 250, 120, 30, "Change"), # Animation speed
+            Button(self.window_width//2 - 100, 400, 200, 40, "Back to Menu")
         ]
 
         # Game over buttons
@@ -261,34 +709,62 @@ class TicTacToe(Node):
             Button(center_x - 100, 300, 200, 40, "Cancel")
         ]
 
-        # Current setting being modified
-        self.current_setting = None
-
         # Hint screen back button
-        self.hint_back_button = Button(WINDOW_WIDTH//2 - 100, WINDOW_HEIGHT - 100, 200, 40, "Back to Menu")
+        self.hint_back_button = Button(self.window_width//2 - 100, self.window_height - 70, 200, 40, "Back to Menu")
+
+        # Leaderboard filter and back buttons
+        tab_spacing = (self.window_width - 18) // 5  # Five tabs across the window
+        self.leaderboard_buttons = [
+            Button(12 + i * tab_spacing, 110, tab_spacing - 6, 30, label)
+            for i, label in enumerate(["All", "Easy", "Medium", "Hard", "Impossible"])
+        ]
+        self.leaderboard_back_button = Button(self.window_width//2 - 100, self.window_height - 100, 200, 40, "Back to Menu")
 
         # Difficulty selection buttons
         self.difficulty_buttons = [
-            Button(WINDOW_WIDTH//2 - 100, 200, 200, 40, "Easy"),
-            Button(WINDOW_WIDTH//2 - 100, 250, 200, 40, "Medium"),
-            Button(WINDOW_WIDTH//2 - 100, 300, 200, 40, "Hard"),
-            Button(WINDOW_WIDTH//2 - 100, 350, 200, 40, "Impossible"),
-            Button(WINDOW_WIDTH//2 - 100, 400, 200, 40, "Back")
+            Button(self.window_width//2 - 100, 200, 200, 40, "Easy"),
+            Button(self.window_width//2 - 100, 250, 200, 40, "Medium"),
+            Button(self.window_width//2 - 100, 300, 200, 40, "Hard"),
+            Button(self.window_width//2 - 100, 350, 200, 40, "Impossible"),
+            Button(self.window_width//2 - 100, 400, 200, 40, "Back")
         ]
 
         # First turn selection buttons
         self.first_turn_buttons = [
-            Button(WINDOW_WIDTH//2 - 100, 200, 200, 40, "Player Goes First"),
-            Button(WINDOW_WIDTH//2 - 100, 250, 200, 40, "AI Goes First"),
-            Button(WINDOW_WIDTH//2 - 100, 300, 200, 40, "Back")
+            Button(self.window_width//2 - 100, 200, 200, 40, "Player Goes First"),
+            Button(self.window_width//2 - 100, 250, 200, 40, "AI Goes First"),
+            Button(self.window_width//2 - 100, 300, 200, 40, "Back")
         ]
 
+        # Hover lookup per screen, laid out once
+        self.widgets = WidgetLayer()
+        self.widgets.add(GameState.MENU, self.menu_buttons)
+        self.widgets.add(GameState.SETTINGS, self.settings_buttons)
+        self.widgets.add(GameState.COLOR_PICKER, self.color_picker_buttons)
+        self.widgets.add(GameState.NAME_INPUT, self.name_input_buttons)
+        self.widgets.add(GameState.GAME_OVER, self.game_over_buttons)
+        self.widgets.add(GameState.HINT_SCREEN, [self.hint_back_button])
+        self.widgets.add(GameState.LEADERBOARD, self.leaderboard_buttons + [self.leaderboard_back_button])
+        self.widgets.add(GameState.DIFFICULTY_SELECT, self.difficulty_buttons)
+        self.widgets.add(GameState.FIRST_TURN_SELECT, self.first_turn_buttons)
+
     def reset_game(self):
         """Reset the game board"""
+        self.record_game()
         self.board = [EMPTY for _ in range(BOARD_SIZE * BOARD_SIZE)]
         self.winner = None
         self.ai_thinking = False
         self.ai_move_position = None
+        self.animations.clear()
+        self.history.clear()
+        self.game_started_at = time.time()
+        self.game_finished_at = None
+        self.game_recorded = False
+        self.game_id += 1
+        self.publish_event('game_start', mode=self.game_mode,
+                           difficulty=self.ai_difficulty.value if self.game_mode == 'AI' else None,
+                           first_player=self.current_player,
+                           player_x=self.player_x_name, player_o=self.player_o_name)
 
     def reset_score(self):
         """Reset the game scores"""
@@ -296,7 +772,9 @@ class TicTacToe(Node):
 
     def draw_board(self):
         """Draw the game board with Pygame"""
-        self.screen.fill(DEFAULT_COLORS['bg'])
+        state = self.game_state
+        start = time.perf_counter()
+        self.screen.fill(self.colors['bg'])
         
         # Draw screen based on current game state
         if self.game_state == GameState.MENU:
@@ -313,17 +791,30 @@ class TicTacToe(Node):
             self.draw_difficulty_select()
         elif self.game_state == GameState.FIRST_TURN_SELECT:
             self.draw_first_turn_select()
+        elif self.game_state == GameState.LEADERBOARD:
+            self.draw_leaderboard()
         elif self.game_state in [GameState.PLAYING, GameState.GAME_OVER]:
             self.draw_game()
-            
-        pygame.display.flip()
+        self.instrumentation.record(f'draw.{state.name}', (time.perf_counter() - start) * 1000)
+
+        if self.render_mode == 'window':
+            with self.instrumentation.timer('frame.flip'):
+                pygame.display.flip()
+        self.frame_count += 1
+        if self.frame_dump_dir and self.frame_count % self.frame_dump_every == 0:
+            pygame.image.save(self.screen, os.path.join(self.frame_dump_dir, f'frame_{self.frame_count:06d}.png'))
+
+        # The player's mark is on screen now
+        if self.click_time is not None:
+            self.instrumentation.record('input.click_to_mark', (time.perf_counter() - self.click_time) * 1000)
+            self.click_time = None
 
     def draw_menu(self):
         """Draw the main menu"""
         title = self.font_large.render("Tic-Tac-Toe", True, (0, 0, 100))
         subtitle = self.font_small.render("ROS 2 Enhanced Edition", True, (50, 50, 150))
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 50))
-        self.screen.blit(subtitle, (WINDOW_WIDTH//2 - subtitle.get_width()//2, 110))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 50))
+        self.screen.blit(subtitle, (self.window_width//2 - subtitle.get_width()//2, 110))
         
         for button in self.menu_buttons:
             button.draw(self.screen)
@@ -331,7 +822,7 @@ class TicTacToe(Node):
     def draw_settings(self):
         """Draw the settings menu"""
         title = self.font_large.render("Settings", True, (0, 0, 100))
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 50))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 50))
         
         # Draw current settings
         settings = [
@@ -339,29 +830,30 @@ class TicTacToe(Node):
             f"Player O: {self.player_o_name}",
             f"X Color: RGB{self.player_x_color}",
             f"O Color: RGB{self.player_o_color}",
+            f"Animations: {self.animation_speed_label()}",
         ]
         
         for i, text in enumerate(settings):
-            text_surface = self.font_small.render(text, True, DEFAULT_COLORS['text'])
+            text_surface = self.font_small.render(text, True, self.colors['text'])
             self.screen.blit(text_surface, (50, 100 + i * 40))
         
-        # Make sure the buttons are visible and properly positioned
-        button_labels = [
-            "Change", "Change", "Change", "Change", "Back to Menu"
-        ]
-        
-        for i, button in enumerate(self.settings_buttons):
-            button.text = button_labels[i]
-            # Position buttons to the right of the settings text
-            if i < 4:  # All except "Back to Menu"
-                button.rect.x = 350
-                button.rect.y = 90 + i * 40
+        for button in self.settings_buttons:
             button.draw(self.screen)
 
+    def animation_speed_label(self):
+        return "Off" if self.animations.fast else f"{self.animations.time_scale:g}x"
+
+    def cycle_animation_speed(self):
+        """Step through 1x, 2x, 4x and off (fast mode)"""
+        speeds = [(1.0, False), (2.0, False), (4.0, False), (1.0, True)]
+        current = (self.animations.time_scale, self.animations.fast)
+        index = speeds.index(current) + 1 if current in speeds else 0
+        self.animations.time_scale, self.animations.fast = speeds[index % len(speeds)]
+
     def draw_difficulty_select(self):
         """Draw the difficulty selection menu"""
         title = self.font_large.render("Select AI Difficulty", True, (0, 0, 100))
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 100))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 100))
         
         for button in self.difficulty_buttons:
             button.draw(self.screen)
@@ -369,11 +861,46 @@ class TicTacToe(Node):
     def draw_first_turn_select(self):
         """Draw the first turn selection menu"""
         title = self.font_large.render("Who Goes First?", True, (0, 0, 100))
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 100))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 100))
         
         for button in self.first_turn_buttons:
             button.draw(self.screen)
 
+    def open_leaderboard(self, difficulty=None):
+        """Query the standings once and show the leaderboard screen"""
+        self.leaderboard_difficulty = difficulty
+        self.leaderboard_rows = self.leaderboard.top_players(difficulty, limit=10)
+        self.game_state = GameState.LEADERBOARD
+
+    def draw_leaderboard(self):
+        """Draw the leaderboard screen"""
+        title = self.font_large.render("Leaderboard", True, (0, 0, 100))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 40))
+
+        selected = self.leaderboard_difficulty.value if self.leaderboard_difficulty else "All"
+        for button in self.leaderboard_buttons:
+            if button.text == selected:
+                pygame.draw.rect(self.screen, self.colors['highlight'], button.rect.inflate(6, 6), border_radius=5)
+            button.draw(self.screen)
+
+        # Tally columns keep to the right edge at any window width
+        columns = [("Player", 40), ("W", self.window_width - 230), ("L", self.window_width - 160),
+                   ("D", self.window_width - 90)]
+        for label, x in columns:
+            self.screen.blit(self.font_small.render(label, True, (50, 50, 150)), (x, 160))
+
+        if not self.leaderboard_rows:
+            empty_text = self.font_small.render("No games played yet", True, self.colors['text'])
+            self.screen.blit(empty_text, (self.window_width//2 - empty_text.get_width()//2, 200))
+
+        for rank, standing in enumerate(self.leaderboard_rows):
+            y = 195 + rank * 32
+            values = [f"{rank + 1}. {standing.name}", standing.wins, standing.losses, standing.draws]
+            for (_, x), value in zip(columns, values):
+                self.screen.blit(self.font_small.render(str(value), True, self.colors['text']), (x, y))
+
+        self.leaderboard_back_button.draw(self.screen)
+
     def handle_name_input(self, event):
         """Handle text input for name changes"""
         if self.name_input_box.handle_event(event):  # Return is pressed
@@ -387,7 +914,7 @@ class TicTacToe(Node):
                 
         # Check buttons
         if event.type == pygame.MOUSEBUTTONDOWN:
-            pos = pygame.mouse.get_pos()
+            pos = event.pos
             for i, button in enumerate(self.name_input_buttons):
                 if button.is_clicked(pos, event):
                     if i == 0:  # Confirm
@@ -402,7 +929,7 @@ class TicTacToe(Node):
         """Draw the color picker interface"""
         title_text = f"Select {self.current_setting} Color"
         title = self.font_large.render(title_text, True, (0, 0, 100))
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 50))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 50))
         
         self.color_picker.draw(self.screen)
         
@@ -411,17 +938,21 @@ class TicTacToe(Node):
 
     def draw_name_input(self):
         """Draw the name input interface"""
-        self.screen.fill(DEFAULT_COLORS['bg'])
+        self.screen.fill(self.colors['bg'])
         
         title_text = f"Enter {self.current_setting} Name"
         title = self.font_large.render(title_text, True, (0, 0, 100))
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 100))
+        self.screen.blit(title, (self.window_width//2 - title.get_width()//2, 100))
         
         # Draw the input box
         self.name_input_box.draw(self.screen)
         
         # Draw blinking cursor if active
-        if self.name_input_box.active and pygame.time.get_ticks() % 1000 < 500:  # Blink every 500ms
+        phase = self.ticks() // 500
+        if phase != self.cursor_phase:
+            self.cursor_phase = phase
+            self.frame_dirty = True
+        if self.name_input_box.active and phase % 2 == 0:  # Blink every 500ms
             cursor_pos = self.name_input_box.rect.x + 5 + self.name_input_box.font.size(self.name_input_box.text)[0]
             pygame.draw.line(self.screen, (0, 0, 0),
                             (cursor_pos, self.name_input_box.rect.y + 5),
@@ -436,33 +967,37 @@ class TicTacToe(Node):
         # Draw grid lines
         for i in range(1, BOARD_SIZE):
             # Vertical lines
-            pygame.draw.line(self.screen, DEFAULT_COLORS['line'], 
-                           (i * CELL_SIZE + 50, 50), 
-                           (i * CELL_SIZE + 50, CELL_SIZE * BOARD_SIZE + 50), 3)
+            pygame.draw.line(self.screen, self.colors['line'], 
+                           (i * self.cell_size + 50, 50), 
+                           (i * self.cell_size + 50, self.cell_size * BOARD_SIZE + 50), 3)
             # Horizontal lines
-            pygame.draw.line(self.screen, DEFAULT_COLORS['line'], 
-                           (50, i * CELL_SIZE + 50), 
-                           (CELL_SIZE * BOARD_SIZE + 50, i * CELL_SIZE + 50), 3)
+            pygame.draw.line(self.screen, self.colors['line'], 
+                           (50, i * self.cell_size + 50), 
+                           (self.cell_size * BOARD_SIZE + 50, i * self.cell_size + 50), 3)
         
-        # Draw X's and O's
+        # Draw X's and O's, sized to the cell
+        mark = self.cell_size * 4 // 15
         for i in range(BOARD_SIZE * BOARD_SIZE):
             row = i // BOARD_SIZE
             col = i % BOARD_SIZE
             if self.board[i] == PLAYER_X:
                 # Draw X
-                x_pos = col * CELL_SIZE + 50 + CELL_SIZE // 2
-                y_pos = row * CELL_SIZE + 50 + CELL_SIZE // 2
+                x_pos = col * self.cell_size + 50 + self.cell_size // 2
+                y_pos = row * self.cell_size + 50 + self.cell_size // 2
                 pygame.draw.line(self.screen, self.player_x_color, 
-                               (x_pos - 40, y_pos - 40), 
-                               (x_pos + 40, y_pos + 40), 5)
+                               (x_pos - mark, y_pos - mark), 
+                               (x_pos + mark, y_pos + mark), 5)
                 pygame.draw.line(self.screen, self.player_x_color, 
-                               (x_pos + 40, y_pos - 40), 
-                               (x_pos - 40, y_pos + 40), 5)
+                               (x_pos + mark, y_pos - mark), 
+                               (x_pos - mark, y_pos + mark), 5)
             elif self.board[i] == PLAYER_O:
                 # Draw O
-                x_pos = col * CELL_SIZE + 50 + CELL_SIZE // 2
-                y_pos = row * CELL_SIZE + 50 + CELL_SIZE // 2
-                pygame.draw.circle(self.screen, self.player_o_color, (x_pos, y_pos), 40, 5)
+                x_pos = col * self.cell_size + 50 + self.cell_size // 2
+                y_pos = row * self.cell_size + 50 + self.cell_size // 2
+                pygame.draw.circle(self.screen, self.player_o_color, (x_pos, y_pos), mark, 5)
+
+        if self.show_analysis and not self.winner:
+            self.draw_analysis()
         
         # Draw AI hand if it's AI's turn and we're in AI mode
         if self.game_mode == 'AI' and self.current_player == PLAYER_O and not self.winner:
@@ -473,20 +1008,19 @@ class TicTacToe(Node):
         turn_text = f"Turn: {self.player_x_name if self.current_player == PLAYER_X else self.player_o_name}"
         score_text = f"{self.player_x_name}: {self.score[PLAYER_X]}  {self.player_o_name}: {self.score[PLAYER_O]}"
         
-        self.screen.blit(self.font_small.render(mode_text, True, DEFAULT_COLORS['text']), 
-                        (50, CELL_SIZE * BOARD_SIZE + 60))
-        self.screen.blit(self.font_small.render(turn_text, True, DEFAULT_COLORS['text']), 
-                        (50, CELL_SIZE * BOARD_SIZE + 90))
-        self.screen.blit(self.font_small.render(score_text, True, DEFAULT_COLORS['text']), 
-                        (50, CELL_SIZE * BOARD_SIZE + 120))
+        self.screen.blit(self.font_small.render(mode_text, True, self.colors['text']), 
+                        (50, self.cell_size * BOARD_SIZE + 60))
+        self.screen.blit(self.font_small.render(turn_text, True, self.colors['text']), 
+                        (50, self.cell_size * BOARD_SIZE + 90))
+        self.screen.blit(self.font_small.render(score_text, True, self.colors['text']), 
+                        (50, self.cell_size * BOARD_SIZE + 120))
         
         # Draw menu button
-        menu_button = Button(WINDOW_WIDTH - 120, 10, 100, 30, "Menu")
-        menu_button.draw(self.screen)
+        self.game_menu_button.draw(self.screen)
         
         # Draw game over message if needed
         if self.game_state == GameState.GAME_OVER:
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+            overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 150))
             self.screen.blit(overlay, (0, 0))
             
@@ -496,14 +1030,25 @@ class TicTacToe(Node):
                 winner_name = self.player_x_name if self.winner == PLAYER_X else self.player_o_name
                 result_text = self.font_large.render(f"{winner_name} wins!", True, (255, 255, 255))
             
-            self.screen.blit(result_text, (WINDOW_WIDTH//2 - result_text.get_width()//2, 200))
+            self.screen.blit(result_text, (self.window_width//2 - result_text.get_width()//2, 200))
             
             for button in self.game_over_buttons:
                 button.draw(self.screen)
 
+    def draw_analysis(self):
+        """Blit the analysis layer of the position once the background worker has it"""
+        key = (position_key(self.board), self.current_player, self.cell_size)
+        if self.analysis_layer is None or self.analysis_layer[0] != key:
+            values = self.analyzer.result(self.board, self.current_player)
+            if values is None:
+                return  # Still being analysed; drawn on a later frame
+            self.analysis_layer = (key, render_overlay(values, BOARD_SIZE, self.cell_size, self.font_small))
+            self.frame_dirty = True
+        self.screen.blit(self.analysis_layer[1], (50, 50))
+
     def draw_ai_hand(self):
         """Draw a robotic pick-and-place arm indicating AI is making a move"""
-        current_time = pygame.time.get_ticks()
+        current_time = self.ticks()
         
         # Calculate animation progress (0-1)
         if self.ai_thinking and self.ai_move_position is None:
@@ -511,263 +1056,140 @@ class TicTacToe(Node):
             progress = (current_time % 1000) / 1000  # Continuous pulsing
             
             # Draw scanning laser effect
-            scan_y = 50 + (CELL_SIZE * BOARD_SIZE) * progress
+            scan_y = 50 + (self.cell_size * BOARD_SIZE) * progress
             pygame.draw.line(self.screen, (255, 0, 0, 150), (50, scan_y), 
-                            (50 + CELL_SIZE * BOARD_SIZE, scan_y), 2)
+                            (50 + self.cell_size * BOARD_SIZE, scan_y), 2)
             
             # Draw grid highlight effect
             for i in range(BOARD_SIZE):
                 for j in range(BOARD_SIZE):
                     if self.board[i * BOARD_SIZE + j] == EMPTY:
-                        cell_x = 50 + j * CELL_SIZE
-                        cell_y = 50 + i * CELL_SIZE
+                        cell_x = 50 + j * self.cell_size
+                        cell_y = 50 + i * self.cell_size
                         highlight_alpha = int(127 + 127 * math.sin(progress * 2 * math.pi + (i+j)/2))
-                        s = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+                        s = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
                         s.fill((255, 0, 0, highlight_alpha//8))
                         self.screen.blit(s, (cell_x, cell_y))
             
             # Draw "AI processing" text with scanning effect
             thinking_text = self.font_small.render("AI processing move...", True, (50, 50, 50))
-            self.screen.blit(thinking_text, (WINDOW_WIDTH//2 - thinking_text.get_width()//2, 
-                                        CELL_SIZE * BOARD_SIZE + 150))
+            self.screen.blit(thinking_text, (self.window_width//2 - thinking_text.get_width()//2, 
+                                        self.cell_size * BOARD_SIZE + 150))
                                         
         elif self.ai_move_position is not None:
-            # Moving phase - show robot arm moving to position
-            elapsed = current_time - self.ai_move_start_time
-            progress = min(1.0, elapsed / self.ai_move_duration)
-            
-            # Target position (center of the cell)
-            row = self.ai_move_position // BOARD_SIZE
-            col = self.ai_move_position % BOARD_SIZE
-            target_x = col * CELL_SIZE + 50 + CELL_SIZE // 2
-            target_y = row * CELL_SIZE + 50 + CELL_SIZE // 2
-            
-            # Calculate robot arm position
-            # Base of robot arm is fixed at the right side of the board
-            base_x = 50 + CELL_SIZE * BOARD_SIZE + 60
-            base_y = 50 + CELL_SIZE * BOARD_SIZE // 2
-            
-            # Determine robot arm movement phases
-            if progress < 0.4:  # Moving arm to position above target
-                phase_progress = progress / 0.4
-                arm_end_x = target_x
-                arm_end_y = 20  # Hover above the board first
-                gripper_closed = False
-            elif progress < 0.6:  # Lowering arm to target
-                phase_progress = (progress - 0.4) / 0.2
-                arm_end_x = target_x
-                arm_end_y = 20 + (target_y - 20) * phase_progress
-                gripper_closed = False
-            elif progress < 0.8:  # Gripping and placing the O
-                phase_progress = (progress - 0.6) / 0.2
-                arm_end_x = target_x
-                arm_end_y = target_y
-                gripper_closed = True
-            else:  # Raising arm after placement
-                phase_progress = (progress - 0.8) / 0.2
-                arm_end_x = target_x
-                arm_end_y = target_y - (target_y - 20) * phase_progress
-                gripper_closed = False
-            
-            # Draw robot arm segments (assuming two-segment robotic arm)
-            arm_length1 = 140  # Length of first arm segment
-            arm_length2 = 160  # Length of second arm segment
-            
-            # Calculate arm joint position using inverse kinematics (simplified)
-            dx = arm_end_x - base_x
-            dy = arm_end_y - base_y
-            dist = math.sqrt(dx*dx + dy*dy)
-            
-            # Constrain distance to possible range
-            dist = max(abs(arm_length1 - arm_length2) + 10, min(arm_length1 + arm_length2 - 10, dist))
-            
-            # Law of cosines to find angles
-            angle1 = math.atan2(dy, dx) + math.acos((arm_length1*arm_length1 + dist*dist - arm_length2*arm_length2) / (2 * arm_length1 * dist))
-            angle2 = math.pi - math.acos((arm_length1*arm_length1 + arm_length2*arm_length2 - dist*dist) / (2 * arm_length1 * arm_length2))
-            
-            # Calculate joint positions
-            joint_x = base_x + arm_length1 * math.cos(angle1)
-            joint_y = base_y + arm_length1 * math.sin(angle1)
-            
-            # Draw base of robot arm (fixed mount)
-            base_width = 30
-            base_height = 80
-            pygame.draw.rect(self.screen, (50, 50, 60), 
-                        (base_x - 10, base_y - base_height//2, base_width, base_height))
-            # Add metallic details to base
-            pygame.draw.rect(self.screen, (80, 80, 90), 
-                        (base_x - 5, base_y - base_height//2 + 5, base_width - 10, base_height - 10))
-            pygame.draw.rect(self.screen, (30, 30, 35), 
-                        (base_x - 15, base_y - base_height//2 - 5, base_width + 10, 10))
-            pygame.draw.rect(self.screen, (30, 30, 35), 
-                        (base_x - 15, base_y + base_height//2 - 5, base_width + 10, 10))
-                        
-            # Draw mounting bolts
-            bolt_positions = [(base_x - 5, base_y - base_height//2 + 10),
-                            (base_x - 5, base_y + base_height//2 - 10),
-                            (base_x + base_width - 15, base_y - base_height//2 + 10),
-                            (base_x + base_width - 15, base_y + base_height//2 - 10)]
-            for bx, by in bolt_positions:
-                pygame.draw.circle(self.screen, (120, 120, 130), (int(bx), int(by)), 4)
-                pygame.draw.circle(self.screen, (180, 180, 190), (int(bx), int(by)), 2)
-            
-            # Draw first arm segment (thicker, with hydraulic look)
-            pygame.draw.line(self.screen, (60, 60, 70), (base_x, base_y), (joint_x, joint_y), 12)
-            # Add mechanical details to first segment
-            pygame.draw.line(self.screen, (100, 100, 110), (base_x, base_y), (joint_x, joint_y), 8)
-            # Draw hydraulic cylinder alongside the arm
-            hydraulic_offset = 5
-            hyd1_x = base_x + hydraulic_offset * math.cos(angle1 + math.pi/2)
-            hyd1_y = base_y + hydraulic_offset * math.sin(angle1 + math.pi/2)
-            hyd2_x = joint_x + hydraulic_offset * math.cos(angle1 + math.pi/2)
-            hyd2_y = joint_y + hydraulic_offset * math.sin(angle1 + math.pi/2)
-            pygame.draw.line(self.screen, (40, 40, 45), (hyd1_x, hyd1_y), (hyd2_x, hyd2_y), 4)
-            
-            # Draw second arm segment
-            elbow_angle = angle1 + angle2
-            pygame.draw.line(self.screen, (80, 80, 90), (joint_x, joint_y), (arm_end_x, arm_end_y), 8)
-            pygame.draw.line(self.screen, (120, 120, 130), (joint_x, joint_y), (arm_end_x, arm_end_y), 5)
-            
-            # Draw joint between segments
-            pygame.draw.circle(self.screen, (50, 50, 60), (int(joint_x), int(joint_y)), 8)
-            pygame.draw.circle(self.screen, (100, 100, 110), (int(joint_x), int(joint_y)), 5)
-            
-            # Draw end effector (gripper)
-            gripper_width = 24 if not gripper_closed else 14
-            gripper_height = 30
-            
-            # Draw end effector base (connecting to arm)
-            pygame.draw.rect(self.screen, (70, 70, 80), 
-                        (int(arm_end_x - 6), int(arm_end_y), 12, 10))
-            
-            # Draw gripper arms
-            grip_left_x = arm_end_x - gripper_width//2
-            grip_right_x = arm_end_x + gripper_width//2
-            
-            # Left gripper jaw
-            pygame.draw.polygon(self.screen, (100, 100, 110), [
-                (int(arm_end_x - 6), int(arm_end_y + 10)),
-                (int(grip_left_x), int(arm_end_y + 10)),
-                (int(grip_left_x), int(arm_end_y + gripper_height)),
-                (int(grip_left_x + 8), int(arm_end_y + gripper_height)),
-                (int(arm_end_x - 6), int(arm_end_y + 15))
-            ])
-            
-            # Right gripper jaw
-            pygame.draw.polygon(self.screen, (100, 100, 110), [
-                (int(arm_end_x + 6), int(arm_end_y + 10)),
-                (int(grip_right_x), int(arm_end_y + 10)),
-                (int(grip_right_x), int(arm_end_y + gripper_height)),
-                (int(grip_right_x - 8), int(arm_end_y + gripper_height)),
-                (int(arm_end_x + 6), int(arm_end_y + 15))
-            ])
-            
-            # Draw 'O' marker being placed
-            if gripper_closed:
-                o_color = self.player_o_color
-                pygame.draw.circle(self.screen, o_color, 
-                                (int(arm_end_x), int(arm_end_y + gripper_height//2)), 10, 3)
-            
-            # Add small lights to indicate activity
-            light_color = (0, 255, 0) if progress < 0.8 else (255, 255, 0)
-            pygame.draw.circle(self.screen, light_color, (int(base_x + 10), int(base_y - base_height//2 + 15)), 3)
-            
-            # If animation complete, place the mark
-            if progress >= 1.0:
-                self.board[self.ai_move_position] = PLAYER_O
-                self.ai_move_position = None
-                self.ai_thinking = False
-                self.winner = self.check_winner()
-                if not self.winner:
-                    self.current_player = PLAYER_X
-                # Add this code to handle the game over state when AI wins
-                else:
-                    if self.winner != "DRAW":
-                        self.score[self.winner] += 1
-                    self.game_state = GameState.GAME_OVER
-
+            # Moving phase - the arm follows its precomputed trajectory to the target cell
+            progress = self.animations.progress(current_time) if self.animations.current() == 'ai_move' else 1.0
+            row, col = divmod(self.ai_move_position, BOARD_SIZE)
+            target = (col * self.cell_size + 50 + self.cell_size // 2, row * self.cell_size + 50 + self.cell_size // 2)
+            self.robot_arm.draw(self.screen, target, progress, self.player_o_color)
+
+    def show_ai_arm(self, move):
+        """End of the thinking animation: the arm starts moving to the chosen cell"""
+        self.ai_move_position = move
+
+    def finish_ai_move(self, move):
+        """End of the arm animation: place the AI's mark"""
+        self.ai_move_position = None
+        self.ai_thinking = False
+        self.apply_move(move)
 
-    def draw_hint_screen(self):
-        """Draw the hint/rules screen with all content fitting without scrolling"""
-        self.screen.fill(WHITE)
-        
-        # Create smaller font objects
+    def layout_hint_screen(self, width):
+        """Render the rules and hints once into a tall Surface wrapped to `width`"""
         title_font = pygame.font.SysFont('Arial', 32, bold=True)
         section_font = pygame.font.SysFont('Arial', 20, bold=True)
         text_font = pygame.font.SysFont('Arial', 18)
-        
-        # Draw title
-        title = title_font.render("Game Rules and Hints", True, BLACK)
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 20))
-        
-        # Organized rules and hints with section markers
-        rules = [
-            ("Tic-Tac-Toe Rules:", True),
-            ("1. Game is played on a 3x3 grid", False),
-            ("2. Players alternate placing X or O", False),
-            ("3. First to get 3 in a row wins", False),
-            ("4. Lines can be horizontal, vertical or diagonal", False),
-            ("5. Full board with no winner is a draw", False),
-            ("", False),
-            ("Game Modes:", True),
-            ("• Player vs AI: Play against computer", False),
-            ("• Player vs Player: Two players alternate", False),
-            ("", False),
-            ("Winning Strategies:", True),
-            ("• Take center spot first (best advantage)", False),
-            ("• Create two winning opportunities at once", False),
-            ("• Block opponent when they have two in a row", False),
-            ("", False),
-            ("Settings Options:", True),
-            ("• Change player names and colors", False),
-            ("• Player O shows as 'AI' in vs AI mode", False),
-            ("", False),
-            ("Controls:", True),
-            ("• Click squares to place your mark", False),
-            ("• Menu buttons for navigation", False),
-            ("• ESC key returns to main menu", False)
-        ]
-        
-        # Drawing parameters
-        start_y = 70  # Below title
-        line_spacing = 22  # Reduced spacing
+        self.hint_title = title_font.render("Game Rules and Hints", True, BLACK)
+
+        line_spacing = 22
         section_indent = 20
         text_indent = 40
-        max_width = WINDOW_WIDTH - 40  # Account for margins
-        
-        # Draw all content
-        y_pos = start_y
-        for text, is_section in rules:
-            if not text:  # Empty line (spacing)
-                y_pos += line_spacing // 2
-                continue
-                
-            if is_section:
-                # Draw section header
-                text_surface = section_font.render(text, True, (50, 50, 200))
-                self.screen.blit(text_surface, (section_indent, y_pos))
+        max_width = width - 40 - HINT_SCROLLBAR_WIDTH  # Margins and scroll bar
+
+        # Wrap into (surface, x) lines, None marking a half-height gap
+        lines = []
+        for text, is_section in HINT_RULES:
+            if not text:
+                lines.append(None)
+            elif is_section:
+                lines.append((section_font.render(text, True, (50, 50, 200)), section_indent))
             else:
-                # Draw regular text (wrap if needed)
-                words = text.split(' ')
                 line = ''
-                for word in words:
+                for word in text.split(' '):
                     test_line = line + word + ' '
-                    if text_font.size(test_line)[0] < max_width - text_indent:
+                    if text_font.size(test_line)[0] < max_width - text_indent or not line:
                         line = test_line
                     else:
-                        if line:
-                            text_surface = text_font.render(line, True, BLACK)
-                            self.screen.blit(text_surface, (text_indent, y_pos))
-                            y_pos += line_spacing
+                        lines.append((text_font.render(line, True, BLACK), text_indent))
                         line = word + ' '
-                if line:
-                    text_surface = text_font.render(line, True, BLACK)
-                    self.screen.blit(text_surface, (text_indent, y_pos))
-            
+                lines.append((text_font.render(line, True, BLACK), text_indent))
+
+        height = sum(line_spacing // 2 if line is None else line_spacing for line in lines)
+        self.hint_surface = pygame.Surface((width, height))
+        self.hint_surface.fill(WHITE)
+        y_pos = 0
+        for line in lines:
+            if line is None:
+                y_pos += line_spacing // 2
+                continue
+            self.hint_surface.blit(line[0], (line[1], y_pos))
             y_pos += line_spacing
-        
-        # Position and draw back button
-        self.hint_back_button.rect.y = WINDOW_HEIGHT - 70
+        self.hint_layout_width = width
+
+    def hint_viewport(self):
+        """Screen area the hint content scrolls in, between the title and the back button"""
+        return pygame.Rect(0, 70, self.screen.get_width(), self.hint_back_button.rect.y - 10 - 70)
+
+    def max_hint_scroll(self):
+        return max(0, self.hint_surface.get_height() - self.hint_viewport().height)
+
+    def scroll_hint(self, position):
+        self.hint_scroll_pos = max(0, min(self.max_hint_scroll(), int(position)))
+
+    def handle_hint_scroll(self, event):
+        """Scroll the hint screen with the wheel or by dragging the scroll bar thumb"""
+        if event.type == pygame.MOUSEWHEEL:
+            self.scroll_hint(self.hint_scroll_pos - event.y * 20)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.hint_thumb_rect and self.hint_thumb_rect.collidepoint(event.pos):
+                self.hint_scroll_dragging = True
+                self.drag_start_y = event.pos[1]
+                self.drag_start_scroll = self.hint_scroll_pos
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.hint_scroll_dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.hint_scroll_dragging:
+            viewport = self.hint_viewport()
+            # The thumb moves over the viewport as the content moves over its full height
+            delta = (event.pos[1] - self.drag_start_y) * self.hint_surface.get_height() / viewport.height
+            self.scroll_hint(self.drag_start_scroll + delta)
+
+    def draw_hint_screen(self):
+        """Draw the hint/rules screen, scrolling a viewport over the pre-rendered content"""
+        # Wrapping only depends on the width, so only a resize lays the content out again
+        if self.hint_layout_width != self.screen.get_width():
+            self.layout_hint_screen(self.screen.get_width())
+            self.scroll_hint(self.hint_scroll_pos)
+
+        # The content blit covers the viewport; only the rest of the page needs a white fill
+        viewport = self.hint_viewport()
+        covered = self.screen.blit(self.hint_surface, viewport.topleft,
+                                   pygame.Rect(0, self.hint_scroll_pos, viewport.width, viewport.height))
+        self.screen.fill(WHITE, (0, 0, self.screen.get_width(), viewport.y))
+        self.screen.fill(WHITE, (0, covered.bottom, self.screen.get_width(), self.screen.get_height() - covered.bottom))
+        self.screen.blit(self.hint_title, (self.screen.get_width()//2 - self.hint_title.get_width()//2, 20))
+
+        # Scroll bar, only when the content is taller than the viewport
+        self.hint_thumb_rect = None
+        content_height = self.hint_surface.get_height()
+        if content_height > viewport.height:
+            track = pygame.Rect(viewport.right - HINT_SCROLLBAR_WIDTH - 4, viewport.y,
+                                HINT_SCROLLBAR_WIDTH, viewport.height)
+            thumb_height = max(20, track.height * viewport.height // content_height)
+            thumb_y = track.y + (track.height - thumb_height) * self.hint_scroll_pos // self.max_hint_scroll()
+            self.hint_thumb_rect = pygame.Rect(track.x, thumb_y, track.width, thumb_height)
+            pygame.draw.rect(self.screen, (220, 220, 220), track, border_radius=4)
+            pygame.draw.rect(self.screen, (150, 150, 150), self.hint_thumb_rect, border_radius=4)
+
+        # Draw back button
         self.hint_back_button.draw(self.screen)
 
     def check_winner(self):
@@ -789,124 +1211,60 @@ class TicTacToe(Node):
 
     def best_move(self):
         """Find the best move using minimax algorithm"""
-        best_score = -math.inf
-        move = None
-        
-        for i in range(9):
-            if self.board[i] == EMPTY:
-                self.board[i] = PLAYER_O
-                score = self.minimax(0, False)
-                self.board[i] = EMPTY
-                
-                if score > best_score:
-                    best_score = score
-                    move = i
-                    
-                if self.ai_difficulty == Difficulty.IMPOSSIBLE and best_score == 10:
-                    break
-        
-        return move
-
-    def minimax(self, depth, is_maximizing):
-        """Minimax algorithm implementation"""
-        winner = self.check_winner()
-        
-        if winner == PLAYER_X:
-            return -10 + depth
-        if winner == PLAYER_O:
-            return 10 - depth
-        if winner == "DRAW":
-            return 0
-            
-        if is_maximizing:
-            best_score = -math.inf
-            for i in range(9):
-                if self.board[i] == EMPTY:
-                    self.board[i] = PLAYER_O
-                    score = self.minimax(depth + 1, False)
-                    self.board[i] = EMPTY
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = math.inf
-            for i in range(9):
-                if self.board[i] == EMPTY:
-                    self.board[i] = PLAYER_X
-                    score = self.minimax(depth + 1, True)
-                    self.board[i] = EMPTY
-                    best_score = min(score, best_score)
-            return best_score
+        return self.engine.best_move(self.board, PLAYER_O,
+                                     stop_on_win=self.ai_difficulty == Difficulty.IMPOSSIBLE)
 
     def ai_move(self):
         """Make AI move based on difficulty level"""
         self.ai_thinking = True
         self.ai_move_position = None
-        
-        if self.animations_enabled:
-            # Show thinking animation for a moment
-            self.draw_board()
-            pygame.display.flip()
-            pygame.time.delay(500)
-        
-        if self.ai_difficulty == Difficulty.EASY:
-            move = random.choice([i for i, cell in enumerate(self.board) if cell == EMPTY])
-        elif self.ai_difficulty == Difficulty.MEDIUM:
-            if random.random() < 0.7:
-                move = self.medium_ai_move()
-            else:
+
+        # Opening positions come from the book; MEDIUM and HARD vary their picks
+        move = None
+        source = 'book'
+        if self.ai_difficulty != Difficulty.EASY:
+            move = self.engine.book_move(self.board, PLAYER_O,
+                                         randomize=self.ai_difficulty != Difficulty.IMPOSSIBLE)
+
+        search_start = time.perf_counter()
+        nodes_before = self.engine.stats['nodes']
+        if move is None:
+            source = 'random'
+            if self.ai_difficulty == Difficulty.EASY:
                 move = random.choice([i for i, cell in enumerate(self.board) if cell == EMPTY])
-        elif self.ai_difficulty in [Difficulty.HARD, Difficulty.IMPOSSIBLE]:
-            move = self.best_move()
-        
-        if self.animations_enabled:
-            # Start the move animation
-            self.ai_move_position = move
-            self.ai_move_start_time = pygame.time.get_ticks()
-        else:
-            # No animation, just place the mark
-            self.board[move] = PLAYER_O
-            self.ai_thinking = False
-            self.winner = self.check_winner()
-            if not self.winner:
-                self.current_player = PLAYER_X
+            elif self.ai_difficulty == Difficulty.MEDIUM:
+                if random.random() < 0.7:
+                    source = 'heuristic'
+                    move = self.medium_ai_move()
+                else:
+                    move = random.choice([i for i, cell in enumerate(self.board) if cell == EMPTY])
+            elif self.ai_difficulty in [Difficulty.HARD, Difficulty.IMPOSSIBLE]:
+                source = 'search'
+                move = self.best_move()
+
+        search_time = time.perf_counter() - search_start
+        nodes = self.engine.stats['nodes'] - nodes_before
+        # Book hits and random picks take no time; keep them out of the search latencies
+        self.instrumentation.record(f'ai.{source}', search_time * 1000)
+        if nodes and search_time > 0:
+            self.instrumentation.record('ai.nodes_per_second', nodes / search_time)
+        self.get_logger().debug(f"AI move {move}, engine stats: {self.engine.stats}")
+        self.publish_event('ai', cell=move, difficulty=self.ai_difficulty.value, source=source,
+                           search_ms=search_time * 1000, nodes=nodes)
+
+        # Think, move the arm, then place the mark; the same steps run back to back in fast mode
+        now = self.ticks()
+        self.animations.play('ai_think', self.animation_durations['ai_think'], now,
+                             on_finish=lambda: self.show_ai_arm(move))
+        self.animations.play('ai_move', self.animation_durations['ai_move'], now,
+                             on_finish=lambda: self.finish_ai_move(move))
 
     def medium_ai_move(self):
         """AI with some basic strategy"""
-        # Check for winning move
-        for i in range(9):
-            if self.board[i] == EMPTY:
-                self.board[i] = PLAYER_O
-                if self.check_winner() == PLAYER_O:
-                    self.board[i] = EMPTY
-                    return i
-                self.board[i] = EMPTY
-        
-        # Check to block player
-        for i in range(9):
-            if self.board[i] == EMPTY:
-                self.board[i] = PLAYER_X
-                if self.check_winner() == PLAYER_X:
-                    self.board[i] = EMPTY
-                    return i
-                self.board[i] = EMPTY
-        
-        # Take center if available
-        if self.board[4] == EMPTY:
-            return 4
-        
-        # Take a corner
-        corners = [0, 2, 6, 8]
-        available_corners = [c for c in corners if self.board[c] == EMPTY]
-        if available_corners:
-            return random.choice(available_corners)
-        
-        # Take any available edge
-        edges = [1, 3, 5, 7]
-        available_edges = [e for e in edges if self.board[e] == EMPTY]
-        if available_edges:
-            return random.choice(available_edges)
-        
-        return random.choice([i for i, cell in enumerate(self.board) if cell == EMPTY])
+        # Win, block, center, corner, edge - evaluated by the batch API
+        boards = batch.encode_boards([self.board])
+        rng = np.random.default_rng(random.getrandbits(64))
+        return int(batch.medium_moves(boards, batch.CELL_O, BOARD_SIZE, rng=rng)[0])
 
     def handle_click(self, pos, event):
         """Handle mouse click events"""
@@ -921,7 +1279,9 @@ class TicTacToe(Node):
                         self.game_state = GameState.SETTINGS
                     elif i == 3:  # Hint
                         self.game_state = GameState.HINT_SCREEN
-                    elif i == 4:  # Exit
+                    elif i == 4:  # Leaderboard
+                        self.open_leaderboard()
+                    elif i == 5:  # Exit
                         self.exit_game()
                         
         elif self.game_state == GameState.SETTINGS:
@@ -942,6 +1302,8 @@ class TicTacToe(Node):
                         self.current_setting = "O"
                         self.game_state = GameState.COLOR_PICKER
                     elif i == 4:
+                        self.cycle_animation_speed()
+                    elif i == 5:
                         self.game_state = GameState.MENU
 
         elif self.game_state == GameState.DIFFICULTY_SELECT:
@@ -968,9 +1330,9 @@ class TicTacToe(Node):
             if self.game_mode == 'AI' and (self.ai_thinking or self.current_player == PLAYER_O):
                 return
                 
-            if 50 <= pos[0] <= CELL_SIZE * BOARD_SIZE + 50 and 50 <= pos[1] <= CELL_SIZE * BOARD_SIZE + 50:
-                col = (pos[0] - 50) // CELL_SIZE
-                row = (pos[1] - 50) // CELL_SIZE
+            if 50 <= pos[0] < self.cell_size * BOARD_SIZE + 50 and 50 <= pos[1] < self.cell_size * BOARD_SIZE + 50:
+                col = (pos[0] - 50) // self.cell_size
+                row = (pos[1] - 50) // self.cell_size
                 index = row * BOARD_SIZE + col
 
                 if self.board[index] == EMPTY:
@@ -979,24 +1341,14 @@ class TicTacToe(Node):
                         pass
                     else:
                         # Place the current player's mark
-                        self.board[index] = self.current_player
-                        self.winner = self.check_winner()
-
-                        if not self.winner:
-                            # Switch players
-                            self.current_player = PLAYER_O if self.current_player == PLAYER_X else PLAYER_X
-                            
-                            # If AI mode and it's AI's turn, make AI move
-                            if self.game_mode == 'AI' and self.current_player == PLAYER_O:
-                                self.ai_move()
+                        self.click_time = time.perf_counter()
+                        self.apply_move(index)
 
-                        if self.winner:
-                            if self.winner != "DRAW":
-                                self.score[self.winner] += 1
-                            self.game_state = GameState.GAME_OVER
+                        # If AI mode and it's AI's turn, make AI move
+                        if not self.winner and self.game_mode == 'AI' and self.current_player == PLAYER_O:
+                            self.ai_move()
 
-            menu_button = Button(WINDOW_WIDTH - 120, 10, 100, 30, "Menu")
-            if menu_button.is_clicked(pos, event):
+            if self.game_menu_button.is_clicked(pos, event):
                 self.reset_score()  # Reset score when returning to main menu
                 self.game_state = GameState.MENU
 
@@ -1016,32 +1368,22 @@ class TicTacToe(Node):
                             self.ai_move()
                             
                     elif i == 1:  # Main Menu button
+                        self.record_game()
                         self.reset_score()
                         self.game_state = GameState.MENU
 
+        elif self.game_state == GameState.LEADERBOARD:
+            for i, button in enumerate(self.leaderboard_buttons):
+                if button.is_clicked(pos, event):
+                    difficulties = [None, Difficulty.EASY, Difficulty.MEDIUM,
+                                    Difficulty.HARD, Difficulty.IMPOSSIBLE]
+                    self.open_leaderboard(difficulties[i])
+            if self.leaderboard_back_button.is_clicked(pos, event):
+                self.game_state = GameState.MENU
+
         elif self.game_state == GameState.HINT_SCREEN:
             if self.hint_back_button.is_clicked(pos, event):
                 self.game_state = GameState.MENU
-            
-            # Handle scroll bar dragging
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if hasattr(self, 'scroll_thumb_rect') and self.scroll_thumb_rect.collidepoint(pos):
-                    self.hint_scroll_dragging = True
-                    self.drag_start_y = pos[1]
-                    self.drag_start_scroll = self.hint_scroll_pos
-            
-            elif event.type == pygame.MOUSEBUTTONUP:
-                self.hint_scroll_dragging = False
-            
-            elif event.type == pygame.MOUSEMOTION and self.hint_scroll_dragging:
-                if hasattr(self, 'scroll_thumb_rect'):
-                    content_height = 600
-                    viewport_height = WINDOW_HEIGHT - 180 - 80
-                    max_scroll = max(0, content_height - viewport_height)
-                    
-                    delta_y = pos[1] - self.drag_start_y
-                    scroll_ratio = delta_y / viewport_height
-                    self.hint_scroll_pos = max(0, min(max_scroll, self.drag_start_scroll + scroll_ratio * content_height))
 
         elif self.game_state == GameState.COLOR_PICKER and event.type == pygame.MOUSEBUTTONDOWN:
             new_color = self.color_picker.get_color_at_pos(pos)
@@ -1059,8 +1401,223 @@ class TicTacToe(Node):
                     elif i == 1:
                         self.game_state = GameState.SETTINGS
 
+    def apply_move(self, index):
+        """Place the current player's mark and update turn, winner and score"""
+        player = self.current_player
+        self.board[index] = player
+        self.winner = self.check_winner()
+
+        if self.winner:
+            if self.winner != "DRAW":
+                self.score[self.winner] += 1
+            self.game_state = GameState.GAME_OVER
+            self.game_finished_at = time.time()
+        else:
+            self.current_player = PLAYER_O if player == PLAYER_X else PLAYER_X
+
+        self.history.push(index, player, self.winner)
+        self.publish_event('move', cell=index, player=player, winner=self.winner)
+
+    def record_game(self):
+        """Append the finished game to the game log and the leaderboard, once
+
+        A finished game can still be taken back and played out differently,
+        so it is only recorded when it is left: a new game, the main menu or
+        the end of the session.
+        """
+        if not self.winner or self.game_recorded:
+            return
+        self.game_recorded = True
+        moves = self.history.played()
+        self.game_log.append(GameRecord(
+            player_x=self.player_x_name,
+            player_o=self.player_o_name,
+            difficulty=self.ai_difficulty if self.game_mode == 'AI' else None,
+            first_player=moves[0].player,
+            winner=self.winner,
+            moves=[move.cell for move in moves],
+            started=self.game_started_at,
+            finished=self.game_finished_at,
+            board_size=BOARD_SIZE))
+        self.leaderboard.record_game(self.player_x_name, self.player_o_name,
+                                     self.ai_difficulty if self.game_mode == 'AI' else None,
+                                     self.winner, self.game_finished_at)
+
+    def take_back_move(self):
+        """Undo the last move, restoring turn, winner and score"""
+        move = self.history.undo()
+        if move is None:
+            return False
+        self.board[move.cell] = EMPTY
+        self.current_player = move.player
+        if move.winner and move.winner != "DRAW":
+            self.score[move.winner] -= 1
+        self.winner = None
+        self.game_state = GameState.PLAYING
+        self.publish_event('undo', cell=move.cell, player=move.player, winner=None)
+        return True
+
+    def replay_move(self):
+        """Redo the next move from the history"""
+        move = self.history.redo()
+        if move is None:
+            return False
+        self.board[move.cell] = move.player
+        self.winner = move.winner
+        if self.winner:
+            if self.winner != "DRAW":
+                self.score[self.winner] += 1
+            self.game_state = GameState.GAME_OVER
+            self.game_finished_at = time.time()
+        else:
+            self.current_player = PLAYER_O if move.player == PLAYER_X else PLAYER_X
+        self.publish_event('redo', cell=move.cell, player=move.player, winner=move.winner)
+        return True
+
+    def undo(self):
+        """Take back moves until it is a human player's turn"""
+        if self.game_state not in [GameState.PLAYING, GameState.GAME_OVER] or not self.history.can_undo():
+            return False
+        # Cancel a pending AI move before rolling back
+        self.ai_thinking = False
+        self.ai_move_position = None
+        self.animations.clear()
+
+        undone = False
+        while self.history.can_undo():
+            if self.game_mode == 'AI' and len(self.history) == 1 and self.history.last().player == PLAYER_O:
+                break  # Keep the AI's opening move
+            undone = self.take_back_move()
+            if self.game_mode != 'AI' or self.current_player == PLAYER_X:
+                break
+        return undone
+
+    def redo(self):
+        """Replay moves until it is a human player's turn again"""
+        if self.game_state not in [GameState.PLAYING, GameState.GAME_OVER] or self.ai_thinking:
+            return False
+
+        redone = self.replay_move()
+        if self.game_mode == 'AI':
+            while not self.winner and self.current_player == PLAYER_O and self.replay_move():
+                pass
+            # The AI's reply may never have been played (undo cancelled it); let it move now
+            if redone and not self.winner and self.current_player == PLAYER_O:
+                self.ai_move()
+        return redone
+
+    def handle_undo_request(self, request, response):
+        """ROS service callback for ~/undo"""
+        response.success = self.active and self.undo()
+        self.frame_dirty |= response.success
+        response.message = f"{len(self.history)} moves on the board"
+        return response
+
+    def handle_redo_request(self, request, response):
+        """ROS service callback for ~/redo"""
+        response.success = self.active and self.redo()
+        self.frame_dirty |= response.success
+        response.message = f"{len(self.history)} moves on the board"
+        return response
+
+    def publish_frame(self):
+        """Publish the last rendered frame if any pixel changed since the previous one"""
+        # Nothing changed the picture since the last tick, so there is nothing to compare
+        if not self.frame_dirty:
+            return
+        self.frame_dirty = False
+        # Buffer view of the Surface pixels; no per-pixel copy
+        checksum = zlib.crc32(self.screen.get_view('1'))
+        if checksum == self.last_frame_checksum:
+            return
+        self.last_frame_checksum = checksum
+
+        if self.image_compression:
+            msg = CompressedImage()
+            msg.format = self.image_compression
+            buffer = io.BytesIO()
+            pygame.image.save(self.screen, buffer, 'frame.' + ('jpg' if self.image_compression == 'jpeg' else 'png'))
+            msg.data = buffer.getvalue()
+        else:
+            msg = self.raw_frame_message()
+            # The display surface has no alpha channel (its padding byte reads as transparent),
+            # so its RGB view is copied once, straight into the message buffer
+            pixels = pygame.surfarray.pixels3d(self.screen)
+            self.frame_pixels[...] = pixels.transpose(1, 0, 2)
+            del pixels  # Unlocks the Surface
+        msg.header.stamp = self.get_clock().now().to_msg()
+        self.image_publisher.publish(msg)
+
+    def raw_frame_message(self):
+        """Reusable rgb8 Image message at the screen size, with a numpy view of its data"""
+        width, height = self.screen.get_size()
+        msg = self.frame_message
+        if msg is None or (msg.width, msg.height) != (width, height):
+            msg = self.frame_message = Image()
+            msg.width, msg.height = width, height
+            msg.encoding = 'rgb8'
+            msg.step = width * 3
+            msg.is_bigendian = 0
+            msg.data = array.array('B', bytes(height * msg.step))
+            self.frame_pixels = np.frombuffer(msg.data, dtype=np.uint8).reshape(height, width, 3)
+        return msg
+
+    def publish_state(self):
+        """Publish the game state when it changed since the last call"""
+        if self.game_state not in [GameState.PLAYING, GameState.GAME_OVER]:
+            return
+        line = format_state(self.get_name(), self.board, self.current_player, self.winner, self.score,
+                            self.ai_difficulty if self.game_mode == 'AI' else None)
+        if line != self.last_state_line:
+            self.last_state_line = line
+            self.state_publisher.publish(String(data=line))
+
+    def publish_event(self, kind, **fields):
+        self.event_publisher.publish(String(data=event_message(kind, game=self.game_id, **fields)))
+
+    def publish_transition(self):
+        """Publish a state event when the screen changed since the last call"""
+        if self.game_state != self.last_game_state:
+            self.publish_event('state', previous=self.last_game_state.name, current=self.game_state.name)
+            self.last_game_state = self.game_state
+
+    def publish_diagnostics(self):
+        """Publish the rolling timing histograms as a DiagnosticArray"""
+        msg = DiagnosticArray()
+        msg.header.stamp = self.get_clock().now().to_msg()
+        for name, summary in self.instrumentation.summary().items():
+            status = DiagnosticStatus()
+            status.level = DiagnosticStatus.OK
+            status.name = f"tic_tac_toe: {name}"
+            status.hardware_id = self.get_name()
+            status.values = [KeyValue(key=key, value=f"{value:.3f}" if isinstance(value, float) else str(value))
+                             for key, value in summary.items()]
+            msg.status.append(status)
+        self.diagnostics_publisher.publish(msg)
+
+    def ticks(self):
+        """Milliseconds since start, on the recorded clock during a replay"""
+        if self.replayer:
+            return self.replayer.ticks
+        return pygame.time.get_ticks()
+
+    def write_replay_report(self):
+        """Write the frame-time and latency report of the replay"""
+        stats = self.replayer.stats()
+        path = self.get_parameter('replay_report').value or os.path.join(
+            self.get_parameter('diagnostics_dump_dir').value, time.strftime('replay_%Y%m%d_%H%M%S.json'))
+        path = write_report(path, stats, self.instrumentation.summary())
+        self.get_logger().info(f"Replayed {stats['frames']} frames in {stats['wall_seconds']:.2f} s, "
+                               f"report written to {path}")
+
+    def dump_diagnostics(self):
+        """Write the timing histograms to a JSON file"""
+        path = self.instrumentation.dump(self.get_parameter('diagnostics_dump_dir').value)
+        self.get_logger().info(f"Performance summary written to {path}")
+
     def start_ai_game(self, first_turn):
         """Start a game against AI"""
+        self.record_game()  # Before the new game's names and mode replace the last one's
         self.game_mode = 'AI'
         self.player_o_name = "AI"  # Always show as AI in this mode
         self.current_player = PLAYER_O if first_turn == 'AI' else PLAYER_X
@@ -1072,6 +1629,7 @@ class TicTacToe(Node):
 
     def start_pvp_game(self):
         """Start a player vs player game"""
+        self.record_game()  # Before the new game's names and mode replace the last one's
         self.game_mode = 'PVP'
         self.player_o_name = self.original_player_o_name  # Use the original name in PvP mode
         self.current_player = PLAYER_X
@@ -1079,82 +1637,126 @@ class TicTacToe(Node):
         self.game_state = GameState.PLAYING
 
     def exit_game(self):
-        """Exit the game gracefully"""
-        pygame.quit()
+        """End the session; a node without a lifecycle manager also exits"""
+        self.trigger_deactivate()
+        if self.get_parameter('managed').value:
+            return
+        self.trigger_cleanup()
         sys.exit()
 
     def run(self):
         """Main game loop"""
-        while True:
+        while rclpy.ok():
+            if self.active:
+                self.run_frame()
+            else:
+                # Between sessions: keep the window responsive and wait for the next transition
+                if self.configured:
+                    pygame.event.pump()
+                rclpy.spin_once(self, timeout_sec=0.05)
+
+    def run_frame(self):
+        """Handle the input of one frame, then update and draw it"""
+        events_start = time.perf_counter()
+        if self.replayer:
+            frame = self.replayer.next_frame()
+            # Live input is dropped, apart from closing the window
+            if frame is None or any(event.type == pygame.QUIT for event in pygame.event.get()):
+                self.exit_game()
+                return
+            _, mouse_pos, events = frame
+        else:
             mouse_pos = pygame.mouse.get_pos()
+            events = pygame.event.get()
+            if self.recorder:
+                self.recorder.record_frame(self.ticks(), mouse_pos, events)
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.exit_game()
-
-                # Handle scroll wheel in hint screen
-                if self.game_state == GameState.HINT_SCREEN and event.type == pygame.MOUSEWHEEL:
-                    content_height = 600
-                    viewport_height = WINDOW_HEIGHT - 180 - 80
-                    max_scroll = max(0, content_height - viewport_height)
-                    self.hint_scroll_pos = max(0, min(max_scroll, self.hint_scroll_pos - event.y * 20))
-
-                if self.game_state == GameState.NAME_INPUT:
-                    self.handle_name_input(event)
-
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.handle_click(mouse_pos, event)
-
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        if self.game_state in [
-                            GameState.PLAYING,
-                            GameState.COLOR_PICKER,
-                            GameState.NAME_INPUT,
-                            GameState.HINT_SCREEN,
-                            GameState.DIFFICULTY_SELECT,
-                            GameState.FIRST_TURN_SELECT
-                        ]:
-                            if self.game_state == GameState.PLAYING:
-                                self.reset_score()  # Reset score when returning to main menu
-                            self.game_state = GameState.MENU
-                    elif event.key == pygame.K_r and self.game_state == GameState.PLAYING:
-                        self.reset_game()
+        for event in events:
+            if not self.active:  # The session ended on an earlier event
+                return
+            if event.type == pygame.QUIT:
+                self.exit_game()
+                continue
+
+            if event.type == pygame.MOUSEMOTION:
+                self.widgets.hover(self.game_state, event.pos)
+
+            # Wheel and scroll bar dragging in the hint screen
+            if self.game_state == GameState.HINT_SCREEN and self.hint_surface:
+                self.handle_hint_scroll(event)
+
+            if self.game_state == GameState.NAME_INPUT:
+                self.handle_name_input(event)
+
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.handle_click(event.pos, event)
+
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    if self.game_state in [
+                        GameState.PLAYING,
+                        GameState.COLOR_PICKER,
+                        GameState.NAME_INPUT,
+                        GameState.HINT_SCREEN,
+                        GameState.LEADERBOARD,
+                        GameState.DIFFICULTY_SELECT,
+                        GameState.FIRST_TURN_SELECT
+                    ]:
+                        if self.game_state == GameState.PLAYING:
+                            self.reset_score()  # Reset score when returning to main menu
+                        self.game_state = GameState.MENU
+                elif event.key == pygame.K_r and self.game_state == GameState.PLAYING:
+                    self.reset_game()
+                elif event.key == pygame.K_u or (event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL):
+                    self.undo()
+                elif event.key == pygame.K_y:
+                    self.redo()
+                elif event.key == pygame.K_a and self.game_state == GameState.PLAYING:
+                    self.show_analysis = not self.show_analysis
+                elif event.key == pygame.K_F3:
+                    self.dump_diagnostics()
+        if not self.active:
+            return
+
+        self.instrumentation.record('frame.events', (time.perf_counter() - events_start) * 1000)
+
+        # Hover only changes on mouse moves and screen changes
+        self.widgets.update_screen(self.game_state, mouse_pos)
 
-            # Hover state updates
-            if self.game_state == GameState.MENU:
-                for button in self.menu_buttons:
-                    button.check_hover(mouse_pos)
-            elif self.game_state == GameState.SETTINGS:
-                for button in self.settings_buttons:
-                    button.check_hover(mouse_pos)
-            elif self.game_state == GameState.COLOR_PICKER:
-                for button in self.color_picker_buttons:
-                    button.check_hover(mouse_pos)
-            elif self.game_state == GameState.NAME_INPUT:
-                for button in self.name_input_buttons:
-                    button.check_hover(mouse_pos)
-            elif self.game_state == GameState.GAME_OVER:
-                for button in self.game_over_buttons:
-                    button.check_hover(mouse_pos)
-            elif self.game_state == GameState.HINT_SCREEN:
-                self.hint_back_button.check_hover(mouse_pos)
-            elif self.game_state == GameState.DIFFICULTY_SELECT:
-                for button in self.difficulty_buttons:
-                    button.check_hover(mouse_pos)
-            elif self.game_state == GameState.FIRST_TURN_SELECT:
-                for button in self.first_turn_buttons:
-                    button.check_hover(mouse_pos)
+        # Serve pending ROS requests without blocking the frame
+        rclpy.spin_once(self, timeout_sec=0)
+        # Input and running animations change the picture; an idle screen stays clean
+        if events or self.animations.current():
+            self.frame_dirty = True
+        self.animations.update(self.ticks())
+        # Queued as soon as the position appears; the worker never holds up this frame
+        if self.show_analysis and self.game_state == GameState.PLAYING and not self.winner:
+            self.analyzer.request(self.board, self.current_player)
+        self.publish_state()
+        self.publish_transition()
 
+        if self.render_mode != 'none':
             self.draw_board()
-            self.clock.tick(60)
+        if events:
+            self.instrumentation.record('input.event_to_frame', (time.perf_counter() - events_start) * 1000)
+        # Replays are paced by the recording instead of the frame cap
+        self.instrumentation.record('frame.interval', self.clock.tick(0 if self.replayer else 60))
 
 def main():
-    rclpy.init()
+    # Ctrl-C raises KeyboardInterrupt instead of shutting the context down under the loop,
+    # so the shutdown transition can still end the session and release the resources
+    rclpy.init(signal_handler_options=SignalHandlerOptions.NO)
     game = TicTacToe()
-    game.run()
-    game.destroy_node()
-    rclpy.shutdown()
+    try:
+        game.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Nothing is loaded after cleanup, or after a lifecycle manager shut the node down
+        if game.configured:
+            game.trigger_shutdown()
+        game.destroy_node()
+        rclpy.shutdown()
 
 if __name__ == '__main__':
     main()
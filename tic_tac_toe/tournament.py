@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from tic_tac_toe.engine import Engine, choose_move
+from tic_tac_toe.mcts import mcts_move
+from tic_tac_toe.opening_book import OpeningBook
+from tic_tac_toe.rules import PLAYER_X, PLAYER_O, EMPTY, DRAW, DIFFICULTIES, other_player
+from tic_tac_toe.tablebase import Tablebase
+
+BOARD_SIZE = 3
+# One perfect player only: perfect players draw every game against each other, so no amount
+# of games separates them
+DEFAULT_PLAYERS = ['easy', 'depth:1', 'mcts:25', 'medium', 'mcts:200', 'impossible']
+ELO_SCALE = 400 / math.log(10)  # Elo points per natural-log unit of the odds
+Z_95 = 1.96
+
+
+class TournamentPlayer:
+    """A difficulty level or an engine configuration, built from a spec string
+
+    Specs are "<kind>[:<value>]" with optional "+book", "-book" and "+tb"
+    flags. Kinds: easy, medium, hard, impossible (the game's own AI, which
+    uses the opening book unless "-book"); depth:<plies> and budget:<nodes>
+    (minimax limited in depth or nodes per move); mcts:<playouts>. Engine
+    players break ties between equal moves at random, and only consult the
+    book or the tablebase with "+book" or "+tb".
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        kind, *flags = spec.replace('-', ' -').replace('+', ' +').split()
+        kind, _, value = kind.partition(':')
+        self.kind = kind.lower()
+        self.value = int(value) if value else None
+        self.difficulty = DIFFICULTIES.get(self.kind)
+        if self.difficulty is None and (self.kind not in ['depth', 'budget', 'mcts'] or self.value is None):
+            raise ValueError(f"Unknown player '{spec}'")
+        if self.value is not None and self.value < 1:
+            raise ValueError(f"'{spec}' needs a value of at least 1")
+        use_book = '-book' not in flags if self.difficulty else '+book' in flags
+        use_tablebase = '+tb' in flags
+        self.engine = Engine(BOARD_SIZE,
+                             max_depth=self.value if self.kind == 'depth' else None,
+                             node_budget=self.value if self.kind == 'budget' else None,
+                             opening_book=OpeningBook.load_default(BOARD_SIZE, BOARD_SIZE) if use_book else None,
+                             tablebase=Tablebase.load_default(BOARD_SIZE, BOARD_SIZE) if use_tablebase else None)
+
+    def move(self, board, player, rng):
+        if self.difficulty:
+            return choose_move(self.engine, board, self.difficulty, rng, player)
+        move = self.engine.book_move(board, player)
+        if move is not None:
+            return move
+        if self.kind == 'mcts':
+            return mcts_move(self.engine, board, player, self.value, rng)
+        scores = self.engine.score_moves(board, player)
+        best = max(scores.values())
+        return rng.choice([cell for cell, score in scores.items() if score == best])
+
+
+def play_game(x_player, o_player, rng):
+    """Play one game, X moving first; returns the winner or DRAW"""
+    board = [EMPTY] * (BOARD_SIZE * BOARD_SIZE)
+    players = {PLAYER_X: x_player, PLAYER_O: o_player}
+    player = PLAYER_X
+    while True:
+        move = players[player].move(list(board), player, rng)
+        if board[move] is not EMPTY:
+            raise RuntimeError(f"{players[player].spec} played the occupied cell {move}")
+        board[move] = player
+        winner = x_player.engine.check_winner(board)
+        if winner:
+            return winner
+        player = other_player(player)
+
+
+# Per-process players of the worker pool
+_worker_players = None
+
+
+def _init_worker(specs):
+    global _worker_players
+    _worker_players = [TournamentPlayer(spec) for spec in specs]
+
+
+def _play_games(jobs):
+    """Worker entry point: [(first, second, game, seed)] -> [(first, second, score of first)]
+
+    The players swap colors every game, so each moves first in half of them.
+    """
+    results = []
+    for first, second, game, seed in jobs:
+        rng = random.Random(seed)
+        random.seed(seed)  # The opening book draws from the global generator
+        x, o = (first, second) if game % 2 == 0 else (second, first)
+        winner = play_game(_worker_players[x], _worker_players[o], rng)
+        if winner == DRAW:
+            score = 0.5
+        else:
+            score = 1.0 if (winner == PLAYER_X) == (x == first) else 0.0
+        results.append((first, second, score))
+    return results
+
+
+def fit_elo(games, points, prior_draws=1.0, iterations=50):
+    """Maximum-likelihood Elo ratings and their standard errors
+
+    `games[i, j]` holds the games between players i and j and `points[i, j]`
+    the points i scored in them, draws counting half. Every pairing also
+    gets `prior_draws` virtual draws, so a player that never loses still
+    gets a finite rating. Ratings average 0.
+    """
+    count = len(games)
+    games = games + prior_draws * (1 - np.eye(count))
+    points = points + prior_draws / 2 * (1 - np.eye(count))
+    ratings = np.zeros(count)
+    for _ in range(iterations):
+        expected = 1 / (1 + np.exp(ratings[None, :] - ratings[:, None]))
+        gradient = (points - games * expected).sum(axis=1)
+        weights = games * expected * (1 - expected)
+        hessian = weights - np.diag(weights.sum(axis=1))
+        # The ratings are only defined up to a constant; pinv keeps the step orthogonal to it
+        step = np.linalg.pinv(hessian) @ gradient
+        ratings -= step
+        ratings -= ratings.mean()
+        if np.abs(step).max() < 1e-9:
+            break
+    covariance = np.linalg.pinv(-hessian)
+    errors = np.sqrt(np.clip(np.diag(covariance), 0, None))
+    return ratings * ELO_SCALE, errors * ELO_SCALE
+
+
+def separated(ratings, errors, games, draws):
+    """Whether every pair of neighbours in the ranking is settled
+
+    A pair is settled when its 95% intervals do not overlap, or when all
+    of its games were draws: two perfect players never separate, however
+    long they play.
+    """
+    order = np.argsort(-ratings)
+    for a, b in zip(order, order[1:]):
+        all_draws = games[a, b] > 0 and draws[a, b] == games[a, b]
+        if not all_draws and ratings[a] - Z_95 * errors[a] <= ratings[b] + Z_95 * errors[b]:
+            return False
+    return True
+
+
+def run_tournament(specs, games_per_round=20, max_rounds=50, min_rounds=2, workers=1, seed=0,
+                   batch_size=20, log=print):
+    """Round-robin rounds until the rankings are settled or `max_rounds` is reached"""
+    count = len(specs)
+    games = np.zeros((count, count))
+    points = np.zeros((count, count))
+    draws = np.zeros((count, count))
+    pairings = list(combinations(range(count), 2))
+    seeds = random.Random(seed)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+        for round_number in range(1, max_rounds + 1):
+            jobs = [(first, second, game, seeds.getrandbits(64))
+                    for first, second in pairings for game in range(games_per_round)]
+            batches = [jobs[start:start + batch_size] for start in range(0, len(jobs), batch_size)]
+            for results in pool.map(_play_games, batches):
+                for first, second, score in results:
+                    games[first, second] += 1
+                    games[second, first] += 1
+                    points[first, second] += score
+                    points[second, first] += 1 - score
+                    if score == 0.5:
+                        draws[first, second] += 1
+                        draws[second, first] += 1
+            ratings, errors = fit_elo(games, points)
+            done = round_number >= min_rounds and separated(ratings, errors, games, draws)
+            log(f"round {round_number}: {int(games.sum() / 2)} games, "
+                f"{'separated' if done else 'not yet separated'}")
+            if done:
+                break
+    return ratings, errors, games, points, round_number
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Round-robin Elo tournament between difficulty levels and engine configurations")
+    parser.add_argument('players', nargs='*', default=DEFAULT_PLAYERS,
+                        help="player specs, e.g. hard, depth:2, budget:100+book, mcts:200 (see TournamentPlayer)")
+    parser.add_argument('--games', type=int, default=20, help="games per pairing and round, colors alternating")
+    parser.add_argument('--max-rounds', type=int, default=50)
+    parser.add_argument('--min-rounds', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=0, help="game processes, 0 = one per CPU")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the standings to this JSON file")
+    args = parser.parse_args()
+
+    for spec in args.players:
+        try:
+            TournamentPlayer(spec)  # Fail on a bad spec before starting the pool
+        except ValueError as e:
+            parser.error(str(e))
+    started = time.perf_counter()
+    ratings, errors, games, points, rounds = run_tournament(
+        args.players, args.games, args.max_rounds, args.min_rounds, args.workers or os.cpu_count(), args.seed)
+    seconds = time.perf_counter() - started
+
+    standings = []
+    for i in np.argsort(-ratings):
+        standings.append({
+            'player': args.players[i],
+            'elo': float(ratings[i]),
+            'ci95': float(Z_95 * errors[i]),
+            'games': int(games[i].sum()),
+            'score': float(points[i].sum() / games[i].sum()),
+        })
+    print(f"{int(games.sum() / 2)} games in {rounds} rounds, {seconds:.1f} s")
+    print(f"{'rank':>4s}  {'player':20s} {'elo':>7s} {'95% ci':>8s} {'games':>6s} {'score':>6s}")
+    for rank, row in enumerate(standings, 1):
+        print(f"{rank:4d}  {row['player']:20s} {row['elo']:7.0f} {'±' + format(row['ci95'], '.0f'):>8s} "
+              f"{row['games']:6d} {row['score']:6.1%}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rounds': rounds, 'seconds': seconds, 'standings': standings}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()